@@ -2,6 +2,6 @@
 This module contains all the relevant classes and data for interacting with the Algofi Lending Protocol
 """
 
-__all__ = ["v1", "contract_strings", "utils"]
+__all__ = ["v1", "contract_strings", "utils", "state_cache", "suggested_params", "confirmation"]
 __version__ = "1.0.6"
 __author__ = "Algofi"
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Future, as_completed
+from threading import Lock, Thread
+from algosdk.error import AlgodHTTPError
+from .utils import map_concurrently
+
+logger = logging.getLogger(__name__)
+
+
+class ConfirmationTracker:
+
+    def __init__(self, algod_client, max_workers=None, max_retries=5, backoff=0.5):
+        """Constructor method for a tracker confirming many transactions at once. A single background
+        thread waits for each new block once and then checks every pending transaction concurrently, so
+        confirming many groups costs one wait per round rather than one loop per transaction. Transactions
+        not confirmed by their last valid round fail with an exception. Transient request errors are
+        retried, a transaction whose check keeps failing fails on its own.
+
+        :param algod_client: a :class:`AlgodClient` for interacting with the network
+        :type algod_client: :class:`AlgodClient`
+        :param max_workers: maximum number of concurrent pending transaction requests
+        :type max_workers: int, optional
+        :param max_retries: consecutive transient errors tolerated per request before giving up
+        :type max_retries: int, optional
+        :param backoff: seconds to wait before the first retry of a status request, doubled on each retry
+        :type backoff: float, optional
+        """
+        self.algod = algod_client
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pending = {}
+        self.thread = None
+        self.lock = Lock()
+
+    def track(self, txid, last_valid_round=None):
+        """Returns a future resolved with the transaction information of txid once it is confirmed
+
+        :param txid: id of the sent transaction
+        :type txid: string
+        :param last_valid_round: last round the transaction can be confirmed in, defaults to no timeout
+        :type last_valid_round: int, optional
+        :return: future of the dict of transaction information
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        with self.lock:
+            if txid in self.pending:
+                return self.pending[txid][0]
+            future = Future()
+            self.pending[txid] = (future, last_valid_round)
+            if self.thread is None:
+                self.thread = Thread(target=self._run, daemon=True)
+                self.thread.start()
+        logger.debug("tracking transaction", extra={"txid" : txid, "last_valid_round" : last_valid_round})
+        return future
+
+    def submit(self, transaction_group):
+        """Sends a signed transaction group and returns a future of its confirmation. The group times out
+        after the earliest last valid round of its transactions.
+
+        :param transaction_group: signed transaction group
+        :type transaction_group: :class:`TransactionGroup`
+        :return: future of the dict of transaction information
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        try:
+            txid = self.algod.send_transactions(transaction_group.signed_transactions)
+        except AlgodHTTPError as e:
+            raise Exception(str(e))
+        last_valid_round = min(signed_transaction.transaction.last_valid_round for signed_transaction in transaction_group.signed_transactions)
+        return self.track(txid, last_valid_round=last_valid_round)
+
+    def get_pending_count(self):
+        """Returns the number of transactions not yet confirmed or failed
+
+        :return: number of pending transactions
+        :rtype: int
+        """
+        with self.lock:
+            return len(self.pending)
+
+    def _is_transient(self, error):
+        # unknown or rejected transactions are final, server side, rate limit and connection errors are not
+        if isinstance(error, AlgodHTTPError):
+            return error.code is not None and (error.code == 429 or error.code >= 500)
+        return True
+
+    def _request(self, function, *args):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return function(*args)
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_transient(e):
+                    raise
+                logger.debug("retrying request", extra={"error" : str(e), "attempt" : attempt + 1})
+                time.sleep(self.backoff * 2**attempt)
+
+    def _check(self, txid):
+        try:
+            return self.algod.pending_transaction_info(txid)
+        except Exception as e:
+            return e
+
+    def _resolve(self, txid, result):
+        with self.lock:
+            future, _ = self.pending.pop(txid)
+        if isinstance(result, Exception):
+            logger.info("transaction failed", extra={"txid" : txid, "error" : str(result)})
+            future.set_exception(result)
+        else:
+            result["txid"] = txid
+            logger.info("transaction confirmed", extra={"txid" : txid, "confirmed_round" : result["confirmed-round"]})
+            future.set_result(result)
+
+    def _run(self):
+        # consecutive transient check errors by txid, checks are retried once per round
+        retries = {}
+        try:
+            last_round = self._request(self.algod.status).get("last-round")
+            while True:
+                with self.lock:
+                    pending = list(self.pending.items())
+                infos = map_concurrently(self._check, [txid for txid, _ in pending], max_workers=self.max_workers)
+                for (txid, (_, last_valid_round)), info in zip(pending, infos):
+                    if isinstance(info, Exception) and self._is_transient(info):
+                        retries[txid] = retries.get(txid, 0) + 1
+                        if retries[txid] <= self.max_retries:
+                            logger.debug("retrying transaction check", extra={"txid" : txid, "error" : str(info)})
+                            continue
+                        self._resolve(txid, Exception("Transaction " + txid + " could not be checked: " + str(info)))
+                    elif isinstance(info, Exception):
+                        self._resolve(txid, Exception("Transaction " + txid + " is unknown: " + str(info)))
+                    elif info.get("confirmed-round", 0) > 0:
+                        self._resolve(txid, info)
+                    elif info.get("pool-error", ""):
+                        self._resolve(txid, Exception("Transaction " + txid + " was rejected: " + info["pool-error"]))
+                    elif last_valid_round is not None and last_round >= last_valid_round:
+                        self._resolve(txid, Exception("Transaction " + txid + " expired after round " + str(last_valid_round)))
+                    retries.pop(txid, None)
+                with self.lock:
+                    if not self.pending:
+                        self.thread = None
+                        return
+                logger.debug("waiting for block", extra={"round" : last_round + 1})
+                last_round = self._request(self.algod.status_after_block, last_round).get("last-round")
+        except Exception as e:
+            # the node stayed unreachable through every retry, fail everything still pending rather than hang
+            with self.lock:
+                pending = list(self.pending.items())
+                self.pending = {}
+                self.thread = None
+            logger.warning("confirmation tracking stopped", extra={"error" : str(e), "pending" : len(pending)})
+            for _, (future, _) in pending:
+                future.set_exception(e)
+
+    # RESULTS
+
+    def wait(self, futures, timeout=None):
+        """Returns the transaction information of every future in order, raising the first failure
+
+        :param futures: futures returned by :meth:`track` or :meth:`submit`
+        :type futures: list
+        :param timeout: seconds to wait for each result
+        :type timeout: float, optional
+        :return: list of dicts of transaction information
+        :rtype: list
+        """
+        return [future.result(timeout=timeout) for future in futures]
+
+    def as_completed(self, futures, timeout=None):
+        """Yields futures as they are confirmed or fail
+
+        :param futures: futures returned by :meth:`track` or :meth:`submit`
+        :type futures: list
+        :param timeout: total seconds to wait
+        :type timeout: float, optional
+        :return: generator of completed futures
+        :rtype: generator
+        """
+        return as_completed(futures, timeout=timeout)
+
+    async def iterate_async(self, futures):
+        """Async iterator of transaction information in confirmation order, failures are raised
+
+        :param futures: futures returned by :meth:`track` or :meth:`submit`
+        :type futures: list
+        :return: async generator of dicts of transaction information
+        :rtype: async generator
+        """
+        for future in asyncio.as_completed([asyncio.wrap_future(future) for future in futures]):
+            yield await future
@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+# default seconds before a current-round entry is refetched, roughly one block
+DEFAULT_TTL = {"global": 4.0, "local": 4.0}
+
+
+class StateCache:
+
+    def __init__(self, max_entries=4096, ttl=None):
+        """Constructor method for an LRU cache of decoded application state, keyed by
+        (kind, indexer, app_id, address, round). Entries read at the current round expire after the TTL for
+        their kind. Entries read at a historical round are immutable and never expire, they are only
+        dropped by LRU eviction.
+
+        :param max_entries: maximum number of entries kept before the least recently used is evicted
+        :type max_entries: int, optional
+        :param ttl: dict of seconds to keep current-round entries by kind ("global" or "local")
+        :type ttl: dict, optional
+        """
+        self.max_entries = max_entries
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.entries = OrderedDict()
+        self.hits = {kind : 0 for kind in self.ttl}
+        self.misses = {kind : 0 for kind in self.ttl}
+        self.lock = Lock()
+
+    def get(self, kind, app_id=None, address=None, block=None, indexer=None):
+        """Returns the cached value for the key or None if it is missing or expired
+
+        :param kind: kind of state, "global" or "local"
+        :type kind: string
+        :param app_id: id of the application
+        :type app_id: int, optional
+        :param address: account address
+        :type address: string, optional
+        :param block: round the state was read at, None for the current round
+        :type block: int, optional
+        :param indexer: address of the indexer the state was read from
+        :type indexer: string, optional
+        :return: cached value
+        :rtype: dict
+        """
+        key = (kind, indexer, app_id, address, block)
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits[kind] = self.hits.get(kind, 0) + 1
+                    return value
+                del self.entries[key]
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            return None
+
+    def set(self, kind, value, app_id=None, address=None, block=None, indexer=None):
+        """Stores value for the key, evicting the least recently used entry if the cache is full
+
+        :param kind: kind of state, "global" or "local"
+        :type kind: string
+        :param value: value to cache
+        :type value: dict
+        :param app_id: id of the application
+        :type app_id: int, optional
+        :param address: account address
+        :type address: string, optional
+        :param block: round the state was read at, None for the current round
+        :type block: int, optional
+        :param indexer: address of the indexer the state was read from
+        :type indexer: string, optional
+        """
+        key = (kind, indexer, app_id, address, block)
+        expires_at = None if block is not None else time.monotonic() + self.ttl.get(kind, 0)
+        with self.lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_or_load(self, kind, loader, app_id=None, address=None, block=None, indexer=None):
+        """Returns the cached value for the key, calling loader and caching its result on a miss
+
+        :param kind: kind of state, "global" or "local"
+        :type kind: string
+        :param loader: function of no arguments returning the value
+        :type loader: callable
+        :param app_id: id of the application
+        :type app_id: int, optional
+        :param address: account address
+        :type address: string, optional
+        :param block: round the state was read at, None for the current round
+        :type block: int, optional
+        :param indexer: address of the indexer the state was read from
+        :type indexer: string, optional
+        :return: cached or loaded value
+        :rtype: dict
+        """
+        value = self.get(kind, app_id=app_id, address=address, block=block, indexer=indexer)
+        if value is None:
+            value = loader()
+            self.set(kind, value, app_id=app_id, address=address, block=block, indexer=indexer)
+        return value
+
+    def invalidate(self, app_id=None, address=None):
+        """Drops every entry for the given application and/or account, read from any indexer
+
+        :param app_id: id of the application
+        :type app_id: int, optional
+        :param address: account address
+        :type address: string, optional
+        """
+        with self.lock:
+            for key in list(self.entries.keys()):
+                if (app_id is not None and key[2] == app_id) or (address is not None and key[3] == address):
+                    del self.entries[key]
+
+    def clear(self):
+        """Drops every entry and resets the hit and miss counters
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = {kind : 0 for kind in self.ttl}
+            self.misses = {kind : 0 for kind in self.ttl}
+
+    def get_stats(self):
+        """Returns the hit and miss counters by kind and the number of cached entries
+
+        :return: dict of cache statistics
+        :rtype: dict
+        """
+        with self.lock:
+            return {"hits" : dict(self.hits), "misses" : dict(self.misses), "entries" : len(self.entries)}
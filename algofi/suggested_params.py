@@ -0,0 +1,92 @@
+import time
+from copy import deepcopy
+from threading import Lock
+
+# default seconds before suggested params are refetched, roughly one block
+DEFAULT_TTL = 4.0
+# default seconds per round used to estimate the current round between fetches
+DEFAULT_ROUND_TIME = 4.0
+
+
+class SuggestedParamsProvider:
+
+    def __init__(self, algod_client, ttl=DEFAULT_TTL, validity_window=None, refresh_margin=10, round_time=DEFAULT_ROUND_TIME):
+        """Constructor method for a provider of suggested transaction params shared by transaction builders.
+        Params are fetched from algod at most once per TTL. The first valid round is kept as fetched and the
+        last valid round is first valid + validity_window. Params are also refetched once the estimated
+        current round comes within refresh_margin rounds of the last valid round.
+
+        :param algod_client: a :class:`AlgodClient` for interacting with the network
+        :type algod_client: :class:`AlgodClient`
+        :param ttl: seconds to reuse fetched params, 0 to fetch on every call
+        :type ttl: float, optional
+        :param validity_window: number of rounds the params are valid for, defaults to the window suggested by algod
+        :type validity_window: int, optional
+        :param refresh_margin: rounds before the last valid round at which params are refetched
+        :type refresh_margin: int, optional
+        :param round_time: seconds per round used to estimate the current round
+        :type round_time: float, optional
+        """
+        self.algod = algod_client
+        self.ttl = ttl
+        self.validity_window = validity_window
+        self.refresh_margin = refresh_margin
+        self.round_time = round_time
+        self.params = None
+        self.fetched_at = None
+        self.fetches = 0
+        self.lock = Lock()
+
+    def is_stale(self):
+        """Returns True if the cached params must be refetched
+
+        :return: whether the cached params are missing, expired or close to their last valid round
+        :rtype: boolean
+        """
+        if self.params is None:
+            return True
+        elapsed = time.monotonic() - self.fetched_at
+        if elapsed >= self.ttl:
+            return True
+        estimated_round = self.params.first + int(elapsed / self.round_time)
+        return estimated_round >= self.params.last - self.refresh_margin
+
+    def refresh(self):
+        """Fetches suggested params from algod and applies the validity window
+        """
+        params = self.algod.suggested_params()
+        if self.validity_window:
+            params.last = params.first + self.validity_window
+        with self.lock:
+            self.params = params
+            self.fetched_at = time.monotonic()
+            self.fetches += 1
+
+    def get_suggested_params(self):
+        """Returns a copy of the cached suggested params, refetching them if they are stale.
+        Builders may modify the returned params freely.
+
+        :return: suggested params
+        :rtype: :class:`algosdk.future.transaction.SuggestedParams`
+        """
+        with self.lock:
+            stale = self.is_stale()
+        if stale:
+            self.refresh()
+        with self.lock:
+            return deepcopy(self.params)
+
+    def invalidate(self):
+        """Drops the cached params so the next call refetches them
+        """
+        with self.lock:
+            self.params = None
+            self.fetched_at = None
+
+    def get_fetch_count(self):
+        """Returns the number of suggested params requests made to algod
+
+        :return: number of fetches
+        :rtype: int
+        """
+        return self.fetches
@@ -2,6 +2,7 @@ import os
 import json
 from random import randint
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from base64 import b64decode, b64encode
 from algosdk.future.transaction import LogicSigTransaction, assign_group_id
 from algosdk import encoding, account, mnemonic
@@ -156,6 +157,61 @@ def format_state(state):
     return formatted
 
 
+# opt-in cache for application state reads, see set_state_cache
+_state_cache = None
+
+
+def set_state_cache(cache):
+    """Sets the cache used by read_local_state, read_global_state and get_global_state_field.
+    Caching is disabled until a cache is set.
+
+    :param cache: state cache, None to disable caching
+    :type cache: :class:`StateCache`
+    """
+    global _state_cache
+    _state_cache = cache
+
+
+def get_state_cache():
+    """Returns the cache used by read_local_state, read_global_state and get_global_state_field
+
+    :return: state cache or None if caching is disabled
+    :rtype: :class:`StateCache`
+    """
+    return _state_cache
+
+
+def _get_indexer_address(indexer_client):
+    # cache entries are kept apart per indexer, a historical indexer may serve different state
+    return getattr(indexer_client, "indexer_address", None)
+
+
+def read_local_states(indexer_client, address, block=None):
+    """Returns dict of local state by app id for every application address is opted into
+
+    :param indexer_client: indexer client
+    :type indexer_client: :class:`IndexerClient`
+    :param address: address of account for which to get state
+    :type address: string
+    :param block: block at which to get the historical local state
+    :type block: int, optional
+    :return: dict of local state by app id
+    :rtype: dict
+    """
+    
+    def load():
+        try:
+            results = indexer_client.account_info(address, round_num=block).get("account", {})
+        except:
+            raise Exception("Account does not exist.")
+        return {local_state['id'] : format_state(local_state.get('key-value', [])) for local_state in results.get('apps-local-state', [])}
+
+    if _state_cache is None:
+        return load()
+    # the whole account is cached so the manager and market local states share one request
+    return _state_cache.get_or_load("local", load, address=address, block=block, indexer=_get_indexer_address(indexer_client))
+
+
 def read_local_state(indexer_client, address, app_id, block=None):
     """Returns dict of local state for address for application with id app_id
 
@@ -170,18 +226,7 @@ def read_local_state(indexer_client, address, app_id, block=None):
     :return: dict of local state of address for application with id app_id
     :rtype: dict
     """
-    
-    try:
-        results = indexer_client.account_info(address, round_num=block).get("account", {})
-    except:
-        raise Exception("Account does not exist.")
-
-    for local_state in results['apps-local-state']:
-        if local_state['id'] == app_id:
-            if 'key-value' not in local_state:
-                return {}
-            return format_state(local_state['key-value'])
-    return {}
+    return dict(read_local_states(indexer_client, address, block=block).get(app_id, {}))
 
 
 def read_global_state(indexer_client, app_id, block=None):
@@ -197,14 +242,95 @@ def read_global_state(indexer_client, app_id, block=None):
     :rtype: dict
     """
 
+    if _state_cache is None:
+        return _load_global_state(indexer_client, app_id, block=block)
+    return dict(_state_cache.get_or_load("global", lambda: _load_global_state(indexer_client, app_id, block=block), app_id=app_id, block=block,
+                                         indexer=_get_indexer_address(indexer_client)))
+
+
+def _load_global_state(indexer_client, app_id, block=None):
     try:
         application_info = indexer_client.applications(app_id, round_num=block).get("application", {})
     except:
         raise Exception("Application does not exist.")
-
     return format_state(application_info["params"]["global-state"])
 
 
+def map_concurrently(func, items, max_workers=None):
+    """Returns list of func applied to each item in items, evaluated on a thread pool. Used to issue
+    independent network requests at once so the total latency follows the slowest single request.
+
+    :param func: function of one argument to apply
+    :type func: callable
+    :param items: items to apply func to
+    :type items: list
+    :param max_workers: maximum number of threads, defaults to one per item
+    :type max_workers: int, optional
+    :return: list of results in the same order as items
+    :rtype: list
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers or len(items)) as executor:
+        return list(executor.map(func, items))
+
+
+def read_global_states(indexer_client, app_ids, block=None, max_workers=None):
+    """Returns dict of global state by app id for the given applications, fetched concurrently
+
+    :param indexer_client: indexer client
+    :type indexer_client: :class:`IndexerClient`
+    :param app_ids: ids of the applications
+    :type app_ids: list
+    :param block: block at which to query historical data
+    :type block: int, optional
+    :param max_workers: maximum number of concurrent requests
+    :type max_workers: int, optional
+    :return: dict of global state by app id
+    :rtype: dict
+    """
+    app_ids = list(dict.fromkeys(app_ids))
+    states = map_concurrently(lambda app_id: read_global_state(indexer_client, app_id, block=block), app_ids, max_workers=max_workers)
+    return dict(zip(app_ids, states))
+
+
+def read_asset_info(indexer_client, asset_id):
+    """Returns params of the asset with the given asset_id. ALGO (asset id 1) is not an ASA and is
+    returned without a network call.
+
+    :param indexer_client: indexer client
+    :type indexer_client: :class:`IndexerClient`
+    :param asset_id: id of the asset
+    :type asset_id: int
+    :return: dict of asset params
+    :rtype: dict
+    """
+    if asset_id == 1:
+        return {"decimals": 6}
+    try:
+        return indexer_client.asset_info(asset_id).get("asset", {})["params"]
+    except:
+        raise Exception("Asset with id " + str(asset_id) + " does not exist.")
+
+
+def read_asset_infos(indexer_client, asset_ids, max_workers=None):
+    """Returns dict of asset params by asset id for the given assets, fetched concurrently
+
+    :param indexer_client: indexer client
+    :type indexer_client: :class:`IndexerClient`
+    :param asset_ids: ids of the assets
+    :type asset_ids: list
+    :param max_workers: maximum number of concurrent requests
+    :type max_workers: int, optional
+    :return: dict of asset params by asset id
+    :rtype: dict
+    """
+    asset_ids = list(dict.fromkeys(asset_ids))
+    infos = map_concurrently(lambda asset_id: read_asset_info(indexer_client, asset_id), asset_ids, max_workers=max_workers)
+    return dict(zip(asset_ids, infos))
+
+
 def get_global_state_field(indexer_client, app_id, field_name, block=None):
     """Returns field of global state for application with the given app_id
 
@@ -218,12 +344,205 @@ def get_global_state_field(indexer_client, app_id, field_name, block=None):
     :rtype: dict
     """
 
-    data = read_global_state(indexer_client, app_id, block=block)
+    if _state_cache is None:
+        data = _load_global_state(indexer_client, app_id, block=block)
+    else:
+        # read the cached state directly, copying the whole state for one field is wasted work
+        data = _state_cache.get_or_load("global", lambda: _load_global_state(indexer_client, app_id, block=block), app_id=app_id, block=block,
+                                        indexer=_get_indexer_address(indexer_client))
     if field_name in data:
         return data[field_name]
     else:
         raise Exception("Key not found")
 
+class ContractRegistry:
+
+    def __init__(self, contracts):
+        """Constructor method for an index of the hardcoded protocol contracts by chain, in the format of
+        contracts.json. Lookup tables are built once so every lookup is a dict access.
+
+        :param contracts: dict of contract info by chain
+        :type contracts: dict
+        """
+        self.contracts = contracts
+        self.market_app_id_to_symbol = {}
+        self.asset_id_to_symbol = {}
+        self.bank_asset_id_to_symbol = {}
+        self.app_id_to_staking_contract = {}
+        for chain, info in contracts.items():
+            self.market_app_id_to_symbol[chain] = {}
+            self.asset_id_to_symbol[chain] = {}
+            self.bank_asset_id_to_symbol[chain] = {}
+            # symbols are in market order, so an asset shared by two markets (ALGO and vALGO) maps to the first
+            for symbol, symbol_info in info.get("SYMBOL_INFO", {}).items():
+                self.market_app_id_to_symbol[chain].setdefault(symbol_info["marketAppId"], symbol)
+                if "underlyingAssetId" in symbol_info:
+                    self.asset_id_to_symbol[chain].setdefault(symbol_info["underlyingAssetId"], symbol)
+                if "bankAssetId" in symbol_info:
+                    self.bank_asset_id_to_symbol[chain].setdefault(symbol_info["bankAssetId"], symbol)
+            self.app_id_to_staking_contract[chain] = {}
+            for name, staking_info in info.get("STAKING_CONTRACTS", {}).items():
+                self.app_id_to_staking_contract[chain][staking_info["managerAppId"]] = name
+                self.app_id_to_staking_contract[chain][staking_info["marketAppId"]] = name
+
+    @classmethod
+    def from_file(cls, path):
+        """Returns a registry parsed from a json file in the format of contracts.json
+
+        :param path: path of the json file
+        :type path: string
+        :return: contract registry
+        :rtype: :class:`ContractRegistry`
+        """
+        with open(path, 'r') as contracts_file:
+            return cls(json.load(contracts_file))
+
+    def get_chain_info(self, chain):
+        """Returns the contract info for the specified chain
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :return: contract info
+        :rtype: dict
+        """
+        if chain not in self.contracts:
+            raise Exception("Chain " + str(chain) + " not in contract registry")
+        return self.contracts[chain]
+
+    def get_staking_contracts(self, chain):
+        """Returns dict of supported staking contracts for the specified chain
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :return: dict of staking contract info by name
+        :rtype: dict
+        """
+        return {name : dict(info) for name, info in self.get_chain_info(chain)["STAKING_CONTRACTS"].items()}
+
+    def get_ordered_symbols(self, chain, max=False, max_atomic_opt_in=False):
+        """Returns list of supported symbols for the specified chain
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :param max: max assets?
+        :type max: boolean
+        :return: list of supported symbols for algofi's protocol on chain
+        :rtype: list
+        """
+        info = self.get_chain_info(chain)
+        if max:
+            supported_market_count = info["maxMarketCount"]
+        elif max_atomic_opt_in:
+            supported_market_count = info["maxAtomicOptInMarketCount"]
+        else:
+            supported_market_count = info["supportedMarketCount"]
+        return info['SYMBOLS'][:supported_market_count]
+
+    def get_manager_app_id(self, chain):
+        """Returns app id of manager for the specified chain
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :return: manager app id
+        :rtype: int
+        """
+        return self.get_chain_info(chain)['managerAppId']
+
+    def get_market_app_id(self, chain, symbol):
+        """Returns market app id of symbol for the specified chain
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :param symbol: symbol to get market data for
+        :type symbol: string e.g. 'ALGO'
+        :return: market app id
+        :rtype: int
+        """
+        return self.get_chain_info(chain)['SYMBOL_INFO'][symbol]["marketAppId"]
+
+    def get_init_round(self, chain):
+        """Returns init round of algofi protocol for a specified chain
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :return: init round of algofi protocol on specified chain
+        :rtype: int
+        """
+        return self.get_chain_info(chain)['initRound']
+
+    def get_symbol_by_market_app_id(self, chain, market_app_id):
+        """Returns the symbol of the market with the given app id or None if it is not a market
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :param market_app_id: market app id
+        :type market_app_id: int
+        :return: market symbol
+        :rtype: string
+        """
+        return self.market_app_id_to_symbol.get(chain, {}).get(market_app_id, None)
+
+    def get_symbol_by_asset_id(self, chain, asset_id):
+        """Returns the symbol of the market with the given underlying asset id or None if there is none
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :param asset_id: underlying asset id
+        :type asset_id: int
+        :return: market symbol
+        :rtype: string
+        """
+        return self.asset_id_to_symbol.get(chain, {}).get(asset_id, None)
+
+    def get_symbol_by_bank_asset_id(self, chain, bank_asset_id):
+        """Returns the symbol of the market with the given bank asset id or None if there is none
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :param bank_asset_id: bank asset id
+        :type bank_asset_id: int
+        :return: market symbol
+        :rtype: string
+        """
+        return self.bank_asset_id_to_symbol.get(chain, {}).get(bank_asset_id, None)
+
+    def get_staking_contract_name_by_app_id(self, chain, app_id):
+        """Returns the name of the staking contract with the given manager or market app id or None if there is none
+
+        :param chain: network to query data for
+        :type chain: string e.g. 'testnet'
+        :param app_id: staking contract manager or market app id
+        :type app_id: int
+        :return: staking contract name
+        :rtype: string
+        """
+        return self.app_id_to_staking_contract.get(chain, {}).get(app_id, None)
+
+
+# registry of the hardcoded contracts, parsed once, see set_contract_registry
+_contract_registry = ContractRegistry.from_file(CONTRACTS_FPATH)
+
+
+def set_contract_registry(registry):
+    """Sets the registry read by get_staking_contracts, get_ordered_symbols, get_manager_app_id,
+    get_market_app_id and get_init_round, e.g. one loaded from a user supplied file for a fork or local network
+
+    :param registry: contract registry, None to restore the registry of the bundled contracts.json
+    :type registry: :class:`ContractRegistry`
+    """
+    global _contract_registry
+    _contract_registry = registry if registry else ContractRegistry.from_file(CONTRACTS_FPATH)
+
+
+def get_contract_registry():
+    """Returns the registry read by the contract lookup functions
+
+    :return: contract registry
+    :rtype: :class:`ContractRegistry`
+    """
+    return _contract_registry
+
+
 def get_staking_contracts(chain):
     """Returns list of supported staking contracts for the specified chain. Pulled from hardcoded values in contracts.json.
 
@@ -232,10 +551,7 @@ def get_staking_contracts(chain):
     :return: list of supported staking contracts
     :rtype: list
     """
-    with open(CONTRACTS_FPATH, 'r') as contracts_file:
-        json_file = json.load(contracts_file)[chain]
-        staking_contracts = json_file["STAKING_CONTRACTS"] 
-        return staking_contracts
+    return _contract_registry.get_staking_contracts(chain)
 
 
 def get_ordered_symbols(chain, max=False, max_atomic_opt_in=False):
@@ -248,15 +564,7 @@ def get_ordered_symbols(chain, max=False, max_atomic_opt_in=False):
     :return: list of supported symbols for algofi's protocol on chain
     :rtype: list
     """
-    with open(CONTRACTS_FPATH, 'r') as contracts_file:
-        json_file = json.load(contracts_file)[chain]
-        if max:
-            supported_market_count = json_file["maxMarketCount"]
-        elif max_atomic_opt_in:
-            supported_market_count = json_file["maxAtomicOptInMarketCount"]
-        else:
-            supported_market_count = json_file["supportedMarketCount"] 
-        return json_file['SYMBOLS'][:supported_market_count]
+    return _contract_registry.get_ordered_symbols(chain, max=max, max_atomic_opt_in=max_atomic_opt_in)
 
 
 def get_manager_app_id(chain):
@@ -267,9 +575,7 @@ def get_manager_app_id(chain):
     :return: manager app id
     :rtype: int
     """
-    with open(CONTRACTS_FPATH, 'r') as contracts_file:
-        json_file = json.load(contracts_file)[chain]
-        return json_file['managerAppId']
+    return _contract_registry.get_manager_app_id(chain)
 
 
 def get_market_app_id(chain, symbol):
@@ -282,9 +588,7 @@ def get_market_app_id(chain, symbol):
     :return: market app id
     :rtype: int
     """
-    with open(CONTRACTS_FPATH, 'r') as contracts_file:
-        json_file = json.load(contracts_file)[chain]
-        return json_file['SYMBOL_INFO'][symbol]["marketAppId"]
+    return _contract_registry.get_market_app_id(chain, symbol)
 
 def get_init_round(chain):
     """Returns init round of algofi protocol for a specified chain. Pulled from hardcoded values in contracts.json.
@@ -294,9 +598,7 @@ def get_init_round(chain):
     :return: init round of algofi protocol on specified chain
     :rtype: string
     """
-    with open(CONTRACTS_FPATH, 'r') as contracts_file:
-        json_file = json.load(contracts_file)[chain]
-        return json_file['initRound']
+    return _contract_registry.get_init_round(chain)
 
 
 def prepare_payment_transaction(sender, suggested_params, receiver, amount, rekey_to=None):
@@ -370,6 +672,17 @@ class TransactionGroup:
         assert(len(private_keys) == len(self.transactions))
         for i, txn in enumerate(self.transactions):
             self.signed_transactions[i] = txn.sign(private_keys[i])
+
+    def sign_with_key_map(self, private_keys):
+        """Signs the transactions whose sender is in private_keys with the sender's key and saves to class
+        state. Other transactions, such as ones already signed by a logic sig, are left as they are.
+
+        :param private_keys: dict of private key by sender address
+        :type private_keys: dict
+        """
+        for i, txn in enumerate(self.transactions):
+            if txn.sender in private_keys:
+                self.signed_transactions[i] = txn.sign(private_keys[txn.sender])
         
     def submit(self, algod, wait=False):
         """Submits the signed transactions to network using the algod client
@@ -389,8 +702,103 @@ class TransactionGroup:
             return wait_for_confirmation(algod, txid)
         return {'txid': txid}
 
+def _sign_transactions(items):
+    return [txn.sign(private_key) for txn, private_key in items]
+
+
+def sign_transaction_groups(transaction_groups, private_keys, max_workers=None, min_batch_size=256):
+    """Signs the transactions of many groups whose sender is in private_keys, spreading the ed25519 work
+    over a process pool, and saves the signatures to each group's state in order. Transactions of other
+    senders are left as they are. Batches smaller than min_batch_size are signed in this process, where
+    the pool start up would cost more than it saves.
+
+    :param transaction_groups: list of transaction groups
+    :type transaction_groups: list
+    :param private_keys: dict of private key by sender address
+    :type private_keys: dict
+    :param max_workers: maximum number of processes, defaults to the number of cores
+    :type max_workers: int, optional
+    :param min_batch_size: smallest number of transactions signed on the process pool
+    :type min_batch_size: int, optional
+    :return: transaction groups
+    :rtype: list
+    """
+    positions, items = [], []
+    for group in transaction_groups:
+        for i, txn in enumerate(group.transactions):
+            if txn.sender in private_keys:
+                positions.append((group, i))
+                items.append((txn, private_keys[txn.sender]))
+
+    if len(items) < min_batch_size or max_workers == 1:
+        signed = _sign_transactions(items)
+    else:
+        workers = max_workers or os.cpu_count() or 1
+        chunk_size = -(-len(items) // workers)
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            signed = [signed_txn for chunk in executor.map(_sign_transactions, chunks) for signed_txn in chunk]
+
+    for (group, i), signed_txn in zip(positions, signed):
+        group.signed_transactions[i] = signed_txn
+    return transaction_groups
+
+
+def iterate_indexer_pages(request, next_page="", prefetch=False):
+    """Yields each page of a paged indexer query with the token of the page after it. With prefetch the
+    next page is fetched in the background while the caller processes a page, so at most two pages are
+    held at a time.
+
+    :param request: function of the next page token returning the indexer response for that page
+    :type request: callable
+    :param next_page: token to resume from, defaults to the first page
+    :type next_page: string, optional
+    :param prefetch: fetch the next page while the current one is processed, defaults to False
+    :type prefetch: boolean, optional
+    :return: generator of (response, next page token) tuples, the token is None on the last page
+    :rtype: generator
+    """
+    if not prefetch:
+        while next_page is not None:
+            data = request(next_page)
+            next_page = data.get("next-token", None)
+            yield data, next_page
+        return
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(request, next_page)
+        while future is not None:
+            data = future.result()
+            next_page = data.get("next-token", None)
+            future = executor.submit(request, next_page) if next_page is not None else None
+            yield data, next_page
+    finally:
+        executor.shutdown(wait=False)
+
+
+def iterate_accounts_opted_into_app(indexer, app_id, next_page="", prefetch=False):
+    """Yields the addresses of accounts opted into app page by page
+
+    :param indexer: indexer client
+    :type indexer: :class:`IndexerClient`
+    :param app_id: application id
+    :type app_id: int
+    :param next_page: indexer token to resume from, defaults to the first page
+    :type next_page: string, optional
+    :param prefetch: fetch the next page while the current one is processed, defaults to False
+    :type prefetch: boolean, optional
+    :return: generator of addresses
+    :rtype: generator
+    """
+    request = lambda token: indexer.accounts(limit=1000, next_page=token, application_id=app_id)
+    for account_data, _ in iterate_indexer_pages(request, next_page=next_page, prefetch=prefetch):
+        for account in account_data["accounts"]:
+            yield account["address"]
+
+
 def get_accounts_opted_into_app(indexer, app_id):
-    """Submits the signed transactions to network using the algod client
+    """Returns the addresses of accounts opted into app
+
     :param indexer: indexer client
     :type indexer: :class:`IndexerClient`
     :param app_id: application id
@@ -398,14 +806,4 @@ def get_accounts_opted_into_app(indexer, app_id):
     :return: list of accounts opted into app
     :rtype: list
     """
-
-    next_page = ""
-    accounts = []
-    while next_page is not None:
-        account_data = indexer.accounts(limit=1000, next_page=next_page, application_id=app_id)
-        accounts.extend([account["address"] for account in account_data["accounts"]])
-        if "next-token" in account_data:
-            next_page = account_data["next-token"]
-        else:
-            next_page = None
-    return accounts 
\ No newline at end of file
+    return list(iterate_accounts_opted_into_app(indexer, app_id)) 
\ No newline at end of file
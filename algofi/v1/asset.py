@@ -3,13 +3,13 @@ import base64
 from algosdk import encoding
 from algosdk.v2client.algod import AlgodClient
 from algosdk.v2client.indexer import IndexerClient
-from ..utils import read_local_state, read_global_state, get_global_state_field
+from ..utils import read_local_state, read_global_state, get_global_state_field, read_asset_info
 from ..contract_strings import algofi_manager_strings as manager_strings
 from ..contract_strings import algofi_market_strings as market_strings
 
 class Asset:
 
-    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, underlying_asset_id, bank_asset_id, oracle_app_id=None, oracle_price_field=None, oracle_price_scale_factor=None):
+    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, underlying_asset_id, bank_asset_id, oracle_app_id=None, oracle_price_field=None, oracle_price_scale_factor=None, underlying_asset_info=None, bank_asset_info=None, price_feed=None):
         """Constructor me.
 
         :param indexer_client: a :class:`IndexerClient` for interacting with the network
@@ -26,6 +26,12 @@ class Asset:
         :type string
         :param oracle_price_scale_factor: price oracle scale factor to dollars
         :type int
+        :param underlying_asset_info: prefetched underlying asset params, fetched from the indexer if not provided
+        :type dict
+        :param bank_asset_info: prefetched bank asset params, fetched from the indexer if not provided
+        :type dict
+        :param price_feed: shared price feed to read current oracle prices from
+        :type :class:`PriceFeed`
         """
 
         self.indexer = indexer_client
@@ -35,21 +41,13 @@ class Asset:
         self.underlying_asset_id = underlying_asset_id
         self.bank_asset_id = bank_asset_id
 
-        if underlying_asset_id != 1:
-            try:
-                underlying_asset_info = self.indexer.asset_info(underlying_asset_id).get("asset",{})
-                self.underlying_asset_info = underlying_asset_info["params"]
-            except:
-                raise Exception("Asset with id " + str(underlying_asset_id) + " does not exist.")
-        else:
-            self.underlying_asset_info = {"decimals":6}
-
-        try:
-            bank_asset_info = self.indexer.asset_info(bank_asset_id).get("asset",{})
-        except:
-            raise Exception("Asset with id " + str(bank_asset_id) + " does not exist.")
+        if underlying_asset_info is None:
+            underlying_asset_info = read_asset_info(self.indexer, underlying_asset_id)
+        self.underlying_asset_info = underlying_asset_info
 
-        self.bank_asset_info = bank_asset_info["params"]
+        if bank_asset_info is None:
+            bank_asset_info = read_asset_info(self.indexer, bank_asset_id)
+        self.bank_asset_info = bank_asset_info
         
         # oracle info
         if oracle_app_id != None:
@@ -58,6 +56,7 @@ class Asset:
         self.oracle_app_id = oracle_app_id
         self.oracle_price_field = oracle_price_field
         self.oracle_price_scale_factor = oracle_price_scale_factor
+        self.price_feed = price_feed
 
     def get_underlying_asset_id(self):
         """Returns underying asset id
@@ -114,19 +113,41 @@ class Asset:
         :rtype: int
         """
         return self.oracle_price_scale_factor
+
+    def get_price_feed(self):
+        """Returns the price feed current prices are read from, None if they are read from the indexer
+
+        :return: price feed
+        :rtype: :class:`PriceFeed`
+        """
+        return self.price_feed
+
+    def set_price_feed(self, price_feed):
+        """Sets the price feed to read current prices from, None to read them from the indexer
+
+        :param price_feed: price feed
+        :type price_feed: :class:`PriceFeed`
+        """
+        self.price_feed = price_feed
     
-    def get_raw_price(self, block=None):
+    def get_raw_price(self, block=None, snapshot=None):
         """Returns the current raw oracle price
 
         :param block: block at which to get historical data
         :type block: int, optional
+        :param snapshot: snapshot to read the oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: oracle price
         :rtype: int
         """
         if self.oracle_app_id == None:
             raise Exception("no oracle app id for asset")
-        if block:
+        if snapshot:
+            return snapshot.get_global_state_field(self.oracle_app_id, self.oracle_price_field)
+        elif block:
             return get_global_state_field(self.historical_indexer, self.oracle_app_id, self.oracle_price_field, block=block)
+        elif self.price_feed:
+            return self.price_feed.get_oracle_raw_price(self.oracle_app_id, self.oracle_price_field)
         else:
             return get_global_state_field(self.indexer, self.oracle_app_id, self.oracle_price_field)
     
@@ -138,30 +159,34 @@ class Asset:
         """
         return self.underlying_asset_info['decimals']
     
-    def get_price(self, block=None):
+    def get_price(self, block=None, snapshot=None):
         """Returns the current oracle price
 
         :param block: block at which to get historical data
         :type block: int, optional
+        :param snapshot: snapshot to read the oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: oracle price
         :rtype: int
         """
         if self.oracle_app_id == None:
             raise Exception("no oracle app id for asset")
-        raw_price = self.get_raw_price(block=block)
+        raw_price = self.get_raw_price(block=block, snapshot=snapshot)
         return float((raw_price * 10**self.get_underlying_decimals()) / (self.get_oracle_price_scale_factor() * 1e3))
     
-    def to_usd(self, amount, block=None):
+    def to_usd(self, amount, block=None, snapshot=None):
         """Return the usd value of the underlying amount (base units)
         
         :param amount: integer amount of base underlying units
         :type amount: int
         :param block: block at which to get historical data
         :type block: int, optional
+        :param snapshot: snapshot to read the oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: usd value
         :rtype: float
         """
-        price = self.get_price(block=block)
+        price = self.get_price(block=block, snapshot=snapshot)
         return float(amount * price / (10**self.get_underlying_decimals()))
 
     def get_scaled_amount(self, amount):
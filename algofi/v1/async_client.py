@@ -0,0 +1,487 @@
+import asyncio
+import base64
+import json
+import aiohttp
+from urllib import parse
+from algosdk import constants, encoding
+from algosdk.error import IndexerHTTPError
+from ..utils import get_ordered_symbols, get_manager_app_id, get_market_app_id, get_init_round, get_staking_contracts, format_state
+from ..contract_strings import algofi_manager_strings as manager_strings
+from ..contract_strings import algofi_market_strings as market_strings
+
+from .manager import Manager
+from .market import Market
+from .staking_contract import StakingContract
+from .snapshot import ProtocolSnapshot, get_protocol_app_ids
+
+
+class AsyncIndexerClient:
+
+    def __init__(self, indexer_token, indexer_address, headers=None, max_connections=100):
+        """Constructor method for an asyncio indexer client sharing one pooled keep-alive session.
+        The session is opened on the first request and must be released with :meth:`close`.
+
+        :param indexer_token: indexer api token
+        :type indexer_token: string
+        :param indexer_address: indexer url
+        :type indexer_address: string
+        :param headers: extra headers sent with every request
+        :type headers: dict, optional
+        :param max_connections: maximum number of pooled connections
+        :type max_connections: int, optional
+        """
+        self.indexer_token = indexer_token
+        self.indexer_address = indexer_address.rstrip("/")
+        self.headers = dict(headers or {})
+        if indexer_token:
+            self.headers["X-Indexer-API-Token"] = indexer_token
+        self.max_connections = max_connections
+        self.session = None
+
+    async def indexer_request(self, path, params=None):
+        """Returns the decoded json response of a GET request to the indexer v2 api
+
+        :param path: request path relative to /v2
+        :type path: string
+        :param params: query parameters
+        :type params: dict, optional
+        :return: response body
+        :rtype: dict
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(headers=self.headers, connector=aiohttp.TCPConnector(limit=self.max_connections))
+        url = self.indexer_address + ("" if path in constants.unversioned_paths else "/v2") + path
+        if params:
+            url = url + "?" + parse.urlencode({key : value for key, value in params.items() if value is not None})
+        async with self.session.get(url) as response:
+            raw_body = await response.read()
+            status = response.status
+        try:
+            body = json.loads(raw_body)
+        except ValueError:
+            # gateways and proxies answer errors with html or plain text bodies
+            raise IndexerHTTPError(raw_body.decode("utf-8", errors="replace") or "HTTP status " + str(status))
+        if status != 200:
+            raise IndexerHTTPError(body.get("message", str(body)) if isinstance(body, dict) else str(body))
+        return body
+
+    async def health(self):
+        return await self.indexer_request("/health")
+
+    async def applications(self, application_id, round_num=None):
+        return await self.indexer_request("/applications/" + str(application_id), {"round" : round_num})
+
+    async def account_info(self, address, round_num=None):
+        return await self.indexer_request("/accounts/" + address, {"round" : round_num})
+
+    async def asset_info(self, asset_id):
+        return await self.indexer_request("/assets/" + str(asset_id))
+
+    async def accounts(self, limit=None, next_page=None, application_id=None):
+        return await self.indexer_request("/accounts", {"limit" : limit, "next" : next_page or None, "application-id" : application_id})
+
+    async def close(self):
+        """Closes the pooled session
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class SnapshotOnlyIndexer:
+    """Stands in for the indexer client of the objects built by :class:`AsyncClient`. They only serve getters
+    and snapshot reads, so any read that would reach the network raises a descriptive error instead.
+    """
+
+    def _raise(self, *args, **kwargs):
+        raise Exception("Objects loaded by AsyncClient make no network requests, pass a snapshot or use the AsyncClient methods")
+
+    applications = _raise
+    account_info = _raise
+    asset_info = _raise
+    accounts = _raise
+    health = _raise
+
+
+class AsyncClient:
+
+    def __init__(self, indexer_client: AsyncIndexerClient, historical_indexer_client: AsyncIndexerClient, user_address, chain):
+        """Constructor method for the asyncio client. Mirrors the read api of :class:`Client`, issuing
+        independent reads concurrently over a pooled session. Call :meth:`load` (or use :meth:`create`)
+        before reading, the :class:`Manager`, :class:`Market` and :class:`StakingContract` objects it
+        builds only serve getters and make no network requests of their own.
+
+        :param indexer_client: a :class:`AsyncIndexerClient` for interacting with the network
+        :type indexer_client: :class:`AsyncIndexerClient`
+        :param historical_indexer_client: a :class:`AsyncIndexerClient` for interacting with the network historically
+        :type historical_indexer_client: :class:`AsyncIndexerClient`
+        :param user_address: address of the user
+        :type user_address: string
+        :param chain: network type
+        :type chain: string
+        """
+        self.indexer = indexer_client
+        self.historical_indexer = historical_indexer_client
+        self.chain = chain
+        self.user_address = user_address
+
+        self.init_round = get_init_round(self.chain)
+        self.active_ordered_symbols = get_ordered_symbols(self.chain)
+        self.max_ordered_symbols = get_ordered_symbols(self.chain, max=True)
+        self.max_atomic_opt_in_ordered_symbols = get_ordered_symbols(self.chain, max_atomic_opt_in=True)
+        self.staking_contract_info = get_staking_contracts(self.chain)
+
+        self.manager = None
+        self.markets = {}
+        self.staking_contracts = {}
+
+    @classmethod
+    async def create(cls, *args, **kwargs):
+        """Returns a loaded client, arguments are passed to the constructor
+
+        :return: loaded client
+        :rtype: :class:`AsyncClient`
+        """
+        client = cls(*args, **kwargs)
+        await client.load()
+        return client
+
+    async def __aenter__(self):
+        if self.manager is None:
+            await self.load()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Closes the pooled sessions of the indexer clients
+        """
+        await self.indexer.close()
+        if self.historical_indexer is not self.indexer:
+            await self.historical_indexer.close()
+
+    async def load(self):
+        """Builds the manager, markets and staking contracts from concurrent reads of every application and asset
+        """
+        manager_app_id = get_manager_app_id(self.chain)
+        market_app_ids = {symbol : get_market_app_id(self.chain, symbol) for symbol in self.max_ordered_symbols}
+        app_ids = [manager_app_id] + list(market_app_ids.values())
+        for info in self.staking_contract_info.values():
+            app_ids += [info.get("managerAppId"), info.get("marketAppId")]
+        app_ids = list(dict.fromkeys(app_ids))
+        states = dict(zip(app_ids, await asyncio.gather(*[self.read_global_state(app_id) for app_id in app_ids])))
+
+        asset_ids = []
+        for state in states.values():
+            if state.get(market_strings.asset_id, None):
+                asset_ids += [state[market_strings.asset_id], state[market_strings.bank_asset_id]]
+        asset_ids = list(dict.fromkeys(asset_ids))
+        asset_infos = dict(zip(asset_ids, await asyncio.gather(*[self.read_asset_info(asset_id) for asset_id in asset_ids])))
+
+        indexer_client = SnapshotOnlyIndexer()
+        self.manager = Manager(indexer_client, indexer_client, manager_app_id, manager_state=states[manager_app_id])
+        self.markets = {symbol : Market(indexer_client, indexer_client, app_id, market_state=states[app_id], asset_infos=asset_infos) \
+                        for symbol, app_id in market_app_ids.items()}
+        self.staking_contracts = {name : StakingContract(indexer_client, indexer_client, info,
+                                                         manager_state=states[info.get("managerAppId")],
+                                                         market_state=states[info.get("marketAppId")],
+                                                         asset_infos=asset_infos) \
+                                  for name, info in self.staking_contract_info.items()}
+
+    async def update_global_state(self):
+        """Refreshes the manager, market and staking contract global state from one concurrent snapshot
+        """
+        snapshot = await self.get_snapshot()
+        self.manager.update_global_state(manager_state=snapshot.get_global_state(self.manager.get_manager_app_id()))
+        for market in self.markets.values():
+            market.update_global_state(market_state=snapshot.get_global_state(market.get_market_app_id()))
+        for staking_contract in self.staking_contracts.values():
+            staking_contract.get_manager().update_global_state(manager_state=snapshot.get_global_state(staking_contract.get_manager_app_id()))
+            staking_contract.get_market().update_global_state(market_state=snapshot.get_global_state(staking_contract.get_market_app_id()))
+
+    # INDEXER HELPERS
+
+    async def read_global_state(self, app_id, block=None):
+        """Returns dict of global state for application with the given app_id
+
+        :param app_id: id of the application
+        :type app_id: int
+        :param block: block at which to query historical data
+        :type block: int, optional
+        :return: dict of global state for application with id app_id
+        :rtype: dict
+        """
+        indexer_client = self.historical_indexer if block else self.indexer
+        try:
+            application_info = (await indexer_client.applications(app_id, round_num=block)).get("application", {})
+        except IndexerHTTPError:
+            raise Exception("Application does not exist.")
+        return format_state(application_info["params"]["global-state"])
+
+    async def read_local_state(self, address, app_id, block=None):
+        """Returns dict of local state for address for application with id app_id
+
+        :param address: address of account for which to get state
+        :type address: string
+        :param app_id: id of the application
+        :type app_id: int
+        :param block: block at which to get the historical local state
+        :type block: int, optional
+        :return: dict of local state of address for application with id app_id
+        :rtype: dict
+        """
+        indexer_client = self.historical_indexer if block else self.indexer
+        try:
+            results = (await indexer_client.account_info(address, round_num=block)).get("account", {})
+        except IndexerHTTPError:
+            raise Exception("Account does not exist.")
+        for local_state in results.get("apps-local-state", []):
+            if local_state["id"] == app_id:
+                return format_state(local_state.get("key-value", []))
+        return {}
+
+    async def read_asset_info(self, asset_id):
+        """Returns params of the asset with the given asset_id
+
+        :param asset_id: id of the asset
+        :type asset_id: int
+        :return: dict of asset params
+        :rtype: dict
+        """
+        if asset_id == 1:
+            return {"decimals": 6}
+        try:
+            return (await self.indexer.asset_info(asset_id)).get("asset", {})["params"]
+        except (IndexerHTTPError, KeyError):
+            raise Exception("Asset with id " + str(asset_id) + " does not exist.")
+
+    async def get_snapshot(self, storage_addresses=None, block=None):
+        """Returns an immutable snapshot of manager, market and oracle global state plus the local state
+        of the given storage addresses, with every request issued concurrently at the same round, the
+        indexer's latest round when no block is given
+
+        :param storage_addresses: storage addresses to capture local state for
+        :type storage_addresses: list, optional
+        :param block: block at which to capture historical state
+        :type block: int, optional
+        :return: protocol snapshot
+        :rtype: :class:`ProtocolSnapshot`
+        """
+        indexer_client = self.historical_indexer if block else self.indexer
+        round = block if block is not None else (await indexer_client.health())["round"]
+        app_ids = get_protocol_app_ids(self)
+        storage_addresses = list(dict.fromkeys(storage_addresses or []))
+        application_responses, account_responses = await asyncio.gather(
+            asyncio.gather(*[indexer_client.applications(app_id, round_num=round) for app_id in app_ids]),
+            asyncio.gather(*[indexer_client.account_info(address, round_num=round) for address in storage_addresses]))
+        return ProtocolSnapshot.from_responses(application_responses, account_responses, block=round)
+
+    async def get_storage_accounts(self, staking_contract_name=None, verbose=False):
+        """Returns a list of storage accounts for the given manager app id
+
+        :param staking_contract_name: name of staking contract to get storage accounts for, defaults to the lending protocol
+        :type staking_contract_name: string, optional
+        :param verbose: return full account information instead of addresses
+        :type verbose: boolean, optional
+        :return: list of storage accounts
+        :rtype: list
+        """
+        next_page = ""
+        accounts = []
+        user_address = base64.b64encode(bytes(manager_strings.user_address, "utf-8")).decode("utf-8")
+
+        if staking_contract_name is None:
+            app_id = list(self.get_active_markets().values())[0].get_market_app_id()
+        else:
+            app_id = self.get_staking_contract(staking_contract_name).get_manager_app_id()
+
+        while next_page is not None:
+            account_data = await self.indexer.accounts(limit=1000, next_page=next_page, application_id=app_id)
+            for account in account_data["accounts"]:
+                for app_local_state in account.get("apps-local-state", []):
+                    if app_local_state["id"] == self.manager.get_manager_app_id() and \
+                       any(field.get("key", None) == user_address for field in app_local_state.get("key-value", [])):
+                        accounts.append(account if verbose else account["address"])
+            next_page = account_data.get("next-token", None)
+        return accounts
+
+    # GETTERS
+
+    def get_manager(self):
+        """Returns the manager object
+
+        :return: manager
+        :rtype: :class:`Manager`
+        """
+        return self.manager
+
+    def get_market(self, symbol):
+        """Returns the market object for the given symbol
+
+        :param symbol: market symbol
+        :type symbol: string
+        :return: market
+        :rtype: :class:`Market`
+        """
+        return self.markets[symbol]
+
+    def get_active_markets(self):
+        """Returns dictionary of active markets by symbol
+
+        :return: markets dictionary
+        :rtype: dict
+        """
+        return {symbol : market for symbol, market in self.markets.items() if symbol in self.active_ordered_symbols}
+
+    def get_staking_contract(self, name):
+        """Returns the staking contract object
+
+        :param name: staking contract name
+        :type name: string
+        :return: staking contract
+        :rtype: :class:`StakingContract`
+        """
+        return self.staking_contracts[name]
+
+    def get_staking_contracts(self):
+        """Returns the staking contracts
+
+        :return: staking contracts dictionary
+        :rtype: dict
+        """
+        return self.staking_contracts
+
+    def get_active_ordered_symbols(self):
+        """Returns the list of symbols of the active assets
+
+        :return: list of symbols for active assets
+        :rtype: list
+        """
+        return self.active_ordered_symbols
+
+    async def get_raw_prices(self):
+        """Returns a dictionary of raw oracle prices of the active assets, with every oracle read concurrently
+
+        :return: dictionary of int prices
+        :rtype: dict
+        """
+        markets = self.get_active_markets()
+        states = await asyncio.gather(*[self.read_global_state(market.get_asset().get_oracle_app_id()) for market in markets.values()])
+        return {symbol : state[market.get_asset().get_oracle_price_field()] for (symbol, market), state in zip(markets.items(), states)}
+
+    async def get_prices(self):
+        """Returns a dictionary of dollarized float prices of the active assets, with every oracle read concurrently
+
+        :return: dictionary of float prices
+        :rtype: dict
+        """
+        raw_prices = await self.get_raw_prices()
+        result = {}
+        for symbol, market in self.get_active_markets().items():
+            asset = market.get_asset()
+            result[symbol] = float((raw_prices[symbol] * 10**asset.get_underlying_decimals()) / (asset.get_oracle_price_scale_factor() * 1e3))
+        return result
+
+    # USER STATE GETTERS
+
+    async def get_storage_address(self, address=None):
+        """Returns the storage address for the given address
+
+        :param address: address to get info for, defaults to the client user address
+        :type address: string, optional
+        :return: storage account address for user
+        :rtype: string
+        """
+        if not address:
+            address = self.user_address
+        user_manager_state = await self.read_local_state(address, self.manager.get_manager_app_id())
+        raw_storage_address = user_manager_state.get(manager_strings.user_storage_address, None)
+        if not raw_storage_address:
+            raise Exception("No storage address found")
+        return encoding.encode_address(base64.b64decode(raw_storage_address.strip()))
+
+    async def get_storage_state(self, storage_address=None, block=None, include_manager=True):
+        """Returns a dictionary with the lending market state for a given storage address. The storage
+        account and all market and oracle states are read concurrently.
+
+        :param storage_address: address to get info for. If None will use the storage address of the client user
+        :type storage_address: string, optional
+        :param block: block at which to get historical data
+        :type block: int, optional
+        :param include_manager: include the manager local state, defaults to True
+        :type include_manager: boolean, optional
+        :return: state
+        :rtype: dict
+        """
+        if not storage_address:
+            storage_address = await self.get_storage_address()
+        snapshot = await self.get_snapshot([storage_address], block=block)
+        result = {}
+        manager = self.manager.at_snapshot(snapshot)
+        if include_manager:
+            result["manager"] = manager.get_storage_state(storage_address, snapshot=snapshot)
+        for symbol in self.active_ordered_symbols[:manager.get_supported_market_count()]:
+            result[symbol] = self.markets[symbol].get_storage_state(storage_address, snapshot=snapshot)
+        return result
+
+    async def get_user_state(self, address=None):
+        """Returns a dictionary with the lending market state for a given address (must be opted in)
+
+        :param address: address to get info for. If None will use address supplied when creating client
+        :type address: string, optional
+        :return: state
+        :rtype: dict
+        """
+        return await self.get_storage_state(await self.get_storage_address(address))
+
+    async def get_user_staking_contract_state(self, staking_contract_name, address=None):
+        """Returns a dictionary with the staking contract state for the named staking contract and selected address
+
+        :param staking_contract_name: name of staking contract to query
+        :type staking_contract_name: string
+        :param address: address to get info for. If None will use address supplied when creating client
+        :type address: string, optional
+        :return: state
+        :rtype: dict
+        """
+        if not address:
+            address = self.user_address
+        staking_contract = self.get_staking_contract(staking_contract_name)
+        user_manager_state = await self.read_local_state(address, staking_contract.get_manager_app_id())
+        raw_storage_address = user_manager_state.get(manager_strings.user_storage_address, None)
+        if not raw_storage_address:
+            raise Exception("no storage address found")
+        storage_address = encoding.encode_address(base64.b64decode(raw_storage_address.strip()))
+        snapshot = await self.get_snapshot([storage_address])
+        return staking_contract.get_storage_state(storage_address, snapshot=snapshot)
+
+
+class AsyncAlgofiTestnetClient(AsyncClient):
+    def __init__(self, indexer_client=None, user_address=None):
+        """Constructor method for the testnet asyncio client.
+
+        :param indexer_client: a :class:`AsyncIndexerClient` for interacting with the network
+        :type indexer_client: :class:`AsyncIndexerClient`
+        :param user_address: address of the user
+        :type user_address: string
+        """
+        historical_indexer_client = AsyncIndexerClient("", "https://indexer.testnet.algoexplorerapi.io/", headers={"User-Agent": "algosdk"})
+        if indexer_client is None:
+            indexer_client = AsyncIndexerClient("", "https://algoindexer.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
+        super().__init__(indexer_client, historical_indexer_client=historical_indexer_client, user_address=user_address, chain="testnet")
+
+
+class AsyncAlgofiMainnetClient(AsyncClient):
+    def __init__(self, indexer_client=None, user_address=None):
+        """Constructor method for the mainnet asyncio client.
+
+        :param indexer_client: a :class:`AsyncIndexerClient` for interacting with the network
+        :type indexer_client: :class:`AsyncIndexerClient`
+        :param user_address: address of the user
+        :type user_address: string
+        """
+        historical_indexer_client = AsyncIndexerClient("", "https://indexer.algoexplorerapi.io/", headers={"User-Agent": "algosdk"})
+        if indexer_client is None:
+            indexer_client = AsyncIndexerClient("", "https://algoindexer.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
+        super().__init__(indexer_client, historical_indexer_client=historical_indexer_client, user_address=user_address, chain="mainnet")
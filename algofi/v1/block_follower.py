@@ -0,0 +1,221 @@
+import time
+from algosdk.error import AlgodHTTPError
+from ..utils import read_global_states, read_local_states, map_concurrently, get_state_cache
+from .snapshot import get_protocol_app_ids
+
+
+def get_touched(block, app_ids):
+    """Returns the ids in app_ids called by a transaction of the block, including inner transactions, and the
+    sender and foreign accounts of those calls
+
+    :param block: algod block in json format
+    :type block: dict
+    :param app_ids: app ids to look for
+    :type app_ids: set
+    :return: tuple of touched app ids and touched addresses
+    :rtype: (set, set)
+    """
+    touched_app_ids = set()
+    touched_addresses = set()
+    pending = list(block.get("txns", []))
+    while pending:
+        signed_txn = pending.pop()
+        txn = signed_txn.get("txn", {})
+        if txn.get("type", None) == "appl" and txn.get("apid", None) in app_ids:
+            touched_app_ids.add(txn["apid"])
+            touched_addresses.add(txn["snd"])
+            touched_addresses.update(txn.get("apat", []))
+        pending.extend(signed_txn.get("dt", {}).get("itx", []))
+    return touched_app_ids, touched_addresses
+
+
+class BlockFollower:
+
+    def __init__(self, client, storage_addresses=None, max_workers=None, poll_interval=1):
+        """Constructor method for a follower keeping the client's manager, market, oracle and storage account
+        state current block by block. Each new block is read from algod and only the applications it calls
+        and the tracked storage accounts it touches are re-read, so the cost of following tracks protocol
+        activity rather than total state size. State is re-read from the historical indexer at the round of
+        the block, so every applied round holds the state as of that round even when catching up.
+
+        :param client: client for the protocol, its algod client is used to follow the chain
+        :type client: :class:`Client`
+        :param storage_addresses: storage addresses to keep local state for
+        :type storage_addresses: list, optional
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        :param poll_interval: seconds to wait for the indexer when it is behind algod
+        :type poll_interval: float, optional
+        """
+        self.client = client
+        self.algod = client.algod
+        self.indexer = client.historical_indexer
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.storage_addresses = set(storage_addresses or [])
+        self.subscribers = []
+        self.snapshot = client.get_snapshot(list(self.storage_addresses), max_workers=max_workers)
+        client.load_snapshot(self.snapshot)
+        self.round = self.snapshot.get_round()
+        self.update_app_index()
+
+    def update_app_index(self):
+        """Rebuilds the map of app id to the manager and market objects following it. Oracle ids are market
+        parameters, so the map is rebuilt after every market update.
+        """
+        self.app_ids = set(get_protocol_app_ids(self.client))
+        self.managers = {self.client.get_manager().get_manager_app_id() : [self.client.get_manager()]}
+        self.markets = {}
+        for market in self.client.markets.values():
+            self.markets.setdefault(market.get_market_app_id(), []).append(market)
+        for staking_contract in self.client.get_staking_contracts().values():
+            self.managers.setdefault(staking_contract.get_manager_app_id(), []).append(staking_contract.get_manager())
+            self.markets.setdefault(staking_contract.get_market_app_id(), []).append(staking_contract.get_market())
+
+    # GETTERS
+
+    def get_round(self):
+        """Returns the last round applied
+
+        :return: round
+        :rtype: int
+        """
+        return self.round
+
+    def get_snapshot(self):
+        """Returns the snapshot of the state as of the last round applied
+
+        :return: protocol snapshot
+        :rtype: :class:`ProtocolSnapshot`
+        """
+        return self.snapshot
+
+    # SUBSCRIPTIONS
+
+    def subscribe(self, callback):
+        """Registers a function called after every applied round with (round, app_ids, storage_addresses),
+        the applications and tracked storage accounts that were re-read
+
+        :param callback: function to call
+        :type callback: callable
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Removes every registration of callback
+
+        :param callback: function to remove
+        :type callback: callable
+        """
+        self.subscribers = [subscriber for subscriber in self.subscribers if subscriber != callback]
+
+    def track(self, storage_address):
+        """Starts keeping local state for storage_address, reading it immediately
+
+        :param storage_address: storage address to track
+        :type storage_address: string
+        """
+        self.storage_addresses.add(storage_address)
+        self.snapshot = self.snapshot.updated(self.round, local_states=self.read_local_states([storage_address], self.round))
+
+    # UPDATES
+
+    def read_global_states(self, app_ids, block_round):
+        """Returns dict of global state by app id as of block_round, read from the indexer
+
+        :param app_ids: app ids to read
+        :type app_ids: list
+        :param block_round: round to read the state at
+        :type block_round: int
+        :return: dict of global state by app id
+        :rtype: dict
+        """
+        return read_global_states(self.indexer, app_ids, block=block_round, max_workers=self.max_workers)
+
+    def read_local_states(self, addresses, block_round):
+        """Returns dict of local state by app id, by address, as of block_round, read from the indexer
+
+        :param addresses: addresses to read
+        :type addresses: list
+        :param block_round: round to read the state at
+        :type block_round: int
+        :return: dict of local state by app id, by address
+        :rtype: dict
+        """
+        read = lambda address: read_local_states(self.indexer, address, block=block_round)
+        return dict(zip(addresses, map_concurrently(read, addresses, max_workers=self.max_workers)))
+
+    def apply_block(self, block):
+        """Applies one block, re-reading the applications and tracked storage accounts it touches from the
+        indexer at the block's round. Blocks must be applied in order, once the indexer has reached them.
+
+        :param block: algod block in json format
+        :type block: dict
+        :return: tuple of re-read app ids and storage addresses
+        :rtype: (list, list)
+        """
+        block_round = block.get("rnd", self.round + 1)
+        app_ids, addresses = get_touched(block, self.app_ids)
+        app_ids = sorted(app_ids)
+        addresses = sorted(addresses & self.storage_addresses)
+
+        global_states = self.read_global_states(app_ids, block_round)
+        local_states = self.read_local_states(addresses, block_round)
+        self.snapshot = self.snapshot.updated(block_round, global_states=global_states, local_states=local_states)
+        self.round = block_round
+
+        for app_id, state in global_states.items():
+            for manager in self.managers.get(app_id, []):
+                manager.update_global_state(manager_state=state)
+            for market in self.markets.get(app_id, []):
+                market.update_global_state(market_state=state)
+        if any(app_id in self.markets for app_id in app_ids):
+            self.update_app_index()
+            # a market moved to a new oracle, start following it
+            new_app_ids = [app_id for app_id in self.app_ids if app_id not in self.snapshot.get_app_ids()]
+            if new_app_ids:
+                self.snapshot = self.snapshot.updated(block_round, global_states=self.read_global_states(new_app_ids, block_round))
+                app_ids += new_app_ids
+
+        state_cache = get_state_cache()
+        if state_cache:
+            for app_id in app_ids:
+                state_cache.invalidate(app_id=app_id)
+            for address in addresses:
+                state_cache.invalidate(address=address)
+
+        for callback in self.subscribers:
+            callback(block_round, app_ids, addresses)
+        return app_ids, addresses
+
+    def step(self):
+        """Waits for a round after the last applied round and applies every new block the indexer has reached
+
+        :return: list of applied rounds
+        :rtype: list
+        """
+        status = self.algod.status_after_block(self.round)
+        last_round = min(status["last-round"], self.indexer.health()["round"])
+        if last_round <= self.round:
+            # algod is ahead of the indexer, wait for it to catch up
+            time.sleep(self.poll_interval)
+            return []
+        applied = []
+        for block_round in range(self.round + 1, last_round + 1):
+            try:
+                block = self.algod.block_info(block_round)["block"]
+            except AlgodHTTPError as e:
+                raise Exception("Block " + str(block_round) + " is not available: " + str(e))
+            block.setdefault("rnd", block_round)
+            self.apply_block(block)
+            applied.append(block_round)
+        return applied
+
+    def run(self, stop=None):
+        """Follows the chain until stop returns True, checked after every step
+
+        :param stop: function of no arguments returning True to stop following
+        :type stop: callable, optional
+        """
+        while not (stop and stop()):
+            self.step()
@@ -5,13 +5,22 @@ from algosdk.v2client.algod import AlgodClient
 from algosdk.v2client.indexer import IndexerClient
 from algosdk.error import AlgodHTTPError
 from ..utils import read_local_state, read_global_state, wait_for_confirmation, get_ordered_symbols, \
-get_manager_app_id, get_market_app_id, get_init_round, get_staking_contracts
+get_manager_app_id, get_market_app_id, get_init_round, get_staking_contracts, read_global_states, read_asset_infos, format_state, \
+get_contract_registry, iterate_indexer_pages
 from ..contract_strings import algofi_manager_strings as manager_strings
 from ..contract_strings import algofi_market_strings as market_strings
+from ..suggested_params import SuggestedParamsProvider
 
 from .manager import Manager
 from .market import Market
 from .staking_contract import StakingContract
+from .snapshot import ProtocolSnapshot
+from .storage_index import StorageAddressIndex
+from .block_follower import BlockFollower
+from .positions import PositionBook
+from .liquidation import LiquidationScanner, get_liquidate_update_fee
+from .preflight import PreflightChecker
+from .price_feed import PriceFeed, DEFAULT_TTL as DEFAULT_PRICE_TTL
 
 from .optin import prepare_manager_app_optin_transactions
 from .add_collateral import prepare_add_collateral_transactions
@@ -38,7 +47,7 @@ from .staking import prepare_staking_contract_optin_transactions, \
 
 class Client:
 
-    def __init__(self, algod_client: AlgodClient, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, user_address, chain):
+    def __init__(self, algod_client: AlgodClient, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, user_address, chain, parallel=False, max_workers=None, params_provider=None):
         """Constructor method for the generic client.
 
         :param algod_client: a :class:`AlgodClient` for interacting with the network
@@ -51,6 +60,13 @@ class Client:
         :type user_address: string
         :param chain: network type
         :type chain: string
+        :param parallel: fetch all application and asset info concurrently on construction, defaults to False
+        :type parallel: boolean, optional
+        :param max_workers: maximum number of concurrent requests when parallel is set, defaults to one per request
+        :type max_workers: int, optional
+        :param params_provider: provider of suggested params shared by the transaction builders, defaults to one fetching
+            fresh params on every call. Pass a :class:`SuggestedParamsProvider` with a TTL to share one algod request per round.
+        :type params_provider: :class:`SuggestedParamsProvider`, optional
         """
         
         # constants
@@ -63,6 +79,7 @@ class Client:
         self.indexer = indexer_client
         self.historical_indexer = historical_indexer_client
         self.chain = chain
+        self.params_provider = params_provider if params_provider else SuggestedParamsProvider(algod_client, ttl=0)
 
         # user info
         self.user_address = user_address
@@ -71,23 +88,57 @@ class Client:
         self.active_ordered_symbols = get_ordered_symbols(self.chain)
         self.max_ordered_symbols = get_ordered_symbols(self.chain, max=True)
         self.max_atomic_opt_in_ordered_symbols = get_ordered_symbols(self.chain, max_atomic_opt_in=True)
-        
-        # manager info
-        self.manager = Manager(self.indexer, self.historical_indexer, get_manager_app_id(self.chain))
-        
-        # market info
-        self.markets = {symbol : Market(self.indexer, self.historical_indexer, get_market_app_id(self.chain, symbol)) for symbol in self.max_ordered_symbols}
-        
-        # staking contract info
         self.staking_contract_info = get_staking_contracts(self.chain)
-        self.staking_contracts = {name : StakingContract(self.indexer, self.historical_indexer, self.staking_contract_info[name]) for name in self.staking_contract_info.keys()}
+        self.oracle_app_id_to_symbol = {}
+        self.price_feed = None
+
+        if parallel:
+            self.load_protocol_state(max_workers=max_workers)
+        else:
+            # manager info
+            self.manager = Manager(self.indexer, self.historical_indexer, get_manager_app_id(self.chain))
+
+            # market info
+            self.markets = {symbol : Market(self.indexer, self.historical_indexer, get_market_app_id(self.chain, symbol)) for symbol in self.max_ordered_symbols}
+
+            # staking contract info
+            self.staking_contracts = {name : StakingContract(self.indexer, self.historical_indexer, self.staking_contract_info[name]) for name in self.staking_contract_info.keys()}
         
+    def load_protocol_state(self, max_workers=None):
+        """Builds the manager, markets and staking contracts from concurrent reads of every application and asset
+
+        :param max_workers: maximum number of concurrent requests, defaults to one per request
+        :type max_workers: int, optional
+        """
+        manager_app_id = get_manager_app_id(self.chain)
+        market_app_ids = {symbol : get_market_app_id(self.chain, symbol) for symbol in self.max_ordered_symbols}
+        app_ids = [manager_app_id] + list(market_app_ids.values())
+        for info in self.staking_contract_info.values():
+            app_ids += [info.get("managerAppId"), info.get("marketAppId")]
+        states = read_global_states(self.indexer, app_ids, max_workers=max_workers)
+
+        asset_ids = []
+        for state in states.values():
+            if state.get(market_strings.asset_id, None):
+                asset_ids += [state[market_strings.asset_id], state[market_strings.bank_asset_id]]
+        asset_infos = read_asset_infos(self.indexer, asset_ids, max_workers=max_workers)
+
+        self.manager = Manager(self.indexer, self.historical_indexer, manager_app_id, manager_state=states[manager_app_id])
+        self.markets = {symbol : Market(self.indexer, self.historical_indexer, app_id, market_state=states[app_id], asset_infos=asset_infos) \
+                        for symbol, app_id in market_app_ids.items()}
+        self.staking_contracts = {name : StakingContract(self.indexer, self.historical_indexer, info,
+                                                         manager_state=states[info.get("managerAppId")],
+                                                         market_state=states[info.get("marketAppId")],
+                                                         asset_infos=asset_infos) \
+                                  for name, info in self.staking_contract_info.items()}
+
     # HELPER FUNCTIONS
 
     def get_default_params(self):
-        """Initializes the transactions parameters for the client.
+        """Initializes the transactions parameters for the client. Params come from the client's
+        params provider, which fetches them from algod on every call unless it was given a TTL.
         """
-        params = self.algod.suggested_params()
+        params = self.params_provider.get_suggested_params()
         params.flat_fee = True
         params.fee = 1000
         return params
@@ -194,12 +245,17 @@ class Client:
             result[symbol] = self.markets[symbol].get_storage_state(storage_address)
         return result
     
-    def get_storage_state(self, storage_address=None, block=None, include_manager=True):
+    def get_storage_state(self, storage_address=None, block=None, include_manager=True, snapshot=None):
         """Returns a dictionary with the lending market state for a given storage address
 
         :param storage_address: address to get info for. If None will use address supplied when creating client
         :type storage_address: string
-
+        :param block: block at which to get historical data
+        :type block: int, optional
+        :param include_manager: include the manager local state, defaults to True
+        :type include_manager: boolean, optional
+        :param snapshot: snapshot to read protocol and local state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: state
         :rtype: dict
         """
@@ -207,11 +263,12 @@ class Client:
         if not storage_address:
             storage_address = self.manager.get_storage_address(self.user_address)
         if include_manager:
-            result["manager"] = self.manager.get_storage_state(storage_address, block=block)
-        supported_market_count = self.manager.get_supported_market_count(block=block)
+            result["manager"] = self.manager.get_storage_state(storage_address, block=block, snapshot=snapshot)
+        manager = self.manager.at_snapshot(snapshot) if snapshot else self.manager
+        supported_market_count = manager.get_supported_market_count(block=block)
         active_markets = self.active_ordered_symbols[:supported_market_count]
         for symbol in active_markets:
-            result[symbol] = self.markets[symbol].get_storage_state(storage_address, block=block)
+            result[symbol] = self.markets[symbol].get_storage_state(storage_address, block=block, snapshot=snapshot)
         return result
     
     def get_user_staking_contract_state(self, staking_contract_name, address=None):
@@ -248,6 +305,53 @@ class Client:
         :rtype: :class:`Market`
         """
         return self.markets[symbol]
+
+    def get_market_by_app_id(self, market_app_id):
+        """Returns the market object for the given market app id or None if it is not a market of the client
+
+        :param market_app_id: market app id
+        :type market_app_id: int
+        :return: market
+        :rtype: :class:`Market`
+        """
+        return self.markets.get(get_contract_registry().get_symbol_by_market_app_id(self.chain, market_app_id), None)
+
+    def get_market_by_asset_id(self, asset_id):
+        """Returns the market object for the given underlying asset id or None if there is none.
+        ALGO is the underlying of both the ALGO and vALGO markets and returns the ALGO market.
+
+        :param asset_id: underlying asset id
+        :type asset_id: int
+        :return: market
+        :rtype: :class:`Market`
+        """
+        return self.markets.get(get_contract_registry().get_symbol_by_asset_id(self.chain, asset_id), None)
+
+    def get_market_by_bank_asset_id(self, bank_asset_id):
+        """Returns the market object for the given bank asset id or None if there is none
+
+        :param bank_asset_id: bank asset id
+        :type bank_asset_id: int
+        :return: market
+        :rtype: :class:`Market`
+        """
+        return self.markets.get(get_contract_registry().get_symbol_by_bank_asset_id(self.chain, bank_asset_id), None)
+
+    def get_market_by_oracle_app_id(self, oracle_app_id):
+        """Returns the first market in symbol order priced by the given oracle or None if there is none.
+        Oracle ids are market parameters read from chain, so the lookup table is rebuilt on a miss.
+
+        :param oracle_app_id: oracle app id
+        :type oracle_app_id: int
+        :return: market
+        :rtype: :class:`Market`
+        """
+        if oracle_app_id not in self.oracle_app_id_to_symbol:
+            self.oracle_app_id_to_symbol = {}
+            for symbol, market in self.markets.items():
+                if market.get_asset():
+                    self.oracle_app_id_to_symbol.setdefault(market.get_asset().get_oracle_app_id(), symbol)
+        return self.markets.get(self.oracle_app_id_to_symbol.get(oracle_app_id, None), None)
     
     def get_active_markets(self):
         """Returns dictionary of active markets by symbol
@@ -326,32 +430,196 @@ class Client:
         """
         return self.active_ordered_symbols
 
-    def get_raw_prices(self):
+    def get_raw_prices(self, snapshot=None):
         """Returns a dictionary of raw oracle prices of the active assets pulled from their oracles
 
+        :param snapshot: snapshot to read oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: dictionary of int prices
         :rtype: dict
         """
-        return {symbol : market.get_asset().get_raw_price() for symbol, market in self.get_active_markets().items()}
+        return {symbol : market.get_asset().get_raw_price(snapshot=snapshot) for symbol, market in self.get_active_markets().items()}
 
-    def get_prices(self):
+    def get_prices(self, snapshot=None):
         """Returns a dictionary of dollarized float prices of the active assets pulled from their oracles
 
+        :param snapshot: snapshot to read oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: dictionary of int prices
         :rtype: dict
         """
-        return {symbol : market.get_asset().get_price() for symbol, market in self.get_active_markets().items()}
+        return {symbol : market.get_asset().get_price(snapshot=snapshot) for symbol, market in self.get_active_markets().items()}
+
+    # SNAPSHOTS
+
+    def get_snapshot(self, storage_addresses=None, block=None, max_workers=None):
+        """Returns an immutable snapshot of manager, market and oracle global state plus the local state
+        of the given storage addresses, captured in one concurrent sweep
+
+        :param storage_addresses: storage addresses to capture local state for
+        :type storage_addresses: list, optional
+        :param block: block at which to capture historical state
+        :type block: int, optional
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        :return: protocol snapshot
+        :rtype: :class:`ProtocolSnapshot`
+        """
+        return ProtocolSnapshot.capture(self, storage_addresses=storage_addresses, block=block, max_workers=max_workers)
+
+    def load_snapshot(self, snapshot):
+        """Loads the manager, market and staking contract global state from a snapshot so that getters
+        return the snapshot values without further network requests
+
+        :param snapshot: snapshot to load
+        :type snapshot: :class:`ProtocolSnapshot`
+        """
+        self.manager.update_global_state(manager_state=snapshot.get_global_state(self.manager.get_manager_app_id()))
+        for market in self.markets.values():
+            market.update_global_state(market_state=snapshot.get_global_state(market.get_market_app_id()))
+        for staking_contract in self.staking_contracts.values():
+            staking_contract.get_manager().update_global_state(manager_state=snapshot.get_global_state(staking_contract.get_manager_app_id()))
+            staking_contract.get_market().update_global_state(market_state=snapshot.get_global_state(staking_contract.get_market_app_id()))
+
+    def get_block_follower(self, storage_addresses=None, max_workers=None):
+        """Returns a follower keeping this client's state and a snapshot current block by block from algod
+
+        :param storage_addresses: storage addresses to keep local state for
+        :type storage_addresses: list, optional
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        :return: block follower
+        :rtype: :class:`BlockFollower`
+        """
+        return BlockFollower(self, storage_addresses=storage_addresses, max_workers=max_workers)
+
+    def get_position_book(self, snapshot=None):
+        """Returns a compact book of the positions of every storage account of the lending protocol
+
+        :param snapshot: snapshot to value positions against, captured once at the start if not provided
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: position book
+        :rtype: :class:`PositionBook`
+        """
+        return PositionBook.from_client(self, snapshot=snapshot)
+
+    def get_liquidation_scanner(self, snapshot=None):
+        """Returns a scanner ranking the liquidation opportunities of every storage account of the lending protocol
+
+        :param snapshot: snapshot to value positions against, captured once at the start if not provided
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: liquidation scanner
+        :rtype: :class:`LiquidationScanner`
+        """
+        return LiquidationScanner(self, snapshot=snapshot)
+
+    def get_preflight_checker(self, snapshot=None, safety_margin=0.0):
+        """Returns a checker validating borrow, remove collateral and mint amounts offline against cached state
+
+        :param snapshot: snapshot with the storage accounts to check, captured once at the start if not provided
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :param safety_margin: fraction of max borrow held back for price and interest moves
+        :type safety_margin: float, optional
+        :return: preflight checker
+        :rtype: :class:`PreflightChecker`
+        """
+        return PreflightChecker(self, snapshot=snapshot, safety_margin=safety_margin)
+
+    def load_price_feed(self, ttl=DEFAULT_PRICE_TTL, max_workers=None):
+        """Creates a price feed over the oracles of every market and staking contract and sets it on their
+        assets, so every current valuation reads memoized prices refreshed in one sweep per TTL. Prices are
+        named by market symbol, staking contract oracles are tracked unnamed.
+
+        :param ttl: seconds to reuse fetched prices
+        :type ttl: float, optional
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        :return: price feed
+        :rtype: :class:`PriceFeed`
+        """
+        assets = {symbol : market.get_asset() for symbol, market in self.markets.items()
+                  if market.get_asset() and market.get_asset().get_oracle_app_id() != None}
+        self.price_feed = PriceFeed(self.indexer, assets, ttl=ttl, max_workers=max_workers)
+        for asset in assets.values():
+            asset.set_price_feed(self.price_feed)
+        for staking_contract in self.staking_contracts.values():
+            asset = staking_contract.get_market().get_asset()
+            if asset and asset.get_oracle_app_id() != None:
+                self.price_feed.add_oracle(asset.get_oracle_app_id(), asset.get_oracle_price_field())
+                asset.set_price_feed(self.price_feed)
+        return self.price_feed
+
+    def get_price_feed(self):
+        """Returns the price feed set by :meth:`load_price_feed`, None if prices are read from the indexer
+
+        :return: price feed
+        :rtype: :class:`PriceFeed`
+        """
+        return self.price_feed
 
     # INDEXER HELPERS
 
+    def load_storage_index(self, path=None, staking_contract_name=None):
+        """Loads the storage address index of the manager from path if it exists, syncs it with the network
+        and sets it on the manager so get_storage_address skips the indexer for indexed users. The first
+        sync sweeps every opted in account, later syncs only read new opt in transactions.
+
+        :param path: json file to persist the index to between runs
+        :type path: string, optional
+        :param staking_contract_name: name of staking contract to index, defaults to the lending protocol
+        :type staking_contract_name: string, optional
+        :return: storage address index
+        :rtype: :class:`StorageAddressIndex`
+        """
+        manager = self.manager if staking_contract_name is None else self.get_staking_contract(staking_contract_name).get_manager()
+        storage_index = StorageAddressIndex(manager.get_manager_app_id(), path=path)
+        storage_index.sync(self.indexer)
+        if path:
+            storage_index.save()
+        manager.set_storage_index(storage_index)
+        return storage_index
+
     def get_storage_accounts(self, staking_contract_name=None, verbose=False):
         """Returns a list of storage accounts for the given manager app id
 
         :return: list of storage accounts
         :rtype: list
         """
-        next_page = ""
-        accounts = []
+        return list(self.iterate_storage_accounts(staking_contract_name, verbose=verbose))
+
+    def iterate_storage_accounts(self, staking_contract_name=None, verbose=False, next_page="", prefetch=False):
+        """Yields storage accounts one at a time as each indexer page arrives, holding one page in memory,
+        or two with prefetch
+
+        :param staking_contract_name: name of staking contract to get storage accounts for, defaults to the lending protocol
+        :type staking_contract_name: string, optional
+        :param verbose: yield full account information rather than addresses
+        :type verbose: boolean, optional
+        :param next_page: indexer token to resume from, defaults to the first page
+        :type next_page: string, optional
+        :param prefetch: fetch the next page while the current one is processed, defaults to False
+        :type prefetch: boolean, optional
+        :return: generator of storage addresses or account information dicts
+        :rtype: generator
+        """
+        for accounts, _ in self.iterate_storage_account_pages(staking_contract_name, next_page=next_page, prefetch=prefetch):
+            for account in accounts:
+                yield account if verbose else account["address"]
+
+    def iterate_storage_account_pages(self, staking_contract_name=None, next_page="", prefetch=False):
+        """Yields the storage accounts of each indexer page with the token of the following page, which
+        can be saved to resume an interrupted scan. With prefetch the next page is fetched in the background
+        while the caller processes the current one.
+
+        :param staking_contract_name: name of staking contract to get storage accounts for, defaults to the lending protocol
+        :type staking_contract_name: string, optional
+        :param next_page: indexer token to resume from, defaults to the first page
+        :type next_page: string, optional
+        :param prefetch: fetch the next page while the current one is processed, defaults to False
+        :type prefetch: boolean, optional
+        :return: generator of (list of account information dicts, next page token) tuples, the token is None on the last page
+        :rtype: generator
+        """
         user_address = base64.b64encode(bytes(manager_strings.user_address, "utf-8")).decode("utf-8")
 
         if staking_contract_name is None:
@@ -359,8 +627,8 @@ class Client:
         else:
             app_id = self.get_staking_contract(staking_contract_name).get_manager_app_id()
 
-        while next_page is not None:
-            account_data = self.indexer.accounts(limit=1000, next_page=next_page, application_id=app_id)
+        request = lambda token: self.indexer.accounts(limit=1000, next_page=token, application_id=app_id)
+        for account_data, next_token in iterate_indexer_pages(request, next_page=next_page, prefetch=prefetch):
             # filter on accounts with b'ua' in their local state for app_id
             accounts_filtered = []
             for account in account_data["accounts"]:
@@ -372,14 +640,36 @@ class Client:
                             key = field.get("key", None)
                             if key == user_address:
                                 accounts_filtered.append(account)
-            accounts.extend([(account if verbose else account["address"]) for account in accounts_filtered])
-
-            if "next-token" in account_data:
-                next_page = account_data["next-token"]
-            else:
-                next_page = None
-
-        return accounts
+            yield accounts_filtered, next_token
+
+    def scan_storage_states(self, snapshot=None, next_page="", prefetch=False):
+        """Yields (storage_address, state) for every storage account of the lending protocol, where state
+        has the same layout as :meth:`get_storage_state`. Positions are decoded from the local state
+        returned with each indexer page, so a full scan costs one request per page plus one snapshot.
+
+        :param snapshot: snapshot to value positions against, captured once at the start if not provided
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :param next_page: indexer token to resume from, defaults to the first page
+        :type next_page: string, optional
+        :param prefetch: fetch the next page while the current one is processed, defaults to False
+        :type prefetch: boolean, optional
+        :return: generator of (storage address, state) tuples
+        :rtype: generator
+        """
+        if snapshot is None:
+            snapshot = self.get_snapshot()
+        manager = self.manager.at_snapshot(snapshot)
+        manager_app_id = manager.get_manager_app_id()
+        markets = {symbol : self.markets[symbol].at_snapshot(snapshot) for symbol in self.active_ordered_symbols[:manager.get_supported_market_count()]}
+
+        for accounts, _ in self.iterate_storage_account_pages(next_page=next_page, prefetch=prefetch):
+            for account in accounts:
+                local_states = {local_state["id"] : format_state(local_state.get("key-value", [])) for local_state in account.get("apps-local-state", [])}
+                result = {}
+                result["manager"] = manager.get_storage_state_from_local_state(local_states.get(manager_app_id, {}))
+                for symbol, market in markets.items():
+                    result[symbol] = market.get_storage_state_from_local_state(local_states.get(market.get_market_app_id(), {}), snapshot=snapshot)
+                yield account["address"], result
 
     # TRANSACTION HELPERS
     
@@ -563,7 +853,7 @@ class Client:
                                               self.get_active_oracle_app_ids(),
                                               collateral_market.get_asset().get_bank_asset_id(),
                                               borrow_market.get_asset().get_underlying_asset_id() if borrow_symbol != "ALGO" else None,
-                                              liquidate_update_fee=3000 if collateral_symbol == 'vALGO' else 1000)
+                                              liquidate_update_fee=get_liquidate_update_fee(collateral_symbol))
 
     def prepare_mint_transactions(self, symbol, amount, address=None):
         """Returns a mint transaction group
@@ -1029,7 +1319,7 @@ class Client:
     
     
 class AlgofiTestnetClient(Client):
-    def __init__(self, algod_client=None, indexer_client=None, user_address=None):
+    def __init__(self, algod_client=None, indexer_client=None, user_address=None, parallel=False):
         """Constructor method for the testnet generic client.
         
         :param algod_client: a :class:`AlgodClient` for interacting with the network
@@ -1038,16 +1328,18 @@ class AlgofiTestnetClient(Client):
         :type indexer_client: :class:`IndexerClient`
         :param user_address: address of the user
         :type user_address: string
+        :param parallel: fetch all application and asset info concurrently on construction, defaults to False
+        :type parallel: boolean, optional
         """
         historical_indexer_client = IndexerClient("", "https://indexer.testnet.algoexplorerapi.io/", headers={"User-Agent": "algosdk"})
         if algod_client is None:
             algod_client = AlgodClient("", "https://node.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
         if indexer_client is None:
             indexer_client = IndexerClient("", "https://algoindexer.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
-        super().__init__(algod_client, indexer_client=indexer_client, historical_indexer_client=historical_indexer_client, user_address=user_address, chain="testnet")
+        super().__init__(algod_client, indexer_client=indexer_client, historical_indexer_client=historical_indexer_client, user_address=user_address, chain="testnet", parallel=parallel)
 
 class AlgofiMainnetClient(Client):
-    def __init__(self, algod_client=None, indexer_client=None, user_address=None):
+    def __init__(self, algod_client=None, indexer_client=None, user_address=None, parallel=False):
         """Constructor method for the mainnet generic client.
         
         :param algod_client: a :class:`AlgodClient` for interacting with the network
@@ -1056,10 +1348,12 @@ class AlgofiMainnetClient(Client):
         :type indexer_client: :class:`IndexerClient`
         :param user_address: address of the user
         :type user_address: string
+        :param parallel: fetch all application and asset info concurrently on construction, defaults to False
+        :type parallel: boolean, optional
         """
         historical_indexer_client = IndexerClient("", "https://indexer.algoexplorerapi.io/", headers={"User-Agent": "algosdk"})
         if algod_client is None:
             algod_client = AlgodClient("", "https://node.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
         if indexer_client is None:
             indexer_client = IndexerClient("", "https://algoindexer.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
-        super().__init__(algod_client, indexer_client=indexer_client, historical_indexer_client=historical_indexer_client, user_address=user_address, chain="mainnet")
+        super().__init__(algod_client, indexer_client=indexer_client, historical_indexer_client=historical_indexer_client, user_address=user_address, chain="mainnet", parallel=parallel)
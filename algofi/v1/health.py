@@ -0,0 +1,150 @@
+import base64
+import numpy as np
+from ..utils import SCALE_FACTOR, PARAMETER_SCALE_FACTOR
+from ..contract_strings import algofi_market_strings as market_strings
+
+# base64 encoded local state keys, matched without decoding the full local state
+USER_ACTIVE_COLLATERAL_KEY = base64.b64encode(market_strings.user_active_collateral.encode()).decode()
+USER_BORROW_SHARES_KEY = base64.b64encode(market_strings.user_borrow_shares.encode()).decode()
+
+
+def get_market_vectors(markets, snapshot=None):
+    """Returns dict of per-market arrays of the global state used to value positions, in the order of markets.
+    usd_per_unit is the oracle price in dollars per base unit of the underlying asset.
+
+    :param markets: list of markets
+    :type markets: list
+    :param snapshot: snapshot to read market and oracle state from instead of the network
+    :type snapshot: :class:`ProtocolSnapshot`, optional
+    :return: dict of numpy arrays by field name
+    :rtype: dict
+    """
+    if snapshot:
+        markets = [market.at_snapshot(snapshot) for market in markets]
+    vectors = {
+        "bank_to_underlying_exchange" : np.array([market.get_bank_to_underlying_exchange() for market in markets], dtype=np.float64),
+        "underlying_borrowed" : np.array([market.get_underlying_borrowed() for market in markets], dtype=np.float64),
+        "outstanding_borrow_shares" : np.array([market.get_outstanding_borrow_shares() for market in markets], dtype=np.float64),
+        "collateral_factor" : np.array([market.get_collateral_factor() or 0 for market in markets], dtype=np.float64),
+        "liquidation_incentive" : np.array([market.get_liquidation_incentive() or 0 for market in markets], dtype=np.float64),
+    }
+    vectors["usd_per_unit"] = np.array([market.get_asset().get_raw_price(snapshot=snapshot) / (market.get_asset().get_oracle_price_scale_factor() * 1e3)
+                                        for market in markets], dtype=np.float64)
+    return vectors
+
+
+class HealthEngine:
+
+    def __init__(self, markets, storage_addresses, active_collateral_bank, borrow_shares):
+        """Constructor method for a columnar health engine over many storage accounts.
+
+        :param markets: list of markets, one per column
+        :type markets: list
+        :param storage_addresses: list of storage addresses, one per row
+        :type storage_addresses: list
+        :param active_collateral_bank: (accounts x markets) array of active collateral in bank asset base units
+        :type active_collateral_bank: :class:`numpy.ndarray`
+        :param borrow_shares: (accounts x markets) array of borrow shares
+        :type borrow_shares: :class:`numpy.ndarray`
+        """
+        self.markets = list(markets)
+        self.storage_addresses = list(storage_addresses)
+        self.active_collateral_bank = np.asarray(active_collateral_bank, dtype=np.float64).reshape(len(self.storage_addresses), len(self.markets))
+        self.borrow_shares = np.asarray(borrow_shares, dtype=np.float64).reshape(len(self.storage_addresses), len(self.markets))
+
+    @classmethod
+    def from_client(cls, client, snapshot=None):
+        """Returns a health engine loaded with the positions of every storage account of the client's
+        lending protocol, read from the local state returned with each indexer page
+
+        :param client: client for the protocol
+        :type client: :class:`Client`
+        :param snapshot: snapshot to read the supported market count from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: health engine
+        :rtype: :class:`HealthEngine`
+        """
+        manager = client.get_manager().at_snapshot(snapshot) if snapshot else client.get_manager()
+        symbols = client.get_active_ordered_symbols()[:manager.get_supported_market_count()]
+        markets = [client.get_market(symbol) for symbol in symbols]
+        columns = {market.get_market_app_id() : i for i, market in enumerate(markets)}
+
+        storage_addresses, active_collateral_bank, borrow_shares = [], [], []
+        for accounts, _ in client.iterate_storage_account_pages():
+            for account in accounts:
+                collateral_row = [0] * len(markets)
+                borrow_row = [0] * len(markets)
+                for local_state in account.get("apps-local-state", []):
+                    column = columns.get(local_state["id"], None)
+                    if column is None:
+                        continue
+                    for field in local_state.get("key-value", []):
+                        if field["key"] == USER_ACTIVE_COLLATERAL_KEY:
+                            collateral_row[column] = field["value"]["uint"]
+                        elif field["key"] == USER_BORROW_SHARES_KEY:
+                            borrow_row[column] = field["value"]["uint"]
+                storage_addresses.append(account["address"])
+                active_collateral_bank.append(collateral_row)
+                borrow_shares.append(borrow_row)
+        return cls(markets, storage_addresses, active_collateral_bank, borrow_shares)
+
+    def get_market_vectors(self, snapshot=None):
+        """Returns dict of per-market arrays of the global state used to value positions
+
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: dict of numpy arrays by field name
+        :rtype: dict
+        """
+        return get_market_vectors(self.markets, snapshot=snapshot)
+
+    def get_health(self, snapshot=None, market_vectors=None):
+        """Returns dict of (accounts x markets) and per account arrays of underlying amounts, usd values and
+        the health factor (max borrow / borrowed, inf with no borrow) of every storage account.
+
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :param market_vectors: precomputed market vectors, see :meth:`get_market_vectors`
+        :type market_vectors: dict, optional
+        :return: dict of numpy arrays by field name
+        :rtype: dict
+        """
+        if market_vectors is None:
+            market_vectors = self.get_market_vectors(snapshot=snapshot)
+        usd_per_unit = market_vectors["usd_per_unit"]
+
+        result = {}
+        result["active_collateral_underlying"] = np.floor(self.active_collateral_bank * market_vectors["bank_to_underlying_exchange"] / SCALE_FACTOR)
+        result["active_collateral_usd"] = result["active_collateral_underlying"] * usd_per_unit
+        result["active_collateral_max_borrow_usd"] = result["active_collateral_usd"] * market_vectors["collateral_factor"] / PARAMETER_SCALE_FACTOR
+        outstanding_borrow_shares = market_vectors["outstanding_borrow_shares"]
+        borrow_index = np.divide(market_vectors["underlying_borrowed"], outstanding_borrow_shares,
+                                 out=np.zeros_like(outstanding_borrow_shares), where=outstanding_borrow_shares > 0)
+        result["borrow_underlying"] = np.floor(self.borrow_shares * borrow_index)
+        result["borrow_usd"] = result["borrow_underlying"] * usd_per_unit
+
+        result["collateral_usd"] = result["active_collateral_usd"].sum(axis=1)
+        result["max_borrow_usd"] = result["active_collateral_max_borrow_usd"].sum(axis=1)
+        result["borrowed_usd"] = result["borrow_usd"].sum(axis=1)
+        result["health_factor"] = np.divide(result["max_borrow_usd"], result["borrowed_usd"],
+                                            out=np.full_like(result["borrowed_usd"], np.inf), where=result["borrowed_usd"] > 0)
+        return result
+
+    def get_liquidatable_accounts(self, snapshot=None, market_vectors=None):
+        """Returns the storage accounts whose borrowed value exceeds their max borrow value, sorted by
+        ascending health factor
+
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :param market_vectors: precomputed market vectors, see :meth:`get_market_vectors`
+        :type market_vectors: dict, optional
+        :return: list of dicts with storage_address, health_factor, borrowed_usd and max_borrow_usd
+        :rtype: list
+        """
+        health = self.get_health(snapshot=snapshot, market_vectors=market_vectors)
+        rows = np.flatnonzero(health["borrowed_usd"] > health["max_borrow_usd"])
+        rows = rows[np.argsort(health["health_factor"][rows], kind="stable")]
+        return [{"storage_address" : self.storage_addresses[row],
+                 "health_factor" : float(health["health_factor"][row]),
+                 "borrowed_usd" : float(health["borrowed_usd"][row]),
+                 "max_borrow_usd" : float(health["max_borrow_usd"][row])} for row in rows]
@@ -0,0 +1,126 @@
+import numpy as np
+from ..utils import format_state, map_concurrently, read_global_state
+
+
+def get_sample_rounds(start_round, end_round, step=1):
+    """Returns the rounds from start_round to end_round inclusive, every step rounds
+
+    :param start_round: first round
+    :type start_round: int
+    :param end_round: last round
+    :type end_round: int
+    :param step: rounds between samples
+    :type step: int, optional
+    :return: list of rounds
+    :rtype: list
+    """
+    if step < 1 or end_round < start_round:
+        raise Exception("Invalid round range")
+    return list(range(start_round, end_round + 1, step))
+
+
+def sample_global_states(indexer_client, app_id, rounds, max_workers=None):
+    """Returns the global state of the application at each round, one concurrent indexer query per round
+
+    :param indexer_client: historical indexer client
+    :type indexer_client: :class:`IndexerClient`
+    :param app_id: id of the application
+    :type app_id: int
+    :param rounds: rounds to read
+    :type rounds: list
+    :param max_workers: maximum number of concurrent requests
+    :type max_workers: int, optional
+    :return: list of global state dicts, in the order of rounds
+    :rtype: list
+    """
+    return map_concurrently(lambda block: read_global_state(indexer_client, app_id, block=block), rounds, max_workers=max_workers)
+
+
+def _apply_deltas(state, txn, app_id):
+    app_txn = txn.get("application-transaction", {})
+    if app_txn.get("application-id", None) == app_id:
+        for delta in txn.get("global-state-delta", []):
+            # delta actions are 1 set bytes, 2 set uint and 3 delete, decoded like the state itself
+            value = delta["value"]
+            formatted = format_state([{"key" : delta["key"], "value" : {"type" : 1 if value["action"] == 1 else 2,
+                                                                        "bytes" : value.get("bytes", ""), "uint" : value.get("uint", 0)}}])
+            if value["action"] == 3:
+                for key in formatted:
+                    state.pop(key, None)
+            else:
+                state.update(formatted)
+    for inner_txn in txn.get("inner-txns", []):
+        _apply_deltas(state, inner_txn, app_id)
+
+
+def replay_global_states(indexer_client, app_id, rounds):
+    """Returns the global state of the application at each round, reconstructed from the state at the first
+    round and the global state deltas of every later application call. Costs one query per 1000 calls in the
+    range rather than one per round.
+
+    :param indexer_client: historical indexer client
+    :type indexer_client: :class:`IndexerClient`
+    :param app_id: id of the application
+    :type app_id: int
+    :param rounds: ascending rounds to read
+    :type rounds: list
+    :return: list of global state dicts, in the order of rounds
+    :rtype: list
+    """
+    state = dict(read_global_state(indexer_client, app_id, block=rounds[0]))
+    states = [dict(state)]
+    sample = 1
+    next_page = ""
+    while next_page is not None and sample < len(rounds):
+        data = indexer_client.search_transactions(limit=1000, next_page=next_page, application_id=app_id,
+                                                  min_round=rounds[0] + 1, max_round=rounds[-1])
+        for txn in data.get("transactions", []):
+            # record every sample taken before this transaction's round
+            while sample < len(rounds) and rounds[sample] < txn["confirmed-round"]:
+                states.append(dict(state))
+                sample += 1
+            _apply_deltas(state, txn, app_id)
+        next_page = data.get("next-token", None) if data.get("transactions", []) else None
+    while sample < len(rounds):
+        states.append(dict(state))
+        sample += 1
+    return states
+
+
+def get_global_state_history(indexer_client, app_id, fields, start_round, end_round, step=1, method="rounds", max_workers=None, names=None):
+    """Returns columnar time series of global state fields of the application. Each round is read once and
+    shared across all fields. Missing fields are 0.
+
+    :param indexer_client: historical indexer client
+    :type indexer_client: :class:`IndexerClient`
+    :param app_id: id of the application
+    :type app_id: int
+    :param fields: global state keys to extract
+    :type fields: list
+    :param start_round: first round
+    :type start_round: int
+    :param end_round: last round
+    :type end_round: int
+    :param step: rounds between samples
+    :type step: int, optional
+    :param method: "rounds" to query the state at every sampled round concurrently, "deltas" to replay the
+        application call deltas, which needs far fewer queries when step is small relative to activity
+    :type method: string, optional
+    :param max_workers: maximum number of concurrent requests for the "rounds" method
+    :type max_workers: int, optional
+    :param names: column names for fields, defaults to the keys
+    :type names: list, optional
+    :return: dict of numpy arrays with a "round" column and one column per field
+    :rtype: dict
+    """
+    rounds = get_sample_rounds(start_round, end_round, step)
+    if method == "rounds":
+        states = sample_global_states(indexer_client, app_id, rounds, max_workers=max_workers)
+    elif method == "deltas":
+        states = replay_global_states(indexer_client, app_id, rounds)
+    else:
+        raise Exception("Unknown history method " + str(method))
+    result = {"round" : np.array(rounds, dtype=np.int64)}
+    for field, name in zip(fields, names or fields):
+        result[name] = np.array([state.get(field, 0) for state in states])
+    return result
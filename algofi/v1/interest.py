@@ -0,0 +1,143 @@
+import time
+from ..utils import SCALE_FACTOR, PARAMETER_SCALE_FACTOR
+
+SECONDS_PER_YEAR = 60 * 60 * 24 * 365
+
+
+class InterestProjector:
+
+    def __init__(self, market):
+        """Constructor method for a local projection of a market's interest accrual. The market state as of
+        its last update is captured once, then borrows grow by simple interest at the stored
+        total_borrow_interest_rate from latest_time, the rate the market applies when it next accrues. The
+        reserve_factor share of interest goes to reserves and the rest raises the bank to underlying
+        exchange rate, each step floored in exact integer arithmetic. Every projection is O(1) and makes no
+        network requests.
+
+        :param market: market to project
+        :type market: :class:`Market`
+        """
+        self.market = market
+        self.latest_time = market.get_latest_time()
+        self.total_borrow_interest_rate = market.get_total_borrow_interest_rate()
+        self.reserve_factor = market.get_reserve_factor() or 0
+        self.underlying_borrowed = market.get_underlying_borrowed()
+        self.underlying_reserves = market.get_underlying_reserves()
+        self.outstanding_borrow_shares = market.get_outstanding_borrow_shares()
+        self.bank_circulation = market.get_bank_circulation()
+        self.bank_to_underlying_exchange = market.get_bank_to_underlying_exchange()
+
+    def get_interest(self, timestamp=None):
+        """Returns the interest accrued on all borrows from latest_time to timestamp, in underlying base units
+
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :return: accrued interest
+        :rtype: int
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        time_elapsed = max(timestamp - self.latest_time, 0)
+        return self.underlying_borrowed * self.total_borrow_interest_rate * int(time_elapsed) // (SCALE_FACTOR * SECONDS_PER_YEAR)
+
+    def get_underlying_borrowed(self, timestamp=None):
+        """Returns the projected total underlying borrowed at timestamp
+
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :return: underlying borrowed
+        :rtype: int
+        """
+        return self.underlying_borrowed + self.get_interest(timestamp)
+
+    def get_underlying_reserves(self, timestamp=None):
+        """Returns the projected underlying reserves at timestamp
+
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :return: underlying reserves
+        :rtype: int
+        """
+        return self.underlying_reserves + self.get_interest(timestamp) * self.reserve_factor // PARAMETER_SCALE_FACTOR
+
+    def get_bank_to_underlying_exchange(self, timestamp=None):
+        """Returns the projected bank to underlying exchange rate at timestamp, scaled by SCALE_FACTOR
+
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :return: bank to underlying exchange rate
+        :rtype: int
+        """
+        if self.bank_circulation <= 0:
+            return self.bank_to_underlying_exchange
+        interest = self.get_interest(timestamp)
+        supplier_interest = interest - interest * self.reserve_factor // PARAMETER_SCALE_FACTOR
+        return self.bank_to_underlying_exchange + supplier_interest * SCALE_FACTOR // self.bank_circulation
+
+    def get_projected_state(self, timestamp=None):
+        """Returns the projected market balances at timestamp
+
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :return: dict with underlying_borrowed, underlying_reserves and bank_to_underlying_exchange
+        :rtype: dict
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        return {
+            "underlying_borrowed" : self.get_underlying_borrowed(timestamp),
+            "underlying_reserves" : self.get_underlying_reserves(timestamp),
+            "bank_to_underlying_exchange" : self.get_bank_to_underlying_exchange(timestamp),
+        }
+
+    # USER FUNCTIONS
+
+    def get_borrow_underlying(self, borrow_shares, timestamp=None):
+        """Returns the projected underlying owed for borrow_shares at timestamp
+
+        :param borrow_shares: borrow shares of the account
+        :type borrow_shares: int
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :return: underlying borrowed
+        :rtype: int
+        """
+        if self.outstanding_borrow_shares <= 0:
+            return 0
+        return int(self.get_underlying_borrowed(timestamp) * borrow_shares / self.outstanding_borrow_shares)
+
+    def get_collateral_underlying(self, active_collateral_bank, timestamp=None):
+        """Returns the projected underlying value of active_collateral_bank at timestamp
+
+        :param active_collateral_bank: active collateral of the account in bank asset base units
+        :type active_collateral_bank: int
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :return: underlying collateral
+        :rtype: int
+        """
+        return int(active_collateral_bank * self.get_bank_to_underlying_exchange(timestamp) / SCALE_FACTOR)
+
+    def get_storage_state(self, storage_state, timestamp=None, snapshot=None):
+        """Returns a market storage state, as returned by :meth:`Market.get_storage_state`, with its
+        underlying and usd values projected to timestamp
+
+        :param storage_state: market storage state of the account
+        :type storage_state: dict
+        :param timestamp: unix time to project to, defaults to the current time
+        :type timestamp: int, optional
+        :param snapshot: snapshot to read oracle prices from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: projected market storage state
+        :rtype: dict
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        asset = self.market.get_asset()
+        result = dict(storage_state)
+        result["active_collateral_underlying"] = self.get_collateral_underlying(storage_state["active_collateral_bank"], timestamp)
+        result["active_collateral_usd"] = asset.to_usd(result["active_collateral_underlying"], snapshot=snapshot)
+        result["active_collateral_max_borrow_usd"] = result["active_collateral_usd"] * self.market.get_collateral_factor() / PARAMETER_SCALE_FACTOR
+        result["borrow_underlying"] = self.get_borrow_underlying(storage_state["borrow_shares"], timestamp)
+        result["borrow_usd"] = asset.to_usd(result["borrow_underlying"], snapshot=snapshot)
+        return result
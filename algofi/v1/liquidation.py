@@ -0,0 +1,259 @@
+from array import array
+from ..utils import PARAMETER_SCALE_FACTOR
+from .positions import PositionBook
+from .prepend import LIQUIDATE_UPDATE_FEE_RANGE, get_init_txn_templates
+
+# share of a borrow a liquidator may repay in one liquidation
+CLOSE_FACTOR = 0.5
+# liquidate transactions after the init transactions paying the flat fee: txn0, txn1 and the repayment txn2,
+# txn3 pays the liquidate update fee
+LIQUIDATE_FLAT_FEE_TXN_COUNT = 3
+
+
+def get_liquidate_update_fee(collateral_symbol):
+    """Returns the fee of the liquidate transaction of a group seizing collateral_symbol, which covers its
+    inner transactions
+
+    :param collateral_symbol: symbol of the seized collateral
+    :type collateral_symbol: string
+    :return: fee in microalgos
+    :rtype: int
+    """
+    return 3000 if collateral_symbol == "vALGO" else 1000
+
+
+def get_liquidate_fee(manager_app_id, supported_market_app_ids, supported_oracle_app_ids, collateral_symbol, fee=1000):
+    """Returns the highest total fee of a liquidate group in microalgos. Every init transaction pays the flat
+    fee except update prices, whose fee is drawn at random by :func:`get_init_txn_fee`.
+
+    :param manager_app_id: id of the manager application
+    :type manager_app_id: int
+    :param supported_market_app_ids: list of supported market application ids
+    :type supported_market_app_ids: list
+    :param supported_oracle_app_ids: list of supported oracle application ids
+    :type supported_oracle_app_ids: list
+    :param collateral_symbol: symbol of the seized collateral
+    :type collateral_symbol: string
+    :param fee: flat fee of the other transactions of the group
+    :type fee: int, optional
+    :return: fee in microalgos
+    :rtype: int
+    """
+    init_txn_count = len(get_init_txn_templates(manager_app_id, tuple(supported_market_app_ids), tuple(supported_oracle_app_ids)))
+    start, stop, step = LIQUIDATE_UPDATE_FEE_RANGE
+    return (init_txn_count - 1) * fee + (stop - step) + LIQUIDATE_FLAT_FEE_TXN_COUNT * fee + get_liquidate_update_fee(collateral_symbol)
+
+
+class LiquidationScanner:
+
+    def __init__(self, client, book=None, snapshot=None, fee=1000):
+        """Constructor method for a scanner ranking liquidation opportunities across every storage account
+        of the lending protocol. Account values are kept per market, so when prices or market state change
+        only the accounts holding collateral or borrows in the changed markets are re-evaluated.
+
+        :param client: client for the protocol
+        :type client: :class:`Client`
+        :param book: positions to scan, loaded from the client if not provided
+        :type book: :class:`PositionBook`, optional
+        :param snapshot: snapshot to value positions against, captured once at the start if not provided
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :param fee: flat fee of the liquidate group transactions
+        :type fee: int, optional
+        """
+        self.client = client
+        if snapshot is None:
+            snapshot = client.get_snapshot()
+        self.book = book if book is not None else PositionBook.from_client(client, snapshot=snapshot)
+        self.book.update_market_state(snapshot=snapshot)
+        self.fees = [get_liquidate_fee(client.get_manager().get_manager_app_id(), client.get_active_market_app_ids(),
+                                       client.get_active_oracle_app_ids(), symbol, fee=fee) for symbol in self.book.symbols]
+        self.algo_market = client.get_market_by_asset_id(1)
+        self.update_fees_usd(snapshot=snapshot)
+
+        width = len(self.book.markets)
+        self.collateral_usd = array("d")
+        self.max_borrow_usd = array("d")
+        self.borrow_usd = array("d")
+        self.market_rows = [set() for _ in range(width)]
+        self.opportunities = {}
+        for row in range(len(self.book)):
+            self._add_row()
+            self.update_row(row)
+
+    def _add_row(self):
+        width = len(self.book.markets)
+        self.collateral_usd.extend([0.0] * width)
+        self.max_borrow_usd.extend([0.0] * width)
+        self.borrow_usd.extend([0.0] * width)
+
+    # GETTERS
+
+    def get_book(self):
+        """Returns the positions being scanned
+
+        :return: position book
+        :rtype: :class:`PositionBook`
+        """
+        return self.book
+
+    def get_fee_usd(self, collateral_symbol=None):
+        """Returns the highest fee of a liquidate group seizing collateral_symbol in dollars
+
+        :param collateral_symbol: symbol of the seized collateral, defaults to the highest fee of any collateral
+        :type collateral_symbol: string, optional
+        :return: fee in dollars
+        :rtype: float
+        """
+        if collateral_symbol is None:
+            return max(self.fees_usd, default=0.0)
+        return self.fees_usd[self.book.columns[collateral_symbol]]
+
+    def get_opportunities(self, min_profit_usd=0.0):
+        """Returns the liquidatable accounts whose best liquidation is estimated to profit more than
+        min_profit_usd after fees, most profitable first
+
+        :param min_profit_usd: smallest estimated profit in dollars
+        :type min_profit_usd: float, optional
+        :return: list of dicts with storage_address, borrow_symbol, collateral_symbol, repay_amount,
+            repay_usd, seize_usd, profit_usd, borrowed_usd and max_borrow_usd
+        :rtype: list
+        """
+        opportunities = [opportunity for opportunity in self.opportunities.values() if opportunity["profit_usd"] > min_profit_usd]
+        return sorted(opportunities, key=lambda opportunity: opportunity["profit_usd"], reverse=True)
+
+    # UPDATES
+
+    def update_row(self, row):
+        """Revalues every market of one account and re-evaluates its liquidation
+
+        :param row: row of the account in the book
+        :type row: int
+        """
+        width = len(self.book.markets)
+        position = self.book.get_position(self.book.storage_addresses[row])
+        for column, symbol in enumerate(self.book.symbols):
+            market_position = position[symbol]
+            index = row * width + column
+            self.collateral_usd[index] = market_position["active_collateral_usd"]
+            self.max_borrow_usd[index] = market_position["active_collateral_max_borrow_usd"]
+            self.borrow_usd[index] = market_position["borrow_usd"]
+            if market_position["active_collateral_bank"] or market_position["borrow_shares"]:
+                self.market_rows[column].add(row)
+            else:
+                self.market_rows[column].discard(row)
+        self._evaluate(row)
+
+    def _evaluate(self, row):
+        width = len(self.book.markets)
+        cells = range(row * width, (row + 1) * width)
+        borrowed_usd = sum(self.borrow_usd[i] for i in cells)
+        max_borrow_usd = sum(self.max_borrow_usd[i] for i in cells)
+        storage_address = self.book.storage_addresses[row]
+        if borrowed_usd <= max_borrow_usd:
+            self.opportunities.pop(storage_address, None)
+            return
+
+        market_state = self.book.get_market_state()
+        markets = self.book.get_valued_markets()
+        best = None
+        for borrow_column in range(width):
+            repayable_usd = self.borrow_usd[row * width + borrow_column] * CLOSE_FACTOR
+            if repayable_usd <= 0:
+                continue
+            for collateral_column in range(width):
+                incentive = (markets[collateral_column].get_liquidation_incentive() or 0) / PARAMETER_SCALE_FACTOR
+                collateral_usd = self.collateral_usd[row * width + collateral_column]
+                if incentive <= 1 or collateral_usd <= 0:
+                    continue
+                repay_usd = min(repayable_usd, collateral_usd / incentive)
+                profit_usd = repay_usd * (incentive - 1) - self.fees_usd[collateral_column]
+                if best is None or profit_usd > best[0]:
+                    best = (profit_usd, borrow_column, collateral_column, repay_usd, repay_usd * incentive)
+        if best is None:
+            self.opportunities.pop(storage_address, None)
+            return
+
+        profit_usd, borrow_column, collateral_column, repay_usd, seize_usd = best
+        price, decimals = market_state[borrow_column][4], market_state[borrow_column][5]
+        self.opportunities[storage_address] = {
+            "storage_address" : storage_address,
+            "borrow_symbol" : self.book.symbols[borrow_column],
+            "collateral_symbol" : self.book.symbols[collateral_column],
+            "repay_amount" : int(repay_usd / price * 10**decimals) if price > 0 else 0,
+            "repay_usd" : repay_usd,
+            "seize_usd" : seize_usd,
+            "profit_usd" : profit_usd,
+            "borrowed_usd" : borrowed_usd,
+            "max_borrow_usd" : max_borrow_usd,
+        }
+
+    def update_fees_usd(self, snapshot=None):
+        """Reprices the liquidate group fees of each collateral market in dollars
+
+        :param snapshot: snapshot to read the ALGO oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        """
+        algo_price = self.algo_market.get_asset().get_price(snapshot=snapshot)
+        self.fees_usd = [fee / 1e6 * algo_price for fee in self.fees]
+
+    def refresh(self, snapshot=None):
+        """Reloads market and oracle state and re-evaluates only the accounts with collateral or borrows in
+        markets whose state or price changed. When the ALGO price moves the fees change too, so every
+        current opportunity is re-evaluated as well.
+
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: number of accounts re-evaluated
+        :rtype: int
+        """
+        old_market_state = self.book.get_market_state()
+        old_fees_usd = self.fees_usd
+        self.book.update_market_state(snapshot=snapshot)
+        self.update_fees_usd(snapshot=snapshot)
+        changed_columns = [column for column, (old, new) in enumerate(zip(old_market_state, self.book.get_market_state())) if old != new]
+        rows = set()
+        for column in changed_columns:
+            rows.update(self.market_rows[column])
+        for row in rows:
+            self.update_row(row)
+        # only liquidatable accounts depend on the fees, and they all have an opportunity
+        evaluated = set(rows)
+        if self.fees_usd != old_fees_usd:
+            for storage_address in list(self.opportunities):
+                row = self.book.rows[storage_address]
+                if row not in evaluated:
+                    self._evaluate(row)
+                    evaluated.add(row)
+        return len(evaluated)
+
+    def update_account(self, storage_address, manager_state, market_states):
+        """Replaces the position of one account, for example after it transacts, and re-evaluates it
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :param manager_state: formatted manager local state of the storage account
+        :type manager_state: dict
+        :param market_states: dict of formatted market local state by market app id
+        :type market_states: dict
+        """
+        new_account = storage_address not in self.book
+        self.book.set_position(storage_address, manager_state, market_states)
+        if new_account:
+            self._add_row()
+        self.update_row(self.book.rows[storage_address])
+
+    def attach(self, block_follower):
+        """Keeps the scanner current with a block follower, updating the tracked storage accounts each round
+        touches and re-evaluating the accounts exposed to changed markets
+
+        :param block_follower: block follower to read state from
+        :type block_follower: :class:`BlockFollower`
+        """
+        manager_app_id = self.client.get_manager().get_manager_app_id()
+        def update(round, app_ids, storage_addresses):
+            snapshot = block_follower.get_snapshot()
+            self.refresh(snapshot=snapshot)
+            for storage_address in storage_addresses:
+                self.update_account(storage_address, snapshot.get_local_state(storage_address, manager_app_id),
+                                    {app_id : snapshot.get_local_state(storage_address, app_id) for app_id in self.book.app_id_columns})
+        block_follower.subscribe(update)
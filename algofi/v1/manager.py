@@ -1,3 +1,4 @@
+import copy
 import json
 import base64
 from algosdk import encoding, logic
@@ -9,7 +10,7 @@ from ..contract_strings import algofi_market_strings as market_strings
 from .rewards_program import RewardsProgram
 
 class Manager:
-    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, manager_app_id):
+    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, manager_app_id, manager_state=None):
         """Constructor method for manager object.
 
         :param indexer_client: a :class:`IndexerClient` for interacting with the network
@@ -18,6 +19,8 @@ class Manager:
         :type historical_indexer_client: :class:`IndexerClient`
         :param manager_app_id: manager app id
         :type manager_app_id: int
+        :param manager_state: prefetched manager global state, read from the indexer if not provided
+        :type manager_state: dict, optional
         """
 
         self.indexer = indexer_client
@@ -25,18 +28,54 @@ class Manager:
 
         self.manager_app_id = manager_app_id
         self.manager_address = logic.get_application_address(self.manager_app_id)
+        self.storage_index = None
+        self.global_state_copy = None
         
         # read market global state
-        self.update_global_state()
+        self.update_global_state(manager_state=manager_state)
     
-    def update_global_state(self, block=None):
+    def update_global_state(self, block=None, manager_state=None):
         """Method to fetch most recent manager global state.
 
         :param block: block at which to get historical data
         :type block: int, optional
+        :param manager_state: prefetched manager global state, read from the indexer if not provided
+        :type manager_state: dict, optional
         """
-        indexer_client = self.historical_indexer if block else self.indexer
-        manager_state = read_global_state(indexer_client, self.manager_app_id, block=block)
+        if manager_state is None:
+            indexer_client = self.historical_indexer if block else self.indexer
+            manager_state = read_global_state(indexer_client, self.manager_app_id, block=block)
+        self._set_global_state(manager_state)
+
+    def at_global_state(self, manager_state):
+        """Returns a copy of this manager with its global state read from manager_state, leaving this manager
+        unchanged. The copy for the last state given is reused.
+
+        :param manager_state: manager global state
+        :type manager_state: dict
+        :return: manager
+        :rtype: :class:`Manager`
+        """
+        global_state_copy = self.global_state_copy
+        if global_state_copy and global_state_copy[0] is manager_state:
+            return global_state_copy[1]
+        manager = copy.copy(self)
+        manager.global_state_copy = None
+        manager._set_global_state(manager_state)
+        self.global_state_copy = (manager_state, manager)
+        return manager
+
+    def at_snapshot(self, snapshot):
+        """Returns a copy of this manager with its global state read from snapshot, leaving this manager unchanged
+
+        :param snapshot: snapshot to read manager state from
+        :type snapshot: :class:`ProtocolSnapshot`
+        :return: manager
+        :rtype: :class:`Manager`
+        """
+        return self.at_global_state(snapshot.get_global_state(self.manager_app_id))
+
+    def _set_global_state(self, manager_state):
         self.rewards_program = RewardsProgram(self.indexer, self.historical_indexer, manager_state)
         self.supported_market_count = manager_state.get(manager_strings.supported_market_count, None)
     
@@ -89,11 +128,28 @@ class Manager:
         :return: storage account address for user
         :rtype: string
         """
+        if self.storage_index:
+            storage_address = self.storage_index.get_storage_address(address)
+            if storage_address:
+                return storage_address
         user_manager_state = read_local_state(self.indexer, address, self.manager_app_id)
         raw_storage_address = user_manager_state.get(manager_strings.user_storage_address, None)
         if not raw_storage_address:
             raise Exception("No storage address found")
-        return encoding.encode_address(base64.b64decode(raw_storage_address.strip()))
+        storage_address = encoding.encode_address(base64.b64decode(raw_storage_address.strip()))
+        if self.storage_index:
+            self.storage_index.add(address, storage_address)
+        return storage_address
+
+    def set_storage_index(self, storage_index):
+        """Sets the index consulted by get_storage_address before reading the user local state
+
+        :param storage_index: storage address index for this manager, None to disable
+        :type storage_index: :class:`StorageAddressIndex`
+        """
+        if storage_index and storage_index.manager_app_id != self.manager_app_id:
+            raise Exception("Storage address index is for manager " + str(storage_index.manager_app_id))
+        self.storage_index = storage_index
     
     def get_user_state(self, address, block=None):
         """Returns the market local state for address.
@@ -108,19 +164,34 @@ class Manager:
         storage_address = self.get_storage_address(address)
         return self.get_storage_state(storage_address, block=block)
     
-    def get_storage_state(self, storage_address, block=None):
+    def get_storage_state(self, storage_address, block=None, snapshot=None):
         """Returns the market local state for storage address.
 
         :param storage_address: storage_address to get info for
         :type storage_address: string
         :param block: block at which to get historical data
         :type block: int, optional
+        :param snapshot: snapshot to read local state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: market local state for address
         :rtype: dict
         """
+        if snapshot:
+            user_state = snapshot.get_local_state(storage_address, self.manager_app_id)
+        else:
+            indexer_client = self.historical_indexer if block else self.indexer
+            user_state = read_local_state(indexer_client, storage_address, self.manager_app_id, block=block)
+        return self.get_storage_state_from_local_state(user_state)
+
+    def get_storage_state_from_local_state(self, user_state):
+        """Returns the manager local state for an already loaded storage account local state.
+
+        :param user_state: formatted manager local state of the storage account
+        :type user_state: dict
+        :return: manager local state for address
+        :rtype: dict
+        """
         result = {}
-        indexer_client = self.historical_indexer if block else self.indexer
-        user_state = read_local_state(indexer_client, storage_address, self.manager_app_id, block=block)
         result["user_global_max_borrow_in_dollars"] = user_state.get(manager_strings.user_global_max_borrow_in_dollars, 0) 
         result["user_global_borrowed_in_dollars"] = user_state.get(manager_strings.user_global_borrowed_in_dollars, 0)
         return result
@@ -138,14 +209,17 @@ class Manager:
         storage_address = self.get_storage_address(address)
         return self.get_storage_unrealized_rewards(storage_address, markets)
 
-    def get_storage_unrealized_rewards(self, storage_address, markets):
+    def get_storage_unrealized_rewards(self, storage_address, markets, snapshot=None):
         """Returns projected unrealized rewards for a storage address
 
         :param storage_address: account storage address of user to get unrealized rewards for
         :type storage_address: string
         :param markets: list of markets to get unrealized rewards for
         :type markets: list
+        :param snapshot: snapshot to read manager, market, oracle and local state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: tuple of primary and secondary unrealized rewards
         :rtype: (int, int)
         """
-        return self.get_rewards_program().get_storage_unrealized_rewards(storage_address, self, markets)
\ No newline at end of file
+        manager = self.at_snapshot(snapshot) if snapshot else self
+        return manager.get_rewards_program().get_storage_unrealized_rewards(storage_address, manager, markets, snapshot=snapshot)
\ No newline at end of file
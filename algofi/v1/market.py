@@ -1,3 +1,4 @@
+import copy
 import json
 import base64
 from algosdk import encoding, logic
@@ -7,10 +8,11 @@ from ..utils import read_local_state, read_global_state, get_global_state_field,
 from ..contract_strings import algofi_manager_strings as manager_strings
 from ..contract_strings import algofi_market_strings as market_strings
 from .asset import Asset
+from .interest import InterestProjector
 
 class Market:
 
-    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, market_app_id):
+    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, market_app_id, market_state=None, asset_infos=None):
         """Constructor method for the market object.
 
         :param indexer_client: a :class:`IndexerClient` for interacting with the network
@@ -19,6 +21,10 @@ class Market:
         :type historical_indexer_client: :class:`IndexerClient`
         :param market_app_id: market app id
         :type market_app_id: int
+        :param market_state: prefetched market global state, read from the indexer if not provided
+        :type market_state: dict, optional
+        :param asset_infos: prefetched asset params by asset id, read from the indexer if not provided
+        :type asset_infos: dict, optional
         """
 
         self.indexer = indexer_client
@@ -26,18 +32,56 @@ class Market:
 
         self.market_app_id = market_app_id
         self.market_address = logic.get_application_address(self.market_app_id)
+        self.asset = None
+        self.global_state_copy = None
 
         # read market global state
-        self.update_global_state()
+        self.update_global_state(market_state=market_state, asset_infos=asset_infos)
     
-    def update_global_state(self, block=None):
+    def update_global_state(self, block=None, market_state=None, asset_infos=None):
         """Method to fetch most recent market global state.
 
         :param block: block at which to get historical data
         :type block: int, optional
+        :param market_state: prefetched market global state, read from the indexer if not provided
+        :type market_state: dict, optional
+        :param asset_infos: prefetched asset params by asset id, read from the indexer if not provided
+        :type asset_infos: dict, optional
         """
-        indexer_client = self.historical_indexer if block else self.indexer
-        market_state = read_global_state(indexer_client, self.market_app_id, block=block)
+        if market_state is None:
+            indexer_client = self.historical_indexer if block else self.indexer
+            market_state = read_global_state(indexer_client, self.market_app_id, block=block)
+        self._set_global_state(market_state, asset_infos=asset_infos)
+
+    def at_global_state(self, market_state):
+        """Returns a copy of this market with its global state read from market_state, leaving this market
+        unchanged. The copy shares this market's asset, and the copy for the last state given is reused.
+
+        :param market_state: market global state
+        :type market_state: dict
+        :return: market
+        :rtype: :class:`Market`
+        """
+        global_state_copy = self.global_state_copy
+        if global_state_copy and global_state_copy[0] is market_state:
+            return global_state_copy[1]
+        market = copy.copy(self)
+        market.global_state_copy = None
+        market._set_global_state(market_state)
+        self.global_state_copy = (market_state, market)
+        return market
+
+    def at_snapshot(self, snapshot):
+        """Returns a copy of this market with its global state read from snapshot, leaving this market unchanged
+
+        :param snapshot: snapshot to read market state from
+        :type snapshot: :class:`ProtocolSnapshot`
+        :return: market
+        :rtype: :class:`Market`
+        """
+        return self.at_global_state(snapshot.get_global_state(self.market_app_id))
+
+    def _set_global_state(self, market_state, asset_infos=None):
         # market constants
         self.market_counter = market_state[market_strings.manager_market_counter_var]
         
@@ -68,14 +112,28 @@ class Market:
         self.underlying_cash = market_state.get(market_strings.underlying_cash, 0)
         self.underlying_reserves = market_state.get(market_strings.underlying_reserves, 0)
         self.total_borrow_interest_rate = market_state.get(market_strings.total_borrow_interest_rate, 0)
-    
+        self.latest_time = market_state.get(market_strings.latest_time, 0)
+
+        # keep the asset while its oracle is unchanged, asset params are immutable so reuse the loaded ones
+        asset = self.asset
+        if asset and (asset.get_underlying_asset_id(), asset.get_bank_asset_id(), asset.get_oracle_app_id(), asset.get_oracle_price_field(),
+                      asset.get_oracle_price_scale_factor()) == (self.underlying_asset_id, self.bank_asset_id, self.oracle_app_id,
+                                                                 self.oracle_price_field, self.oracle_price_scale_factor):
+            return
+        asset_infos = dict(asset_infos or {})
+        if self.asset:
+            asset_infos.setdefault(self.asset.get_underlying_asset_id(), self.asset.get_underlying_asset_info())
+            asset_infos.setdefault(self.asset.get_bank_asset_id(), self.asset.get_bank_asset_info())
         self.asset = Asset(self.indexer,
                            self.historical_indexer, 
                            self.underlying_asset_id,
                            self.bank_asset_id,
                            self.oracle_app_id,
                            self.oracle_price_field,
-                           self.oracle_price_scale_factor) if self.underlying_asset_id else None
+                           self.oracle_price_scale_factor,
+                           asset_infos.get(self.underlying_asset_id),
+                           asset_infos.get(self.bank_asset_id),
+                           self.asset.get_price_feed() if self.asset else None) if self.underlying_asset_id else None
     # GETTERS
     
     def get_market_app_id(self):
@@ -260,36 +318,110 @@ class Market:
         else:
             return self.liquidation_incentive
 
+    def get_reserve_factor(self):
+        """Returns reserve_factor for this market
+
+        :return: reserve_factor
+        :rtype: int
+        """
+        return self.reserve_factor
+
+    def get_latest_time(self):
+        """Returns the unix time interest was last accrued at for this market
+
+        :return: latest_time
+        :rtype: int
+        """
+        return self.latest_time
+
+    def get_interest_projector(self):
+        """Returns a projector extrapolating this market's interest accrual from its current global state
+
+        :return: interest projector
+        :rtype: :class:`InterestProjector`
+        """
+        return InterestProjector(self)
+
+    def get_interest_rate_model(self):
+        """Returns the kinked interest rate model of this market from its current global state. Requires numpy.
+
+        :return: interest rate model
+        :rtype: :class:`InterestRateModel`
+        """
+        from .rate_model import InterestRateModel
+        return InterestRateModel.from_market(self)
+
+    def history(self, fields, start_round, end_round, step=1, method="rounds", max_workers=None):
+        """Returns columnar time series of market global state from the historical indexer. Every sampled
+        round is read once for all fields. Requires numpy.
+
+        :param fields: global state fields by market string name (e.g. "underlying_borrowed") or raw key
+        :type fields: list
+        :param start_round: first round
+        :type start_round: int
+        :param end_round: last round
+        :type end_round: int
+        :param step: rounds between samples
+        :type step: int, optional
+        :param method: "rounds" to query every sampled round concurrently, "deltas" to replay application call deltas
+        :type method: string, optional
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        :return: dict of numpy arrays with a "round" column and one column per field
+        :rtype: dict
+        """
+        from .history import get_global_state_history
+        keys = [getattr(market_strings, field, field) for field in fields]
+        return get_global_state_history(self.historical_indexer, self.market_app_id, keys, start_round, end_round, step=step,
+                                        method=method, max_workers=max_workers, names=fields)
+
     # USER FUNCTIONS
     
-    def get_storage_state(self, storage_address, block=None):
+    def get_storage_state(self, storage_address, block=None, snapshot=None):
         """Returns the market local state for address.
 
         :param storage_address: storage_address to get info for
         :type storage_address: string
         :param block: block at which to get historical data
         :type block: int, optional
+        :param snapshot: snapshot to read market, oracle and local state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: market local state for address
+        :rtype: dict
+        """
+        # load user local state, historical and snapshot global state is read into a copy of this market
+        if snapshot:
+            user_state = snapshot.get_local_state(storage_address, self.market_app_id)
+            market = self.at_snapshot(snapshot)
+        elif block:
+            user_state = read_local_state(self.historical_indexer, storage_address, self.market_app_id, block=block)
+            market = self.at_global_state(read_global_state(self.historical_indexer, self.market_app_id, block=block))
+        else:
+            user_state = read_local_state(self.indexer, storage_address, self.market_app_id)
+            market = self
+        return market.get_storage_state_from_local_state(user_state, snapshot=snapshot)
+
+    def get_storage_state_from_local_state(self, user_state, snapshot=None):
+        """Returns the market local state for an already loaded storage account local state, valued
+        against the market global state as of the last update.
+
+        :param user_state: formatted market local state of the storage account
+        :type user_state: dict
+        :param snapshot: snapshot to read oracle prices from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: market local state for address
         :rtype: dict
         """
         result = {}
         asset = self.get_asset()
-        indexer_client = self.historical_indexer if block else self.indexer
-
-        # load user local state
-        user_state = read_local_state(indexer_client, storage_address, self.market_app_id, block=block)
-
-        # load global state variables
-        if block:
-            self.update_global_state(block=block)
 
         result["active_collateral_bank"] = user_state.get(market_strings.user_active_collateral, 0)
         result["active_collateral_underlying"] = int(result["active_collateral_bank"] * self.bank_to_underlying_exchange / SCALE_FACTOR)
-        result["active_collateral_usd"] = asset.to_usd(result["active_collateral_underlying"])
+        result["active_collateral_usd"] = asset.to_usd(result["active_collateral_underlying"], snapshot=snapshot)
         result["active_collateral_max_borrow_usd"] = result["active_collateral_usd"] * self.collateral_factor / PARAMETER_SCALE_FACTOR
         result["borrow_shares"] = user_state.get(market_strings.user_borrow_shares, 0)
         result["borrow_underlying"] = int(self.underlying_borrowed * result["borrow_shares"] / self.outstanding_borrow_shares) \
                                         if self.outstanding_borrow_shares > 0 else 0
-        result["borrow_usd"] = asset.to_usd(result["borrow_underlying"])
+        result["borrow_usd"] = asset.to_usd(result["borrow_underlying"], snapshot=snapshot)
 
         return result
\ No newline at end of file
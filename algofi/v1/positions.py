@@ -0,0 +1,316 @@
+from array import array
+from collections.abc import Mapping
+from ..utils import SCALE_FACTOR, PARAMETER_SCALE_FACTOR, format_state
+from ..contract_strings import algofi_manager_strings as manager_strings
+from ..contract_strings import algofi_market_strings as market_strings
+
+MARKET_POSITION_KEYS = ("active_collateral_bank", "active_collateral_underlying", "active_collateral_usd",
+                        "active_collateral_max_borrow_usd", "borrow_shares", "borrow_underlying", "borrow_usd")
+MANAGER_POSITION_KEYS = ("user_global_max_borrow_in_dollars", "user_global_borrowed_in_dollars")
+
+
+class MarketPosition(Mapping):
+    """Read only view of one market position in a :class:`PositionBook`, with the keys and values of
+    :meth:`Market.get_storage_state`. Underlying and usd values are derived on access from the book's market
+    state.
+    """
+    __slots__ = ("_book", "_row", "_column")
+
+    def __init__(self, book, row, column):
+        self._book = book
+        self._row = row
+        self._column = column
+
+    def __getitem__(self, key):
+        book = self._book
+        index = self._row * len(book.markets) + self._column
+        bank_to_underlying_exchange, underlying_borrowed, outstanding_borrow_shares, collateral_factor, price, decimals = book.get_market_state()[self._column]
+        if key == "active_collateral_bank":
+            return book.active_collateral_bank[index]
+        elif key == "borrow_shares":
+            return book.borrow_shares[index]
+        elif key.startswith("active_collateral"):
+            underlying = int(book.active_collateral_bank[index] * bank_to_underlying_exchange / SCALE_FACTOR)
+            if key == "active_collateral_underlying":
+                return underlying
+            usd = float(underlying * price / (10**decimals))
+            if key == "active_collateral_usd":
+                return usd
+            if key == "active_collateral_max_borrow_usd":
+                return usd * collateral_factor / PARAMETER_SCALE_FACTOR
+        elif key.startswith("borrow"):
+            underlying = int(underlying_borrowed * book.borrow_shares[index] / outstanding_borrow_shares) if outstanding_borrow_shares > 0 else 0
+            if key == "borrow_underlying":
+                return underlying
+            if key == "borrow_usd":
+                return float(underlying * price / (10**decimals))
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(MARKET_POSITION_KEYS)
+
+    def __len__(self):
+        return len(MARKET_POSITION_KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ManagerPosition(Mapping):
+    """Read only view of the manager fields of one account in a :class:`PositionBook`, with the keys and
+    values of :meth:`Manager.get_storage_state`
+    """
+    __slots__ = ("_book", "_row")
+
+    def __init__(self, book, row):
+        self._book = book
+        self._row = row
+
+    def __getitem__(self, key):
+        if key == "user_global_max_borrow_in_dollars":
+            return self._book.user_global_max_borrow_in_dollars[self._row]
+        elif key == "user_global_borrowed_in_dollars":
+            return self._book.user_global_borrowed_in_dollars[self._row]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(MANAGER_POSITION_KEYS)
+
+    def __len__(self):
+        return len(MANAGER_POSITION_KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Position(Mapping):
+    """Read only view of one storage account in a :class:`PositionBook`, laid out like
+    :meth:`Client.get_storage_state` with a "manager" entry and one entry per market symbol
+    """
+    __slots__ = ("_book", "_row")
+
+    def __init__(self, book, row):
+        self._book = book
+        self._row = row
+
+    def get_storage_address(self):
+        """Returns the storage address of the position
+
+        :return: storage address
+        :rtype: string
+        """
+        return self._book.storage_addresses[self._row]
+
+    def __getitem__(self, key):
+        if key == "manager":
+            return ManagerPosition(self._book, self._row)
+        column = self._book.columns.get(key, None)
+        if column is None:
+            raise KeyError(key)
+        return MarketPosition(self._book, self._row, column)
+
+    def __iter__(self):
+        yield "manager"
+        yield from self._book.symbols
+
+    def __len__(self):
+        return len(self._book.symbols) + 1
+
+    def __repr__(self):
+        return repr({key : dict(value) for key, value in self.items()})
+
+
+class PositionBook:
+
+    def __init__(self, symbols, markets):
+        """Constructor method for a compact book of storage account positions. Positions are stored as
+        integer base unit fields in flat arrays, one row per account and one column per market, and
+        returned as :class:`Position` views whose usd values are derived on access.
+
+        :param symbols: list of market symbols, one per column
+        :type symbols: list
+        :param markets: list of markets in the order of symbols
+        :type markets: list
+        """
+        self.symbols = list(symbols)
+        self.markets = list(markets)
+        self.columns = {symbol : i for i, symbol in enumerate(self.symbols)}
+        self.app_id_columns = {market.get_market_app_id() : i for i, market in enumerate(self.markets)}
+        self.storage_addresses = []
+        self.rows = {}
+        self.active_collateral_bank = array("Q")
+        self.borrow_shares = array("Q")
+        self.user_global_max_borrow_in_dollars = array("Q")
+        self.user_global_borrowed_in_dollars = array("Q")
+        self.market_state = None
+        self.valued_markets = None
+
+    @classmethod
+    def from_client(cls, client, snapshot=None):
+        """Returns a position book loaded with every storage account of the client's lending protocol, read
+        from the local state returned with each indexer page and valued against snapshot
+
+        :param client: client for the protocol
+        :type client: :class:`Client`
+        :param snapshot: snapshot to read market and oracle state from, captured once at the start if not provided
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: position book
+        :rtype: :class:`PositionBook`
+        """
+        if snapshot is None:
+            snapshot = client.get_snapshot()
+        manager = client.get_manager().at_snapshot(snapshot)
+        symbols = client.get_active_ordered_symbols()[:manager.get_supported_market_count()]
+        book = cls(symbols, [client.get_market(symbol) for symbol in symbols])
+        manager_app_id = manager.get_manager_app_id()
+        for accounts, _ in client.iterate_storage_account_pages():
+            for account in accounts:
+                book.add_account(account, manager_app_id)
+        book.update_market_state(snapshot=snapshot)
+        return book
+
+    # GETTERS
+
+    def __len__(self):
+        return len(self.storage_addresses)
+
+    def __contains__(self, storage_address):
+        return storage_address in self.rows
+
+    def __iter__(self):
+        return iter(self.storage_addresses)
+
+    def get_storage_addresses(self):
+        """Returns the storage addresses in the book, in row order
+
+        :return: list of storage addresses
+        :rtype: list
+        """
+        return list(self.storage_addresses)
+
+    def get_position(self, storage_address):
+        """Returns the position of storage_address
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :return: position view
+        :rtype: :class:`Position`
+        """
+        if storage_address not in self.rows:
+            raise Exception("No position for " + storage_address)
+        return Position(self, self.rows[storage_address])
+
+    def get_positions(self):
+        """Yields the position of every storage account in row order
+
+        :return: generator of position views
+        :rtype: generator
+        """
+        for row in range(len(self.storage_addresses)):
+            yield Position(self, row)
+
+    def get_market_state(self):
+        """Returns per market tuples of (bank_to_underlying_exchange, underlying_borrowed,
+        outstanding_borrow_shares, collateral_factor, price, decimals) used to value positions, read from the
+        markets on first use
+
+        :return: list of tuples in column order
+        :rtype: list
+        """
+        if self.market_state is None:
+            self.update_market_state()
+        return self.market_state
+
+    def get_valued_markets(self):
+        """Returns the markets at the state positions are valued against, in column order. These are views
+        of the book's markets when the state was read from a snapshot.
+
+        :return: list of markets
+        :rtype: list
+        """
+        if self.valued_markets is None:
+            self.update_market_state()
+        return self.valued_markets
+
+    # UPDATES
+
+    def update_market_state(self, snapshot=None):
+        """Reloads the market and oracle state positions are valued against, the book's markets are left
+        unchanged
+
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        """
+        markets = [market.at_snapshot(snapshot) for market in self.markets] if snapshot else self.markets
+        market_state = []
+        for market in markets:
+            asset = market.get_asset()
+            market_state.append((market.get_bank_to_underlying_exchange(), market.get_underlying_borrowed(), market.get_outstanding_borrow_shares(),
+                                 market.get_collateral_factor(), asset.get_price(snapshot=snapshot), asset.get_underlying_decimals()))
+        self.market_state = market_state
+        self.valued_markets = markets
+
+    def set_position(self, storage_address, manager_state, market_states):
+        """Adds or replaces the position of storage_address
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :param manager_state: formatted manager local state of the storage account
+        :type manager_state: dict
+        :param market_states: dict of formatted market local state by market app id
+        :type market_states: dict
+        """
+        width = len(self.markets)
+        row = self.rows.get(storage_address, None)
+        if row is None:
+            row = len(self.storage_addresses)
+            self.rows[storage_address] = row
+            self.storage_addresses.append(storage_address)
+            self.active_collateral_bank.extend([0] * width)
+            self.borrow_shares.extend([0] * width)
+            self.user_global_max_borrow_in_dollars.append(0)
+            self.user_global_borrowed_in_dollars.append(0)
+        self.user_global_max_borrow_in_dollars[row] = manager_state.get(manager_strings.user_global_max_borrow_in_dollars, 0)
+        self.user_global_borrowed_in_dollars[row] = manager_state.get(manager_strings.user_global_borrowed_in_dollars, 0)
+        for app_id, column in self.app_id_columns.items():
+            user_state = market_states.get(app_id, {})
+            self.active_collateral_bank[row * width + column] = user_state.get(market_strings.user_active_collateral, 0)
+            self.borrow_shares[row * width + column] = user_state.get(market_strings.user_borrow_shares, 0)
+
+    def add_account(self, account, manager_app_id):
+        """Adds or replaces the position of a storage account from its indexer account information
+
+        :param account: account information including apps-local-state
+        :type account: dict
+        :param manager_app_id: id of the manager application
+        :type manager_app_id: int
+        """
+        local_states = {local_state["id"] : format_state(local_state.get("key-value", [])) for local_state in account.get("apps-local-state", [])
+                        if local_state["id"] == manager_app_id or local_state["id"] in self.app_id_columns}
+        self.set_position(account["address"], local_states.pop(manager_app_id, {}), local_states)
+
+    def add_snapshot(self, snapshot, manager_app_id):
+        """Adds or replaces the positions of every storage account in snapshot
+
+        :param snapshot: snapshot with storage account local states
+        :type snapshot: :class:`ProtocolSnapshot`
+        :param manager_app_id: id of the manager application
+        :type manager_app_id: int
+        """
+        for storage_address in snapshot.get_storage_addresses():
+            self.set_position(storage_address, snapshot.get_local_state(storage_address, manager_app_id),
+                              {app_id : snapshot.get_local_state(storage_address, app_id) for app_id in self.app_id_columns})
+
+    # HEALTH
+
+    def to_health_engine(self):
+        """Returns a :class:`HealthEngine` over the positions in the book, sharing no memory with it
+
+        :return: health engine
+        :rtype: :class:`HealthEngine`
+        """
+        import numpy as np
+        from .health import HealthEngine
+        return HealthEngine(self.markets, self.storage_addresses,
+                            np.frombuffer(self.active_collateral_bank, dtype=np.uint64).astype(np.float64),
+                            np.frombuffer(self.borrow_shares, dtype=np.uint64).astype(np.float64))
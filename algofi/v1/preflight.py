@@ -0,0 +1,369 @@
+from ..utils import SCALE_FACTOR, PARAMETER_SCALE_FACTOR, read_local_states
+from ..contract_strings import algofi_manager_strings as manager_strings
+from .positions import PositionBook
+
+# rejection reasons reported by checks
+INSUFFICIENT_COLLATERAL = "insufficient collateral"
+INSUFFICIENT_ACTIVE_COLLATERAL = "insufficient active collateral"
+INSUFFICIENT_MARKET_CASH = "insufficient market cash"
+MARKET_BORROW_CAP = "market borrow cap reached"
+MARKET_SUPPLY_CAP = "market supply cap reached"
+
+
+class PreflightChecker:
+
+    def __init__(self, client, snapshot=None, book=None, safety_margin=0.0):
+        """Constructor method for an offline checker of borrow, remove collateral and mint amounts. Market,
+        oracle and storage account state are cached from a snapshot, so checks make no network requests and
+        a group that would fail the manager's collateral check or a market cap is rejected or scaled down
+        before it is signed. Caps are in whole dollars and a cap of 0 is treated as no cap. A storage account
+        missing from the cache is read once, at the round of the cached state, when it is first checked.
+
+        :param client: client for the protocol
+        :type client: :class:`Client`
+        :param snapshot: snapshot to read market, oracle and storage account state from, captured once at the
+            start with the client user's storage account if not provided
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :param book: positions to check against, the storage accounts in snapshot if not provided
+        :type book: :class:`PositionBook`, optional
+        :param safety_margin: fraction of max borrow held back for price and interest moves before the group
+            is confirmed, at least 0 and less than 1
+        :type safety_margin: float, optional
+        """
+        if not 0 <= safety_margin < 1:
+            raise Exception("safety_margin must be at least 0 and less than 1, got " + str(safety_margin))
+        self.client = client
+        self.manager_app_id = client.get_manager().get_manager_app_id()
+        self.safety_margin = safety_margin
+        if snapshot is None:
+            snapshot = client.get_snapshot(self._get_user_storage_addresses())
+        if book is None:
+            symbols = client.get_active_ordered_symbols()[:client.get_manager().at_snapshot(snapshot).get_supported_market_count()]
+            book = PositionBook(symbols, [client.get_market(symbol) for symbol in symbols])
+            book.add_snapshot(snapshot, self.manager_app_id)
+        self.book = book
+        self.update_market_state(snapshot=snapshot)
+
+    # GETTERS
+
+    def get_book(self):
+        """Returns the positions checked against
+
+        :return: position book
+        :rtype: :class:`PositionBook`
+        """
+        return self.book
+
+    def get_account_usd(self, storage_address):
+        """Returns the max borrow and borrowed value of a storage account in dollars, the max borrow less the
+        safety margin
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :return: (max_borrow_usd, borrowed_usd)
+        :rtype: tuple
+        """
+        row = self._get_row(storage_address)
+        width = len(self.book.markets)
+        max_borrow_usd = 0.0
+        borrowed_usd = 0.0
+        for column, (bank_to_underlying_exchange, underlying_borrowed, outstanding_borrow_shares, collateral_factor, price, decimals) \
+                in enumerate(self.book.get_market_state()):
+            active_collateral_bank = self.book.active_collateral_bank[row * width + column]
+            if active_collateral_bank:
+                underlying = int(active_collateral_bank * bank_to_underlying_exchange / SCALE_FACTOR)
+                max_borrow_usd += float(underlying * price / (10**decimals)) * collateral_factor / PARAMETER_SCALE_FACTOR
+            borrow_shares = self.book.borrow_shares[row * width + column]
+            if borrow_shares and outstanding_borrow_shares > 0:
+                underlying = int(underlying_borrowed * borrow_shares / outstanding_borrow_shares)
+                borrowed_usd += float(underlying * price / (10**decimals))
+        return max_borrow_usd * (1 - self.safety_margin), borrowed_usd
+
+    def _get_user_storage_addresses(self):
+        if not self.client.user_address:
+            return []
+        try:
+            return [self.client.get_manager().get_storage_address(self.client.user_address)]
+        except Exception:
+            # the user is not opted in, storage accounts are read when first checked
+            return []
+
+    def _get_row(self, storage_address):
+        row = self.book.rows.get(storage_address, None)
+        if row is None:
+            self.add_storage_address(storage_address)
+            row = self.book.rows[storage_address]
+        return row
+
+    def _get_column(self, symbol):
+        column = self.book.columns.get(symbol, None)
+        if column is None:
+            raise Exception("Unsupported market " + symbol)
+        return column
+
+    def _to_usd(self, column, amount):
+        market_state = self.book.get_market_state()[column]
+        return float(amount * market_state[4] / (10**market_state[5]))
+
+    def _result(self, symbol, amount, max_amount, reason):
+        return {"symbol" : symbol,
+                "amount" : amount,
+                "max_amount" : max_amount,
+                "allowed" : reason is None,
+                "reason" : reason}
+
+    # UPDATES
+
+    def update_market_state(self, snapshot=None):
+        """Reloads the market and oracle state and the market caps checks are made against
+
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        """
+        self.book.update_market_state(snapshot=snapshot)
+        self.round = snapshot.get_round() if snapshot else None
+        self.market_limits = [(market.get_underlying_cash(), market.get_underlying_supplied(),
+                               market.market_borrow_cap_in_dollars or 0, market.market_supply_cap_in_dollars or 0)
+                              for market in self.book.get_valued_markets()]
+
+    def update_account(self, storage_address, manager_state, market_states):
+        """Replaces the cached position of one storage account, for example after its group is confirmed
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :param manager_state: formatted manager local state of the storage account
+        :type manager_state: dict
+        :param market_states: dict of formatted market local state by market app id
+        :type market_states: dict
+        """
+        self.book.set_position(storage_address, manager_state, market_states)
+
+    def add_storage_address(self, storage_address):
+        """Reads the position of storage_address at the round of the cached market state and caches it
+
+        :param storage_address: storage address
+        :type storage_address: string
+        """
+        indexer_client = self.client.historical_indexer if self.round is not None else self.client.indexer
+        local_states = read_local_states(indexer_client, storage_address, block=self.round)
+        self.update_account(storage_address, local_states.get(self.manager_app_id, {}),
+                            {app_id : local_states.get(app_id, {}) for app_id in self.book.app_id_columns})
+
+    def attach(self, block_follower):
+        """Keeps the cached state current with a block follower, updating market state and the tracked
+        storage accounts each round touches
+
+        :param block_follower: block follower to read state from
+        :type block_follower: :class:`BlockFollower`
+        """
+        def update(round, app_ids, storage_addresses):
+            snapshot = block_follower.get_snapshot()
+            self.update_market_state(snapshot=snapshot)
+            for storage_address in storage_addresses:
+                self.update_account(storage_address, snapshot.get_local_state(storage_address, self.manager_app_id),
+                                    {app_id : snapshot.get_local_state(storage_address, app_id) for app_id in self.book.app_id_columns})
+        block_follower.subscribe(update)
+
+    # CHECKS
+
+    def _get_borrow_violation(self, row_usd, column, amount):
+        max_borrow_usd, borrowed_usd = row_usd
+        underlying_cash, _, borrow_cap, _ = self.market_limits[column]
+        if amount > underlying_cash:
+            return INSUFFICIENT_MARKET_CASH
+        if borrow_cap and self._to_usd(column, self.book.get_market_state()[column][1] + amount) > borrow_cap:
+            return MARKET_BORROW_CAP
+        if borrowed_usd + self._to_usd(column, amount) > max_borrow_usd:
+            return INSUFFICIENT_COLLATERAL
+        return None
+
+    def get_max_borrow(self, storage_address, symbol):
+        """Returns the largest amount storage_address can borrow from the market
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :param symbol: market symbol
+        :type symbol: string
+        :return: amount in base units of the underlying asset
+        :rtype: int
+        """
+        column = self._get_column(symbol)
+        row_usd = self.get_account_usd(storage_address)
+        max_borrow_usd, borrowed_usd = row_usd
+        underlying_cash, _, borrow_cap, _ = self.market_limits[column]
+        _, underlying_borrowed, _, _, price, decimals = self.book.get_market_state()[column]
+        if price <= 0:
+            return 0
+        headroom_usd = max_borrow_usd - borrowed_usd
+        if borrow_cap:
+            headroom_usd = min(headroom_usd, borrow_cap - self._to_usd(column, underlying_borrowed))
+        max_amount = max(min(int(headroom_usd * 10**decimals / price), underlying_cash), 0)
+        # step down past float rounding at the boundary
+        while max_amount > 0 and self._get_borrow_violation(row_usd, column, max_amount):
+            max_amount -= 1
+        return max_amount
+
+    def check_borrow(self, storage_address, symbol, amount):
+        """Returns whether a borrow would pass the manager collateral check, the market borrow cap and the
+        market cash available, with the largest amount that would
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :param symbol: market symbol
+        :type symbol: string
+        :param amount: amount to borrow in base units of the underlying asset
+        :type amount: int
+        :return: dict with symbol, amount, max_amount, allowed and reason (None when allowed)
+        :rtype: dict
+        """
+        reason = self._get_borrow_violation(self.get_account_usd(storage_address), self._get_column(symbol), amount)
+        max_amount = amount if reason is None else self.get_max_borrow(storage_address, symbol)
+        return self._result(symbol, amount, max_amount, reason)
+
+    def _get_remove_collateral_violation(self, row, row_usd, column, amount):
+        max_borrow_usd, borrowed_usd = row_usd
+        active_collateral_bank = self.book.active_collateral_bank[row * len(self.book.markets) + column]
+        if amount > active_collateral_bank:
+            return INSUFFICIENT_ACTIVE_COLLATERAL
+        if not borrowed_usd:
+            return None
+        bank_to_underlying_exchange, _, _, collateral_factor, _, _ = self.book.get_market_state()[column]
+        # value the removal as the drop in the account's collateral so truncation matches the full valuation
+        remaining_usd = self._to_usd(column, int((active_collateral_bank - amount) * bank_to_underlying_exchange / SCALE_FACTOR))
+        current_usd = self._to_usd(column, int(active_collateral_bank * bank_to_underlying_exchange / SCALE_FACTOR))
+        removed_max_borrow_usd = (current_usd - remaining_usd) * collateral_factor / PARAMETER_SCALE_FACTOR * (1 - self.safety_margin)
+        if borrowed_usd > max_borrow_usd - removed_max_borrow_usd:
+            return INSUFFICIENT_COLLATERAL
+        return None
+
+    def get_max_remove_collateral(self, storage_address, symbol):
+        """Returns the largest amount of collateral storage_address can remove from the market
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :param symbol: market symbol
+        :type symbol: string
+        :return: amount in base units of the bank asset
+        :rtype: int
+        """
+        row = self._get_row(storage_address)
+        column = self._get_column(symbol)
+        row_usd = self.get_account_usd(storage_address)
+        max_borrow_usd, borrowed_usd = row_usd
+        active_collateral_bank = self.book.active_collateral_bank[row * len(self.book.markets) + column]
+        bank_to_underlying_exchange, _, _, collateral_factor, price, decimals = self.book.get_market_state()[column]
+        max_amount = active_collateral_bank
+        if borrowed_usd and collateral_factor:
+            if price <= 0 or bank_to_underlying_exchange <= 0:
+                return 0
+            headroom_usd = (max_borrow_usd - borrowed_usd) / (1 - self.safety_margin) * PARAMETER_SCALE_FACTOR / collateral_factor
+            max_amount = max(min(int(headroom_usd * 10**decimals / price * SCALE_FACTOR / bank_to_underlying_exchange), max_amount), 0)
+        # step down past float rounding at the boundary
+        while max_amount > 0 and self._get_remove_collateral_violation(row, row_usd, column, max_amount):
+            max_amount -= 1
+        return max_amount
+
+    def check_remove_collateral(self, storage_address, symbol, amount):
+        """Returns whether a remove collateral would pass the manager collateral check, with the largest
+        amount that would
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :param symbol: market symbol
+        :type symbol: string
+        :param amount: amount of collateral to remove in base units of the bank asset
+        :type amount: int
+        :return: dict with symbol, amount, max_amount, allowed and reason (None when allowed)
+        :rtype: dict
+        """
+        reason = self._get_remove_collateral_violation(self._get_row(storage_address), self.get_account_usd(storage_address),
+                                                       self._get_column(symbol), amount)
+        max_amount = amount if reason is None else self.get_max_remove_collateral(storage_address, symbol)
+        return self._result(symbol, amount, max_amount, reason)
+
+    def check_mint(self, symbol, amount):
+        """Returns whether a mint or mint to collateral would stay under the market supply cap, with the
+        largest amount that would
+
+        :param symbol: market symbol
+        :type symbol: string
+        :param amount: amount to mint in base units of the underlying asset
+        :type amount: int
+        :return: dict with symbol, amount, max_amount, allowed and reason (None when allowed)
+        :rtype: dict
+        """
+        column = self._get_column(symbol)
+        _, underlying_supplied, _, supply_cap = self.market_limits[column]
+        if not supply_cap or self._to_usd(column, underlying_supplied + amount) <= supply_cap:
+            return self._result(symbol, amount, amount, None)
+        _, _, _, _, price, decimals = self.book.get_market_state()[column]
+        max_amount = max(int(supply_cap * 10**decimals / price) - underlying_supplied, 0) if price > 0 else 0
+        while max_amount > 0 and self._to_usd(column, underlying_supplied + max_amount) > supply_cap:
+            max_amount -= 1
+        return self._result(symbol, amount, max_amount, MARKET_SUPPLY_CAP)
+
+    def check_transaction_group(self, transaction_group):
+        """Returns the check of the borrow or remove collateral a prepared transaction group makes, decoded
+        from its manager and market transactions
+
+        :param transaction_group: unsigned borrow or remove collateral transaction group
+        :type transaction_group: :class:`TransactionGroup`
+        :return: dict with symbol, amount, max_amount, allowed and reason (None when allowed)
+        :rtype: dict
+        """
+        checks = {manager_strings.borrow.encode() : self.check_borrow,
+                  manager_strings.remove_collateral.encode() : self.check_remove_collateral}
+        transactions = transaction_group.transactions
+        for i, txn in enumerate(transactions[:-1]):
+            app_args = getattr(txn, "app_args", None)
+            if getattr(txn, "index", None) != self.manager_app_id or not app_args or app_args[0] not in checks:
+                continue
+            market_txn = transactions[i + 1]
+            column = self.book.app_id_columns.get(getattr(market_txn, "index", None), None)
+            if column is None or not getattr(market_txn, "accounts", None):
+                raise Exception("Transaction group has no market transaction")
+            return checks[app_args[0]](market_txn.accounts[0], self.book.symbols[column], int.from_bytes(app_args[1], "big"))
+        raise Exception("Transaction group is not a borrow or remove collateral")
+
+    # TRANSACTIONS
+
+    def prepare_borrow_transactions(self, symbol, amount, address=None, adjust=False):
+        """Returns a borrow transaction group after checking it offline, raising an exception if it would fail
+
+        :param symbol: symbol to borrow
+        :type symbol: string
+        :param amount: amount to borrow
+        :type amount: int
+        :param address: defaults to client user address. address to send borrow transaction group from
+        :type address: string
+        :param adjust: borrow the largest amount that would pass instead of raising, when it is not 0
+        :type adjust: boolean, optional
+        :return: borrow transaction group
+        :rtype: :class:`TransactionGroup`
+        """
+        storage_address = self.client.get_manager().get_storage_address(address or self.client.user_address)
+        check = self.check_borrow(storage_address, symbol, amount)
+        if not check["allowed"] and not (adjust and check["max_amount"] > 0):
+            raise Exception("Borrow of " + str(amount) + " " + symbol + " would fail: " + check["reason"])
+        return self.client.prepare_borrow_transactions(symbol, check["max_amount"], address=address)
+
+    def prepare_remove_collateral_transactions(self, symbol, amount, address=None, adjust=False):
+        """Returns a remove_collateral transaction group after checking it offline, raising an exception if it
+        would fail
+
+        :param symbol: symbol to remove collateral from
+        :type symbol: string
+        :param amount: amount of collateral to remove
+        :type amount: int
+        :param address: defaults to client user address. address to send remove_collateral transaction group from
+        :type address: string
+        :param adjust: remove the largest amount that would pass instead of raising, when it is not 0
+        :type adjust: boolean, optional
+        :return: remove_collateral transaction group
+        :rtype: :class:`TransactionGroup`
+        """
+        storage_address = self.client.get_manager().get_storage_address(address or self.client.user_address)
+        check = self.check_remove_collateral(storage_address, symbol, amount)
+        if not check["allowed"] and not (adjust and check["max_amount"] > 0):
+            raise Exception("Remove collateral of " + str(amount) + " " + symbol + " would fail: " + check["reason"])
+        return self.client.prepare_remove_collateral_transactions(symbol, check["max_amount"], address=address)
@@ -1,6 +1,7 @@
-from copy import deepcopy
+from copy import copy, deepcopy
+from functools import lru_cache
 from random import randint, randrange
-from algosdk.future.transaction import ApplicationNoOpTxn
+from algosdk.future.transaction import ApplicationNoOpTxn, SuggestedParams
 from ..utils import Transactions
 from ..contract_strings import algofi_manager_strings as manager_strings
 
@@ -8,6 +9,10 @@ from ..contract_strings import algofi_manager_strings as manager_strings
 NUM_DUMMY_TXNS = 9
 # mapping from integer to word
 dummy_txn_num_to_word = {1: "one", 2: "two", 3: "three", 4: "four", 5: "five", 6: "six", 7: "seven", 8: "eight", 9: "nine", 10: "ten"}
+# list fields of the init transactions, stored as tuples in the cached templates and copied to new lists per call
+TEMPLATE_LIST_FIELDS = ("app_args", "accounts", "foreign_apps", "foreign_assets")
+# randrange arguments of the update prices fee of a liquidate group, which pays for its inner transactions
+LIQUIDATE_UPDATE_FEE_RANGE = (600_000, 800_000, 1000)
 
 def get_init_txns(transaction_type, sender, suggested_params, manager_app_id, supported_market_app_ids, supported_oracle_app_ids, storage_account):
     """Returns a :class:`TransactionGroup` object representing the initial transactions
@@ -15,6 +20,10 @@ def get_init_txns(transaction_type, sender, suggested_params, manager_app_id, su
     (1) fetch market variables, (2) update prices, (3) update protocol data, and (4) degenerate ("dummy")
     transactions to increase the number of cost units allowed (currently each transactions affords 700
     additional cost units).
+    The static fields of the group are built once per (manager, market set, oracle set) and copied, only the
+    sender, round, fee, genesis, note and storage account fields are set per call. Every call returns new
+    lists, so callers may modify the transactions freely. Params without a flat fee
+    are built in full since their fee depends on the encoded size of each transaction.
 
     :param transaction_type: a :class:`Transactions` enum representing the group transaction the init transactions are used for
     :type transaction_type: :class:`Transactions`
@@ -33,16 +42,100 @@ def get_init_txns(transaction_type, sender, suggested_params, manager_app_id, su
     :return: list of transactions representing the initial transactions
     :rtype: list
     """
-    suggested_params_modified = deepcopy(suggested_params)
+    fee = get_init_txn_fee(transaction_type, suggested_params.fee)
+    if not suggested_params.flat_fee:
+        suggested_params_modified = deepcopy(suggested_params)
+        suggested_params_modified.fee = fee
+        return build_init_txns(sender, suggested_params, suggested_params_modified, manager_app_id, supported_market_app_ids, supported_oracle_app_ids, storage_account,
+                               randint(0,1000000).to_bytes(8, 'big'))
+
+    fields = {"sender" : sender, "fee" : suggested_params.fee, "first_valid_round" : suggested_params.first,
+              "last_valid_round" : suggested_params.last, "genesis_id" : suggested_params.gen, "genesis_hash" : suggested_params.gh}
+    txns = []
+    for template in get_init_txn_templates(manager_app_id, tuple(supported_market_app_ids), tuple(supported_oracle_app_ids)):
+        txn = copy(template)
+        for field, value in fields.items():
+            setattr(txn, field, value)
+        for field in TEMPLATE_LIST_FIELDS:
+            value = getattr(template, field)
+            if value is not None:
+                setattr(txn, field, list(value))
+        txns.append(txn)
+    txns[0].note = randint(0,1000000).to_bytes(8, 'big')
+    txns[1].fee = fee
+    txns[2].accounts = [storage_account]
+    return txns
+
+
+def get_init_txn_fee(transaction_type, fee):
+    """Returns the fee of the update prices transaction, which covers the inner transactions of the group
+
+    :param transaction_type: a :class:`Transactions` enum representing the group transaction the init transactions are used for
+    :type transaction_type: :class:`Transactions`
+    :param fee: suggested fee
+    :type fee: int
+    :return: fee of the update prices transaction
+    :rtype: int
+    """
     # if inner transaction is required, increase fee to 2000 microalgos
     if (transaction_type in [Transactions.MINT, Transactions.BURN, Transactions.REMOVE_COLLATERAL,
                             Transactions.REMOVE_COLLATERAL_UNDERLYING, Transactions.BORROW, Transactions.REPAY_BORROW,
                             Transactions.CLAIM_REWARDS, Transactions.SEND_GOVERNANCE_TXN, Transactions.SEND_KEYREG_ONLINE_TXN, Transactions.SEND_KEYREG_OFFLINE_TXN]):
-        suggested_params_modified.fee = 2000
+        return 2000
     elif transaction_type in [Transactions.LIQUIDATE]:
-        suggested_params_modified.fee = randrange(600_000, 800_000, 1000)
+        return randrange(*LIQUIDATE_UPDATE_FEE_RANGE)
     elif transaction_type in [Transactions.REMOVE_ALGOS_FROM_VAULT]:
-        suggested_params_modified.fee = 4000
+        return 4000
+    return fee
+
+
+@lru_cache(maxsize=32)
+def get_init_txn_templates(manager_app_id, supported_market_app_ids, supported_oracle_app_ids):
+    """Returns the init transactions for the given applications built with placeholder sender and params,
+    to be copied and completed by :func:`get_init_txns`. The templates are shared between calls, so their list
+    fields are frozen to tuples.
+
+    :param manager_app_id: id of the manager application
+    :type manager_app_id: int
+    :param supported_market_app_ids: tuple of supported market application ids
+    :type supported_market_app_ids: tuple
+    :param supported_oracle_app_ids: tuple of supported oracle application ids
+    :type supported_oracle_app_ids: tuple
+    :return: tuple of template transactions
+    :rtype: tuple
+    """
+    placeholder_params = SuggestedParams(0, 0, 0, "", flat_fee=True)
+    templates = build_init_txns(None, placeholder_params, placeholder_params, manager_app_id, list(supported_market_app_ids), list(supported_oracle_app_ids), None, None)
+    for template in templates:
+        for field in TEMPLATE_LIST_FIELDS:
+            value = getattr(template, field)
+            if value is not None:
+                setattr(template, field, tuple(value))
+    return tuple(templates)
+
+
+def build_init_txns(sender, suggested_params, suggested_params_modified, manager_app_id, supported_market_app_ids, supported_oracle_app_ids, storage_account, note):
+    """Returns the init transactions built in full
+
+    :param sender: account address for the sender
+    :type sender: string
+    :param suggested_params: suggested transaction params
+    :type suggested_params: :class:`algosdk.future.transaction.SuggestedParams` object
+    :param suggested_params_modified: suggested transaction params of the update prices transaction
+    :type suggested_params_modified: :class:`algosdk.future.transaction.SuggestedParams` object
+    :param manager_app_id: id of the manager application
+    :type manager_app_id: int
+    :param supported_market_app_ids: list of supported market application ids
+    :type supported_market_app_ids: list
+    :param supported_oracle_app_ids: list of supported oracle application ids
+    :type supported_oracle_app_ids: list
+    :param storage_account: account address for the storage account
+    :type storage_account: string
+    :param note: note of the fetch market variables transaction
+    :type note: bytes
+    :return: list of transactions representing the initial transactions
+    :rtype: list
+    """
     # refresh market variables on manager, update prices on manager and update protocol data + add dummy txns to "buy" cost units
     txn0 = ApplicationNoOpTxn(
         sender=sender,
@@ -50,7 +143,7 @@ def get_init_txns(transaction_type, sender, suggested_params, manager_app_id, su
         index=manager_app_id,
         app_args=[manager_strings.fetch_market_variables.encode()],
         foreign_apps=supported_market_app_ids,
-        note=randint(0,1000000).to_bytes(8, 'big')
+        note=note
     )
     txn1 = ApplicationNoOpTxn(
         sender=sender,
@@ -0,0 +1,287 @@
+import time
+from threading import Lock
+from ..utils import read_global_states
+
+# default seconds before oracle prices are refetched, roughly one block
+DEFAULT_TTL = 4.0
+
+
+class PriceFeed:
+
+    def __init__(self, indexer_client, assets=None, ttl=DEFAULT_TTL, max_workers=None):
+        """Constructor method for a shared feed of oracle prices. Every tracked oracle is read in one
+        concurrent sweep at most once per TTL, and raw and dollarized prices are memoized until the next
+        sweep, so valuations across markets and accounts share one read per oracle per round.
+
+        :param indexer_client: a :class:`IndexerClient` for interacting with the network
+        :type indexer_client: :class:`IndexerClient`
+        :param assets: dict of asset by name, usually the market symbol
+        :type assets: dict, optional
+        :param ttl: seconds to reuse fetched prices, 0 to fetch on every call
+        :type ttl: float, optional
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        """
+        self.indexer = indexer_client
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.assets = {}
+        self.oracles = set()
+        self.raw_prices = None
+        self.prices = {}
+        self.round = None
+        self.fetched_at = None
+        self.fetches = 0
+        self.subscribers = []
+        self.block_follower = None
+        self.follower_callback = None
+        self.lock = Lock()
+        for name, asset in (assets or {}).items():
+            self.add_asset(name, asset)
+
+    def add_asset(self, name, asset):
+        """Starts tracking the oracle of asset under name
+
+        :param name: name to report the price under
+        :type name: string
+        :param asset: asset with an oracle
+        :type asset: :class:`Asset`
+        """
+        if asset.get_oracle_app_id() == None:
+            raise Exception("no oracle app id for asset")
+        with self.lock:
+            self.assets[name] = asset
+        self.add_oracle(asset.get_oracle_app_id(), asset.get_oracle_price_field())
+
+    def add_oracle(self, oracle_app_id, price_field):
+        """Starts tracking an oracle without a name, its raw price is read with :meth:`get_oracle_raw_price`
+
+        :param oracle_app_id: id of the oracle application
+        :type oracle_app_id: int
+        :param price_field: global state key of the price
+        :type price_field: string
+        """
+        with self.lock:
+            if (oracle_app_id, price_field) not in self.oracles:
+                self.oracles.add((oracle_app_id, price_field))
+                self.raw_prices = None
+
+    # SUBSCRIPTIONS
+
+    def subscribe(self, callback, threshold=0.0, names=None):
+        """Registers a function called with (name, old_price, new_price) when the dollarized price of a
+        tracked asset moves by at least threshold, as a fraction of the price last reported to this
+        subscriber. The first load of each price sets the reference without a call.
+
+        :param callback: function to call
+        :type callback: callable
+        :param threshold: relative price move that triggers a call, 0 for every change
+        :type threshold: float, optional
+        :param names: names to watch, defaults to every tracked asset
+        :type names: list, optional
+        """
+        with self.lock:
+            self.subscribers.append({"callback" : callback, "threshold" : threshold,
+                                     "names" : set(names) if names is not None else None, "reference" : dict(self.prices)})
+
+    def unsubscribe(self, callback):
+        """Removes every subscription of callback
+
+        :param callback: function to remove
+        :type callback: callable
+        """
+        with self.lock:
+            self.subscribers = [subscriber for subscriber in self.subscribers if subscriber["callback"] != callback]
+
+    def attach(self, block_follower):
+        """Updates prices from a block follower's snapshot after every round that calls a tracked oracle,
+        so prices change exactly when the oracles do. While attached the TTL does not apply and prices are
+        not read from the indexer, :meth:`detach` returns to TTL reads.
+
+        :param block_follower: block follower to read prices from
+        :type block_follower: :class:`BlockFollower`
+        """
+        def update(round, app_ids, storage_addresses):
+            if any(app_id == oracle_app_id for oracle_app_id, _ in self.oracles for app_id in app_ids):
+                self.update_from_snapshot(block_follower.get_snapshot())
+        self.detach()
+        self.update_from_snapshot(block_follower.get_snapshot())
+        block_follower.subscribe(update)
+        with self.lock:
+            self.block_follower = block_follower
+            self.follower_callback = update
+
+    def detach(self):
+        """Stops updating prices from the attached block follower, prices are read from the indexer again
+        once they expire
+        """
+        with self.lock:
+            block_follower, callback = self.block_follower, self.follower_callback
+            self.block_follower = None
+            self.follower_callback = None
+        if block_follower is not None:
+            block_follower.unsubscribe(callback)
+
+    # UPDATES
+
+    def _is_stale(self):
+        if self.raw_prices is None:
+            return True
+        return self.block_follower is None and time.monotonic() - self.fetched_at >= self.ttl
+
+    def is_stale(self):
+        """Returns True if the memoized prices must be refetched
+
+        :return: whether the prices are missing or expired
+        :rtype: boolean
+        """
+        with self.lock:
+            return self._is_stale()
+
+    def refresh(self):
+        """Reads every tracked oracle in one concurrent sweep and notifies subscribers of price moves
+
+        :return: tuple of the raw prices by (oracle app id, price field) and the prices by name that were set
+        :rtype: (dict, dict)
+        """
+        with self.lock:
+            oracles = list(self.oracles)
+        app_ids = sorted(set(app_id for app_id, _ in oracles))
+        states = read_global_states(self.indexer, app_ids, max_workers=self.max_workers)
+        self.fetches += 1
+        return self._set_raw_prices({(app_id, field) : states[app_id].get(field, None) for app_id, field in oracles}, None)
+
+    def update_from_snapshot(self, snapshot):
+        """Sets prices from the oracle state in snapshot and notifies subscribers of price moves
+
+        :param snapshot: snapshot to read oracle state from
+        :type snapshot: :class:`ProtocolSnapshot`
+        """
+        with self.lock:
+            oracles = list(self.oracles)
+        self._set_raw_prices({(app_id, field) : snapshot.get_global_state(app_id).get(field, None) for app_id, field in oracles},
+                             snapshot.get_round())
+
+    def _set_raw_prices(self, raw_prices, round):
+        notifications = []
+        with self.lock:
+            prices = {}
+            for name, asset in self.assets.items():
+                raw_price = raw_prices.get((asset.get_oracle_app_id(), asset.get_oracle_price_field()), None)
+                if raw_price is not None:
+                    prices[name] = float((raw_price * 10**asset.get_underlying_decimals()) / (asset.get_oracle_price_scale_factor() * 1e3))
+            self.raw_prices = raw_prices
+            self.prices = prices
+            self.round = round
+            self.fetched_at = time.monotonic()
+            for subscriber in self.subscribers:
+                reference = subscriber["reference"]
+                for name, price in prices.items():
+                    if subscriber["names"] is not None and name not in subscriber["names"]:
+                        continue
+                    old_price = reference.get(name, None)
+                    if old_price is None:
+                        reference[name] = price
+                    elif price != old_price and (old_price == 0 or abs(price - old_price) / abs(old_price) >= subscriber["threshold"]):
+                        reference[name] = price
+                        notifications.append((subscriber["callback"], name, old_price, price))
+        for callback, name, old_price, price in notifications:
+            callback(name, old_price, price)
+        return raw_prices, prices
+
+    def invalidate(self):
+        """Drops the memoized prices so the next read refetches them
+        """
+        with self.lock:
+            self.raw_prices = None
+            self.fetched_at = None
+
+    # GETTERS
+
+    def _fresh(self):
+        # one consistent pair of price dicts, another thread may replace or drop them after the lock is released
+        with self.lock:
+            if not self._is_stale():
+                return self.raw_prices, self.prices
+        return self.refresh()
+
+    def _get_oracle_raw_price(self, raw_prices, oracle_app_id, price_field):
+        raw_price = raw_prices.get((oracle_app_id, price_field), None)
+        if raw_price is None:
+            raise Exception("Price field " + price_field + " not found for oracle " + str(oracle_app_id))
+        return raw_price
+
+    def get_oracle_raw_price(self, oracle_app_id, price_field):
+        """Returns the memoized raw price of an oracle, tracking the oracle if it is new
+
+        :param oracle_app_id: id of the oracle application
+        :type oracle_app_id: int
+        :param price_field: global state key of the price
+        :type price_field: string
+        :return: raw oracle price
+        :rtype: int
+        """
+        self.add_oracle(oracle_app_id, price_field)
+        raw_prices, _ = self._fresh()
+        return self._get_oracle_raw_price(raw_prices, oracle_app_id, price_field)
+
+    def get_raw_price(self, name):
+        """Returns the memoized raw oracle price of the named asset
+
+        :param name: name of the asset
+        :type name: string
+        :return: raw oracle price
+        :rtype: int
+        """
+        asset = self.assets[name]
+        return self.get_oracle_raw_price(asset.get_oracle_app_id(), asset.get_oracle_price_field())
+
+    def get_price(self, name):
+        """Returns the memoized dollarized price of the named asset, in dollars per whole token
+
+        :param name: name of the asset
+        :type name: string
+        :return: price
+        :rtype: float
+        """
+        asset = self.assets[name]
+        _, prices = self._fresh()
+        if name not in prices:
+            raise Exception("Price field " + asset.get_oracle_price_field() + " not found for oracle " + str(asset.get_oracle_app_id()))
+        return prices[name]
+
+    def get_raw_prices(self):
+        """Returns dict of raw oracle prices by name
+
+        :return: dict of raw prices
+        :rtype: dict
+        """
+        raw_prices, _ = self._fresh()
+        with self.lock:
+            assets = dict(self.assets)
+        return {name : self._get_oracle_raw_price(raw_prices, asset.get_oracle_app_id(), asset.get_oracle_price_field()) for name, asset in assets.items()}
+
+    def get_prices(self):
+        """Returns dict of dollarized prices by name
+
+        :return: dict of prices
+        :rtype: dict
+        """
+        _, prices = self._fresh()
+        return dict(prices)
+
+    def get_round(self):
+        """Returns the round of the snapshot prices were last set from, None if they were read from the indexer
+
+        :return: round
+        :rtype: int
+        """
+        return self.round
+
+    def get_fetch_count(self):
+        """Returns the number of oracle sweeps made against the indexer
+
+        :return: number of fetches
+        :rtype: int
+        """
+        return self.fetches
@@ -0,0 +1,158 @@
+from functools import lru_cache
+import numpy as np
+from ..utils import PARAMETER_SCALE_FACTOR
+
+# integer parameter scale, utilization, utilization_optimal and reserve_factor are in these units
+PARAMETER_SCALE = int(PARAMETER_SCALE_FACTOR)
+
+
+class InterestRateModel:
+
+    def __init__(self, base_interest_rate, slope_1, slope_2, utilization_optimal, reserve_factor):
+        """Constructor method for the kinked interest rate curve of a market. Rates are annual and scaled by
+        SCALE_FACTOR, utilization is scaled by PARAMETER_SCALE_FACTOR, and every step floors like the
+        contract's integer arithmetic. Methods accept ints or numpy integer arrays of utilization, and each
+        parameter may itself be an array to evaluate many markets at once.
+
+        :param base_interest_rate: borrow rate at zero utilization
+        :type base_interest_rate: int
+        :param slope_1: borrow rate added between zero and optimal utilization
+        :type slope_1: int
+        :param slope_2: borrow rate added between optimal and full utilization
+        :type slope_2: int
+        :param utilization_optimal: utilization at the kink
+        :type utilization_optimal: int
+        :param reserve_factor: share of interest kept as reserves
+        :type reserve_factor: int
+        """
+        self.base_interest_rate = base_interest_rate
+        self.slope_1 = slope_1
+        self.slope_2 = slope_2
+        self.utilization_optimal = utilization_optimal
+        self.reserve_factor = reserve_factor
+
+    @classmethod
+    def from_market(cls, market):
+        """Returns the rate model of market as of its last global state update
+
+        :param market: market
+        :type market: :class:`Market`
+        :return: rate model
+        :rtype: :class:`InterestRateModel`
+        """
+        return cls(market.base_interest_rate or 0, market.slope_1 or 0, market.slope_2 or 0,
+                   market.utilization_optimal or 0, market.reserve_factor or 0)
+
+    @classmethod
+    def from_markets(cls, markets):
+        """Returns one rate model over all markets, with each parameter a (markets x 1) int64 array so
+        evaluating a (markets x n) utilization array scores every market at once
+
+        :param markets: list of markets
+        :type markets: list
+        :return: rate model
+        :rtype: :class:`InterestRateModel`
+        """
+        models = [cls.from_market(market) for market in markets]
+        column = lambda name: np.array([getattr(model, name) for model in models], dtype=np.int64).reshape(-1, 1)
+        return cls(column("base_interest_rate"), column("slope_1"), column("slope_2"), column("utilization_optimal"), column("reserve_factor"))
+
+    def get_parameters(self):
+        """Returns the parameters as a hashable tuple
+
+        :return: (base_interest_rate, slope_1, slope_2, utilization_optimal, reserve_factor)
+        :rtype: tuple
+        """
+        return (self.base_interest_rate, self.slope_1, self.slope_2, self.utilization_optimal, self.reserve_factor)
+
+    def get_borrow_rate(self, utilization):
+        """Returns the borrow rate at utilization
+
+        :param utilization: utilization scaled by PARAMETER_SCALE_FACTOR
+        :type utilization: int or :class:`numpy.ndarray`
+        :return: annual borrow rate scaled by SCALE_FACTOR
+        :rtype: int or :class:`numpy.ndarray`
+        """
+        if isinstance(utilization, np.ndarray) or isinstance(self.utilization_optimal, np.ndarray):
+            utilization = np.asarray(utilization, dtype=np.int64)
+            below_kink = self.base_interest_rate + np.floor_divide(utilization * self.slope_1, np.maximum(self.utilization_optimal, 1))
+            above_kink = self.base_interest_rate + self.slope_1 + \
+                         np.floor_divide((utilization - self.utilization_optimal) * self.slope_2, np.maximum(PARAMETER_SCALE - self.utilization_optimal, 1))
+            return np.where(utilization <= self.utilization_optimal, below_kink, above_kink)
+        if utilization <= self.utilization_optimal:
+            return self.base_interest_rate + utilization * self.slope_1 // max(self.utilization_optimal, 1)
+        return self.base_interest_rate + self.slope_1 + (utilization - self.utilization_optimal) * self.slope_2 // max(PARAMETER_SCALE - self.utilization_optimal, 1)
+
+    def get_supply_rate(self, utilization):
+        """Returns the supply rate at utilization, the borrow rate paid on the borrowed share of supply less
+        the reserve factor
+
+        :param utilization: utilization scaled by PARAMETER_SCALE_FACTOR
+        :type utilization: int or :class:`numpy.ndarray`
+        :return: annual supply rate scaled by SCALE_FACTOR
+        :rtype: int or :class:`numpy.ndarray`
+        """
+        borrow_rate = self.get_borrow_rate(utilization)
+        if isinstance(borrow_rate, np.ndarray):
+            return np.floor_divide(np.floor_divide(borrow_rate * utilization, PARAMETER_SCALE) * (PARAMETER_SCALE - self.reserve_factor), PARAMETER_SCALE)
+        return borrow_rate * utilization // PARAMETER_SCALE * (PARAMETER_SCALE - self.reserve_factor) // PARAMETER_SCALE
+
+    def get_curve(self, points=PARAMETER_SCALE + 1):
+        """Returns the memoized rate curve over evenly spaced utilizations from 0 to PARAMETER_SCALE_FACTOR.
+        With array parameters (e.g. from :meth:`from_markets`) each array has one row per parameter set, in
+        flattened order, and rows are memoized individually.
+
+        :param points: number of utilization points
+        :type points: int, optional
+        :return: dict of read only int64 arrays utilization, borrow_rate and supply_rate
+        :rtype: dict
+        """
+        parameters = self.get_parameters()
+        if not any(isinstance(parameter, np.ndarray) for parameter in parameters):
+            return get_rate_curve(parameters, points)
+        parameters = [parameter.ravel() for parameter in np.broadcast_arrays(*parameters)]
+        curves = [get_rate_curve(tuple(int(parameter[i]) for parameter in parameters), points) for i in range(parameters[0].size)]
+        curve = {name : np.stack([row[name] for row in curves]) for name in ("utilization", "borrow_rate", "supply_rate")}
+        for values in curve.values():
+            values.flags.writeable = False
+        return curve
+
+
+def get_utilization(underlying_borrowed, underlying_supplied):
+    """Returns utilization, underlying borrowed over underlying supplied, scaled by PARAMETER_SCALE_FACTOR
+
+    :param underlying_borrowed: underlying borrowed
+    :type underlying_borrowed: int or :class:`numpy.ndarray`
+    :param underlying_supplied: underlying supplied
+    :type underlying_supplied: int or :class:`numpy.ndarray`
+    :return: utilization
+    :rtype: int or :class:`numpy.ndarray`
+    """
+    if isinstance(underlying_borrowed, np.ndarray) or isinstance(underlying_supplied, np.ndarray):
+        # scale in python ints, underlying_borrowed * PARAMETER_SCALE overflows int64 above ~9.2e15 base units
+        underlying_borrowed = np.asarray(underlying_borrowed, dtype=object)
+        underlying_supplied = np.asarray(underlying_supplied, dtype=object)
+        utilization = np.floor_divide(underlying_borrowed * PARAMETER_SCALE, np.maximum(underlying_supplied, 1))
+        return np.where(underlying_supplied > 0, utilization, 0).astype(np.int64)
+    return underlying_borrowed * PARAMETER_SCALE // underlying_supplied if underlying_supplied > 0 else 0
+
+
+@lru_cache(maxsize=256)
+def get_rate_curve(parameters, points=PARAMETER_SCALE + 1):
+    """Returns the rate curve of a parameter set, computed once per (parameters, points)
+
+    :param parameters: (base_interest_rate, slope_1, slope_2, utilization_optimal, reserve_factor)
+    :type parameters: tuple
+    :param points: number of utilization points from 0 to PARAMETER_SCALE_FACTOR
+    :type points: int, optional
+    :return: dict of read only int64 arrays utilization, borrow_rate and supply_rate
+    :rtype: dict
+    """
+    model = InterestRateModel(*parameters)
+    utilization = np.linspace(0, PARAMETER_SCALE, points).astype(np.int64)
+    curve = {"utilization" : utilization,
+             "borrow_rate" : model.get_borrow_rate(utilization).astype(np.int64),
+             "supply_rate" : model.get_supply_rate(utilization).astype(np.int64)}
+    for values in curve.values():
+        values.flags.writeable = False
+    return curve
@@ -0,0 +1,181 @@
+import base64
+import time
+import numpy as np
+from ..utils import SCALE_FACTOR, REWARDS_SCALE_FACTOR, PARAMETER_SCALE_FACTOR, format_state
+from ..contract_strings import algofi_manager_strings as manager_strings
+from .health import USER_ACTIVE_COLLATERAL_KEY, USER_BORROW_SHARES_KEY
+
+
+def get_projected_coefficients(manager, markets, snapshot=None, now=None):
+    """Returns the rewards coefficient of each market projected to now, decoding the rewards program
+    parameters and pricing each market's tvl once. Markets without tvl keep their current coefficient.
+
+    :param manager: manager of the markets
+    :type manager: :class:`Manager`
+    :param markets: list of markets in the order seen in contracts.json
+    :type markets: list
+    :param snapshot: snapshot to read manager, market and oracle state from instead of the network
+    :type snapshot: :class:`ProtocolSnapshot`, optional
+    :param now: unix time to project to, defaults to the current time
+    :type now: int, optional
+    :return: list of projected coefficients in the order of markets
+    :rtype: list
+    """
+    if snapshot:
+        manager = manager.at_snapshot(snapshot)
+        markets = [market.at_snapshot(snapshot) for market in markets]
+    rewards_program = manager.get_rewards_program()
+    rewards_bitmap = rewards_program.rewards_bitmap
+
+    market_tvl = []
+    market_weighted_tvl_usd = []
+    for i, market in enumerate(markets):
+        if (rewards_bitmap >> i) & 1:
+            underlying_tvl = market.get_underlying_borrowed() + (market.get_active_collateral() * market.get_bank_to_underlying_exchange() / SCALE_FACTOR)
+            market_tvl.append(underlying_tvl)
+            market_weighted_tvl_usd.append(market.get_asset().to_usd(underlying_tvl, snapshot=snapshot))
+        else:
+            market_tvl.append(0)
+            market_weighted_tvl_usd.append(0)
+    total_weighted_tvl_usd = sum(market_weighted_tvl_usd)
+
+    time_elapsed = (int(time.time()) if now is None else now) - rewards_program.get_latest_rewards_time()
+    rewards_issued = time_elapsed * rewards_program.get_rewards_per_second() if rewards_program.get_rewards_amount() > 0 else 0
+
+    coefficients = []
+    for i, market in enumerate(markets):
+        market_counter_prefix = market.get_market_counter().to_bytes(8, byteorder="big").decode("utf-8")
+        coefficient = rewards_program.manager_state.get(market_counter_prefix + manager_strings.counter_indexed_rewards_coefficient, 0)
+        if market_tvl[i] and total_weighted_tvl_usd:
+            rewards_distributed_to_market = (rewards_issued * market_weighted_tvl_usd[i]) / total_weighted_tvl_usd
+            coefficient += int((rewards_distributed_to_market * REWARDS_SCALE_FACTOR) / market_tvl[i])
+        coefficients.append(coefficient)
+    return coefficients
+
+
+class RewardsEngine:
+
+    def __init__(self, markets, storage_addresses, active_collateral_bank, borrow_shares, user_coefficients,
+                 rewards_program_numbers, pending_rewards, secondary_pending_rewards):
+        """Constructor method for a columnar unrealized rewards engine over many storage accounts.
+
+        :param markets: list of markets, one per column, in the order seen in contracts.json
+        :type markets: list
+        :param storage_addresses: list of storage addresses, one per row
+        :type storage_addresses: list
+        :param active_collateral_bank: (accounts x markets) array of active collateral in bank asset base units
+        :type active_collateral_bank: :class:`numpy.ndarray`
+        :param borrow_shares: (accounts x markets) array of borrow shares
+        :type borrow_shares: :class:`numpy.ndarray`
+        :param user_coefficients: (accounts x markets) array of the rewards coefficient each account last claimed at
+        :type user_coefficients: :class:`numpy.ndarray`
+        :param rewards_program_numbers: per account array of the rewards program the account last claimed in
+        :type rewards_program_numbers: :class:`numpy.ndarray`
+        :param pending_rewards: per account array of pending primary rewards
+        :type pending_rewards: :class:`numpy.ndarray`
+        :param secondary_pending_rewards: per account array of pending secondary rewards
+        :type secondary_pending_rewards: :class:`numpy.ndarray`
+        """
+        self.markets = list(markets)
+        self.storage_addresses = list(storage_addresses)
+        shape = (len(self.storage_addresses), len(self.markets))
+        self.active_collateral_bank = np.asarray(active_collateral_bank, dtype=np.float64).reshape(shape)
+        self.borrow_shares = np.asarray(borrow_shares, dtype=np.float64).reshape(shape)
+        self.user_coefficients = np.asarray(user_coefficients, dtype=np.uint64).reshape(shape)
+        self.rewards_program_numbers = np.asarray(rewards_program_numbers, dtype=np.int64)
+        self.pending_rewards = np.asarray(pending_rewards, dtype=np.int64)
+        self.secondary_pending_rewards = np.asarray(secondary_pending_rewards, dtype=np.int64)
+
+    @classmethod
+    def from_client(cls, client, snapshot=None):
+        """Returns a rewards engine loaded with the manager and market local state of every storage account
+        of the client's lending protocol, read from the local state returned with each indexer page
+
+        :param client: client for the protocol
+        :type client: :class:`Client`
+        :param snapshot: snapshot to read the supported market count from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: rewards engine
+        :rtype: :class:`RewardsEngine`
+        """
+        manager = client.get_manager().at_snapshot(snapshot) if snapshot else client.get_manager()
+        manager_app_id = manager.get_manager_app_id()
+        symbols = client.get_active_ordered_symbols()[:manager.get_supported_market_count()]
+        markets = [client.get_market(symbol) for symbol in symbols]
+        columns = {market.get_market_app_id() : i for i, market in enumerate(markets)}
+        coefficient_keys = [market.get_market_counter().to_bytes(8, byteorder="big").decode("utf-8") + manager_strings.counter_to_user_rewards_coefficient_initial
+                            for market in markets]
+
+        storage_addresses, active_collateral_bank, borrow_shares, user_coefficients = [], [], [], []
+        rewards_program_numbers, pending_rewards, secondary_pending_rewards = [], [], []
+        for accounts, _ in client.iterate_storage_account_pages():
+            for account in accounts:
+                collateral_row = [0] * len(markets)
+                borrow_row = [0] * len(markets)
+                manager_state = {}
+                for local_state in account.get("apps-local-state", []):
+                    if local_state["id"] == manager_app_id:
+                        manager_state = format_state(local_state.get("key-value", []))
+                        continue
+                    column = columns.get(local_state["id"], None)
+                    if column is None:
+                        continue
+                    for field in local_state.get("key-value", []):
+                        if field["key"] == USER_ACTIVE_COLLATERAL_KEY:
+                            collateral_row[column] = field["value"]["uint"]
+                        elif field["key"] == USER_BORROW_SHARES_KEY:
+                            borrow_row[column] = field["value"]["uint"]
+                storage_addresses.append(account["address"])
+                active_collateral_bank.append(collateral_row)
+                borrow_shares.append(borrow_row)
+                user_coefficients.append([manager_state.get(key, 0) for key in coefficient_keys])
+                rewards_program_numbers.append(manager_state.get(manager_strings.user_rewards_program_number, 0))
+                pending_rewards.append(manager_state.get(manager_strings.user_pending_rewards, 0))
+                secondary_pending_rewards.append(manager_state.get(manager_strings.user_secondary_pending_rewards, 0))
+        return cls(markets, storage_addresses, active_collateral_bank, borrow_shares, user_coefficients,
+                   rewards_program_numbers, pending_rewards, secondary_pending_rewards)
+
+    def get_user_tvl(self, snapshot=None):
+        """Returns (accounts x markets) array of each account's underlying collateral plus borrow, the tvl
+        rewards accrue on, valued against the markets' state as of their last update
+
+        :param snapshot: snapshot to read market state from instead of the markets
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: array of underlying tvl
+        :rtype: :class:`numpy.ndarray`
+        """
+        markets = [market.at_snapshot(snapshot) for market in self.markets] if snapshot else self.markets
+        bank_to_underlying_exchange = np.array([market.get_bank_to_underlying_exchange() for market in markets], dtype=np.float64)
+        underlying_borrowed = np.array([market.get_underlying_borrowed() for market in markets], dtype=np.float64)
+        outstanding_borrow_shares = np.array([market.get_outstanding_borrow_shares() for market in markets], dtype=np.float64)
+        borrow_index = np.divide(underlying_borrowed, outstanding_borrow_shares,
+                                 out=np.zeros_like(outstanding_borrow_shares), where=outstanding_borrow_shares > 0)
+        return np.floor(self.active_collateral_bank * bank_to_underlying_exchange / SCALE_FACTOR) + np.floor(self.borrow_shares * borrow_index)
+
+    def get_unrealized_rewards(self, manager, snapshot=None, now=None):
+        """Returns dict of per account arrays of projected primary and secondary unrealized rewards, as
+        :meth:`RewardsProgram.get_storage_unrealized_rewards` computes them for one account
+
+        :param manager: manager of the markets
+        :type manager: :class:`Manager`
+        :param snapshot: snapshot to read manager, market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :param now: unix time to project to, defaults to the current time
+        :type now: int, optional
+        :return: dict with "primary" and "secondary" int64 arrays in the order of storage_addresses
+        :rtype: dict
+        """
+        coefficients = np.array(get_projected_coefficients(manager, self.markets, snapshot=snapshot, now=now), dtype=np.uint64)
+        rewards_program = (manager.at_snapshot(snapshot) if snapshot else manager).get_rewards_program()
+        on_current_program = self.rewards_program_numbers == rewards_program.get_rewards_program_number()
+        user_coefficients = np.where(on_current_program[:, None], self.user_coefficients, np.uint64(0))
+
+        # exact uint64 difference reinterpreted as signed, coefficients only grow so it stays small
+        coefficient_delta = (coefficients[None, :] - user_coefficients).view(np.int64).astype(np.float64)
+        unrealized_rewards = np.trunc(coefficient_delta * self.get_user_tvl(snapshot=snapshot) / REWARDS_SCALE_FACTOR)
+        secondary_unrealized_rewards = np.trunc(unrealized_rewards * rewards_program.get_rewards_secondary_ratio() / PARAMETER_SCALE_FACTOR)
+
+        return {
+            "primary" : np.where(on_current_program, self.pending_rewards, 0) + unrealized_rewards.sum(axis=1).astype(np.int64),
+            "secondary" : np.where(on_current_program, self.secondary_pending_rewards, 0) + secondary_unrealized_rewards.sum(axis=1).astype(np.int64),
+        }
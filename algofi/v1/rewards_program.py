@@ -23,6 +23,7 @@ class RewardsProgram:
         self.indexer = indexer_client
         self.historical_indexer = historical_indexer_client
 
+        self.manager_state = manager_state
         self.latest_rewards_time = manager_state.get(manager_strings.latest_rewards_time, 0)
         self.rewards_program_number = manager_state.get(manager_strings.n_rewards_programs, 0)
         self.rewards_amount = manager_state.get(manager_strings.rewards_amount, 0)
@@ -106,7 +107,7 @@ class RewardsProgram:
     
     # USER FUNCTIONS
     
-    def get_storage_unrealized_rewards(self, storage_address, manager, markets):
+    def get_storage_unrealized_rewards(self, storage_address, manager, markets, snapshot=None):
         """Return the projected claimable rewards for a given storage_address.
         Ordering of markets must be as seen in contracts.json.
         
@@ -116,12 +117,18 @@ class RewardsProgram:
         :type manager: :class:`Manager`
         :param markets: list of markets to get unrealized rewards for 
         :type markets: list
+        :param snapshot: snapshot to read market, oracle and local state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: tuple of primary and secondary unrealized rewards
         :rtype: (int, int)
         """
-        # get raw user state
-        manager_state = read_global_state(self.indexer, manager.get_manager_app_id())
-        manager_storage_state = read_local_state(self.indexer, storage_address, manager.get_manager_app_id())
+        # get raw user state, the manager global state was loaded with this rewards program
+        manager_state = self.manager_state
+        if snapshot:
+            manager_storage_state = snapshot.get_local_state(storage_address, manager.get_manager_app_id())
+            markets = [market.at_snapshot(snapshot) for market in markets]
+        else:
+            manager_storage_state = read_local_state(self.indexer, storage_address, manager.get_manager_app_id())
         on_current_program = self.get_rewards_program_number() == manager_storage_state.get(manager_strings.user_rewards_program_number, 0)
         total_unrealized_rewards = manager_storage_state.get(manager_strings.user_pending_rewards, 0) if on_current_program else 0
         total_secondary_unrealized_rewards = manager_storage_state.get(manager_strings.user_secondary_pending_rewards, 0) if on_current_program else 0
@@ -139,7 +146,7 @@ class RewardsProgram:
                 rewards_dist_param = int(rewards_dist_by_market[4*i:4*(i+1)], 2)
                 market_underlying_tvl = market.get_underlying_borrowed() + (market.get_active_collateral() * market.get_bank_to_underlying_exchange() / SCALE_FACTOR)
                 market_tvl[market] = market_underlying_tvl
-                market_underlying_weighted_tvl_usd = market.get_asset().to_usd(market_underlying_tvl)
+                market_underlying_weighted_tvl_usd = market.get_asset().to_usd(market_underlying_tvl, snapshot=snapshot)
                 market_weighted_tvl_usd[market] = market_underlying_weighted_tvl_usd
                 total_weighted_tvl_usd += market_underlying_weighted_tvl_usd
             else:
@@ -160,7 +167,10 @@ class RewardsProgram:
             rewards_distributed_to_market = (rewards_issued * market_weighted_tvl_usd[market]) / total_weighted_tvl_usd
             projected_coefficient = coefficient + int((rewards_distributed_to_market * REWARDS_SCALE_FACTOR) / (market_tvl[market]))
 
-            market_storage_state = market.get_storage_state(storage_address)
+            if snapshot:
+                market_storage_state = market.get_storage_state_from_local_state(snapshot.get_local_state(storage_address, market.get_market_app_id()), snapshot=snapshot)
+            else:
+                market_storage_state = market.get_storage_state(storage_address)
             user_tvl = market_storage_state["active_collateral_underlying"] + market_storage_state["borrow_underlying"]
             unrealized_rewards = int((projected_coefficient - user_coefficient)
                                         * user_tvl
@@ -0,0 +1,205 @@
+from types import MappingProxyType
+from ..utils import format_state, map_concurrently
+
+
+def get_protocol_app_ids(client):
+    """Returns the ids of the manager, market and oracle applications of a client's protocol,
+    including its staking contracts
+
+    :param client: client for the protocol
+    :type client: :class:`Client`
+    :return: list of app ids
+    :rtype: list
+    """
+    managers = [client.get_manager()] + [staking_contract.get_manager() for staking_contract in client.get_staking_contracts().values()]
+    markets = list(client.markets.values()) + [staking_contract.get_market() for staking_contract in client.get_staking_contracts().values()]
+    app_ids = [manager.get_manager_app_id() for manager in managers] + [market.get_market_app_id() for market in markets]
+    app_ids += [market.get_asset().get_oracle_app_id() for market in markets if market.get_asset()]
+    return list(dict.fromkeys(app_ids))
+
+
+class ProtocolSnapshot:
+
+    def __init__(self, round, global_states, local_states=None):
+        """Constructor method for an immutable snapshot of protocol state at a known round.
+
+        :param round: round at which the state was captured
+        :type round: int
+        :param global_states: dict of global state by app id for the manager, market and oracle applications
+        :type global_states: dict
+        :param local_states: dict of local state by app id, by storage address
+        :type local_states: dict, optional
+        """
+        self._round = round
+        self._global_states = MappingProxyType({app_id : MappingProxyType(dict(state)) for app_id, state in global_states.items()})
+        self._local_states = MappingProxyType({address : MappingProxyType({app_id : MappingProxyType(dict(state)) for app_id, state in states.items()})
+                                               for address, states in (local_states or {}).items()})
+
+    @classmethod
+    def capture(cls, client, storage_addresses=None, block=None, max_workers=None):
+        """Returns a snapshot of the manager, market and oracle global states of the client's protocol and
+        the local states of the given storage accounts, fetched in one concurrent sweep. Every request reads
+        the same round, the indexer's latest round when no block is given.
+
+        :param client: client for the protocol to capture
+        :type client: :class:`Client`
+        :param storage_addresses: storage addresses to capture local state for
+        :type storage_addresses: list, optional
+        :param block: block at which to capture historical state
+        :type block: int, optional
+        :param max_workers: maximum number of concurrent requests
+        :type max_workers: int, optional
+        :return: protocol snapshot
+        :rtype: :class:`ProtocolSnapshot`
+        """
+        indexer_client = client.historical_indexer if block else client.indexer
+        app_ids = get_protocol_app_ids(client)
+        storage_addresses = list(dict.fromkeys(storage_addresses or []))
+
+        # pin every request to one round so the states are consistent with each other
+        round = block if block is not None else indexer_client.health()["round"]
+
+        def fetch(request):
+            kind, key = request
+            try:
+                if kind == "app":
+                    return indexer_client.applications(key, round_num=round)
+                return indexer_client.account_info(key, round_num=round)
+            except:
+                raise Exception(("Application" if kind == "app" else "Account") + " does not exist.")
+
+        requests = [("app", app_id) for app_id in app_ids] + [("account", address) for address in storage_addresses]
+        responses = map_concurrently(fetch, requests, max_workers=max_workers)
+        return cls.from_responses(responses[:len(app_ids)], responses[len(app_ids):], block=round)
+
+    @classmethod
+    def from_responses(cls, application_responses, account_responses, block=None):
+        """Returns a snapshot built from raw indexer application and account responses
+
+        :param application_responses: list of indexer applications responses
+        :type application_responses: list
+        :param account_responses: list of indexer account_info responses
+        :type account_responses: list
+        :param block: block the responses were read at, defaults to the highest current round of the responses
+        :type block: int, optional
+        :return: protocol snapshot
+        :rtype: :class:`ProtocolSnapshot`
+        """
+        global_states = {}
+        local_states = {}
+        current_round = 0
+        for response in application_responses:
+            current_round = max(current_round, response.get("current-round", 0))
+            application = response.get("application", {})
+            global_states[application["id"]] = format_state(application["params"].get("global-state", []))
+        for response in account_responses:
+            current_round = max(current_round, response.get("current-round", 0))
+            account = response.get("account", {})
+            local_states[account["address"]] = {local_state["id"] : format_state(local_state.get("key-value", []))
+                                                 for local_state in account.get("apps-local-state", [])}
+        return cls(block if block is not None else current_round, global_states, local_states)
+
+    def updated(self, round, global_states=None, local_states=None):
+        """Returns a new snapshot at round with the given states replaced. Unchanged states are shared
+        with this snapshot rather than copied.
+
+        :param round: round of the new snapshot
+        :type round: int
+        :param global_states: dict of replacement global state by app id
+        :type global_states: dict, optional
+        :param local_states: dict of replacement local state by app id, by storage address. The states of
+            each given address replace all of its local states.
+        :type local_states: dict, optional
+        :return: protocol snapshot
+        :rtype: :class:`ProtocolSnapshot`
+        """
+        snapshot = ProtocolSnapshot.__new__(ProtocolSnapshot)
+        snapshot._round = round
+        merged_global_states = dict(self._global_states)
+        merged_global_states.update({app_id : MappingProxyType(dict(state)) for app_id, state in (global_states or {}).items()})
+        snapshot._global_states = MappingProxyType(merged_global_states)
+        merged_local_states = dict(self._local_states)
+        merged_local_states.update({address : MappingProxyType({app_id : MappingProxyType(dict(state)) for app_id, state in states.items()})
+                                    for address, states in (local_states or {}).items()})
+        snapshot._local_states = MappingProxyType(merged_local_states)
+        return snapshot
+
+    # GETTERS
+
+    def get_round(self):
+        """Returns the round at which the snapshot was captured
+
+        :return: round
+        :rtype: int
+        """
+        return self._round
+
+    def get_app_ids(self):
+        """Returns the ids of the applications with global state in the snapshot
+
+        :return: list of app ids
+        :rtype: list
+        """
+        return list(self._global_states.keys())
+
+    def get_storage_addresses(self):
+        """Returns the storage addresses with local state in the snapshot
+
+        :return: list of storage addresses
+        :rtype: list
+        """
+        return list(self._local_states.keys())
+
+    def get_global_state(self, app_id):
+        """Returns the global state of the application with id app_id
+
+        :param app_id: id of the application
+        :type app_id: int
+        :return: read-only dict of global state
+        :rtype: :class:`MappingProxyType`
+        """
+        if app_id not in self._global_states:
+            raise Exception("Application " + str(app_id) + " not in snapshot.")
+        return self._global_states[app_id]
+
+    def get_global_state_field(self, app_id, field_name):
+        """Returns a field of the global state of the application with id app_id
+
+        :param app_id: id of the application
+        :type app_id: int
+        :param field_name: name of the global state field
+        :type field_name: string
+        :return: value of global state variable for app
+        :rtype: int or string
+        """
+        data = self.get_global_state(app_id)
+        if field_name in data:
+            return data[field_name]
+        else:
+            raise Exception("Key not found")
+
+    def get_local_state(self, storage_address, app_id):
+        """Returns the local state of storage_address for the application with id app_id
+
+        :param storage_address: storage address to get state for
+        :type storage_address: string
+        :param app_id: id of the application
+        :type app_id: int
+        :return: read-only dict of local state, empty if the account is not opted in
+        :rtype: :class:`MappingProxyType`
+        """
+        if storage_address not in self._local_states:
+            raise Exception("Account " + storage_address + " not in snapshot.")
+        return self._local_states[storage_address].get(app_id, MappingProxyType({}))
+
+    def get_local_states(self, storage_address):
+        """Returns the local states of storage_address for every application it is opted into
+
+        :param storage_address: storage address to get states for
+        :type storage_address: string
+        :return: read-only dict of local state by app id
+        :rtype: :class:`MappingProxyType`
+        """
+        if storage_address not in self._local_states:
+            raise Exception("Account " + storage_address + " not in snapshot.")
+        return self._local_states[storage_address]
@@ -11,7 +11,7 @@ from .manager import Manager
 from .market import Market
 
 class StakingContract:
-    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, staking_contract_info):
+    def __init__(self, indexer_client: IndexerClient, historical_indexer_client: IndexerClient, staking_contract_info, manager_state=None, market_state=None, asset_infos=None):
         """Constructor method for the generic client.
 
         :param indexer_client: a :class:`IndexerClient` for interacting with the network
@@ -20,16 +20,20 @@ class StakingContract:
         :type historical_indexer_client: :class:`IndexerClient`
         :param staking_contract_info: dictionary of staking contract information
         :type staking_contract_info: dict
+        :param manager_state: prefetched manager global state, read from the indexer if not provided
+        :type manager_state: dict, optional
+        :param market_state: prefetched market global state, read from the indexer if not provided
+        :type market_state: dict, optional
+        :param asset_infos: prefetched asset params by asset id, read from the indexer if not provided
+        :type asset_infos: dict, optional
         """
 
         self.indexer = indexer_client
         self.historical_indexer = historical_indexer_client
 
-        self.manager = Manager(self.indexer, self.historical_indexer, staking_contract_info.get("managerAppId"))
-        self.market = Market(self.indexer, self.historical_indexer, staking_contract_info.get("marketAppId"))
-        
-        # read manager and market global state
-        self.update_global_state()
+        # constructing the manager and market reads their global state
+        self.manager = Manager(self.indexer, self.historical_indexer, staking_contract_info.get("managerAppId"), manager_state=manager_state)
+        self.market = Market(self.indexer, self.historical_indexer, staking_contract_info.get("marketAppId"), market_state=market_state, asset_infos=asset_infos)
     
     def update_global_state(self, block=None):
         """Method to fetch most recent staking contract global state
@@ -148,20 +152,22 @@ class StakingContract:
             raise Exception("no storage address found")
         return self.get_storage_state(storage_address)
     
-    def get_storage_state(self, storage_address):
+    def get_storage_state(self, storage_address, snapshot=None):
         """Returns the staking contract local state for storage_address.
 
         :param storage_address: storage address to get info for
         :type storage_address: string
+        :param snapshot: snapshot to read manager, market, oracle and local state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
         :return: staking contract local state for address
         :rtype: dict
         """
         result = {}
-        unrealized_rewards, secondary_unrealized_rewards = self.get_manager().get_storage_unrealized_rewards(storage_address, [self.get_market()])
+        unrealized_rewards, secondary_unrealized_rewards = self.get_manager().get_storage_unrealized_rewards(storage_address, [self.get_market()], snapshot=snapshot)
         result["unrealized_rewards"] = unrealized_rewards
         result["secondary_unrealized_rewards"] = secondary_unrealized_rewards
     
-        user_market_state = self.get_market().get_storage_state(storage_address)
+        user_market_state = self.get_market().get_storage_state(storage_address, snapshot=snapshot)
         result["staked_bank"] = user_market_state["active_collateral_bank"]
         result["staked_underlying"] = user_market_state["active_collateral_underlying"]
         
@@ -0,0 +1,267 @@
+import json
+import sqlite3
+from base64 import b64decode, b64encode
+from threading import Lock
+from .snapshot import ProtocolSnapshot
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS global_states (app_id INTEGER NOT NULL, round INTEGER NOT NULL, state TEXT NOT NULL,
+                                          PRIMARY KEY (app_id, round));
+CREATE TABLE IF NOT EXISTS local_states (address TEXT NOT NULL, app_id INTEGER NOT NULL, round INTEGER NOT NULL, state TEXT,
+                                         PRIMARY KEY (address, app_id, round));
+CREATE INDEX IF NOT EXISTS local_states_by_app ON local_states (app_id, round);
+CREATE TABLE IF NOT EXISTS snapshots (round INTEGER PRIMARY KEY);
+"""
+
+
+def _encode(value):
+    return {"b" : b64encode(value).decode()} if isinstance(value, bytes) else value
+
+
+def _decode(value):
+    return b64decode(value["b"]) if isinstance(value, dict) else value
+
+
+def dumps_state(state):
+    """Returns formatted state as json, bytes keys and values (left undecoded by format_state) are kept as base64
+
+    :param state: formatted state
+    :type state: dict
+    :return: json string
+    :rtype: string
+    """
+    return json.dumps([[_encode(key), _encode(value)] for key, value in state.items()], separators=(",", ":"))
+
+
+def loads_state(data):
+    """Returns formatted state from json written by :func:`dumps_state`
+
+    :param data: json string
+    :type data: string
+    :return: formatted state
+    :rtype: dict
+    """
+    return {_decode(key) : _decode(value) for key, value in json.loads(data)}
+
+
+class StateStore:
+
+    def __init__(self, path=":memory:"):
+        """Constructor method for an SQLite store of protocol state keyed by round. Manager (including rewards
+        program parameters), market and oracle global states and storage account local states are stored as
+        deltas, a row is only written when a state differs from its latest stored value, and are indexed by
+        app id and address for range queries.
+
+        :param path: database file, defaults to an in-memory database
+        :type path: string, optional
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = Lock()
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Closes the database connection
+        """
+        self.connection.close()
+
+    # WRITES
+
+    def save_global_states(self, round, global_states):
+        """Stores the global states that changed since their latest stored value
+
+        :param round: round the states were read at
+        :type round: int
+        :param global_states: dict of global state by app id
+        :type global_states: dict
+        """
+        with self.lock, self.connection:
+            for app_id, state in global_states.items():
+                data = dumps_state(state)
+                latest = self.connection.execute("SELECT state FROM global_states WHERE app_id = ? AND round <= ? ORDER BY round DESC LIMIT 1",
+                                                  (app_id, round)).fetchone()
+                if latest is None or latest[0] != data:
+                    self.connection.execute("INSERT OR REPLACE INTO global_states VALUES (?, ?, ?)", (app_id, round, data))
+
+    def save_local_states(self, round, local_states):
+        """Stores the local states that changed since their latest stored value. The states of each address
+        are complete, so apps missing from them are recorded as closed out.
+
+        :param round: round the states were read at
+        :type round: int
+        :param local_states: dict of local state by app id, by address
+        :type local_states: dict
+        """
+        with self.lock, self.connection:
+            for address, states in local_states.items():
+                latest = dict(self.connection.execute(
+                    "SELECT app_id, state FROM local_states AS l WHERE address = ? AND round = "
+                    "(SELECT MAX(round) FROM local_states WHERE address = l.address AND app_id = l.app_id AND round <= ?)",
+                    (address, round)).fetchall())
+                updates = {app_id : dumps_state(state) for app_id, state in states.items()}
+                updates.update({app_id : None for app_id, data in latest.items() if app_id not in states and data is not None})
+                for app_id, data in updates.items():
+                    if app_id not in latest or latest[app_id] != data:
+                        self.connection.execute("INSERT OR REPLACE INTO local_states VALUES (?, ?, ?, ?)", (address, app_id, round, data))
+
+    def save_snapshot(self, snapshot):
+        """Stores the states of a snapshot and marks its round as a complete snapshot
+
+        :param snapshot: snapshot to store
+        :type snapshot: :class:`ProtocolSnapshot`
+        """
+        round = snapshot.get_round()
+        self.save_global_states(round, {app_id : snapshot.get_global_state(app_id) for app_id in snapshot.get_app_ids()})
+        self.save_local_states(round, {address : dict(snapshot.get_local_states(address)) for address in snapshot.get_storage_addresses()})
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO snapshots VALUES (?)", (round,))
+
+    def attach(self, block_follower):
+        """Stores the states re-read by a block follower after every round it applies
+
+        :param block_follower: block follower to record
+        :type block_follower: :class:`BlockFollower`
+        """
+        def record(round, app_ids, storage_addresses):
+            snapshot = block_follower.get_snapshot()
+            self.save_global_states(round, {app_id : snapshot.get_global_state(app_id) for app_id in app_ids})
+            self.save_local_states(round, {address : dict(snapshot.get_local_states(address)) for address in storage_addresses})
+        self.save_snapshot(block_follower.get_snapshot())
+        block_follower.subscribe(record)
+
+    # READS
+
+    def get_latest_snapshot_round(self):
+        """Returns the round of the latest complete snapshot or None if there is none
+
+        :return: round
+        :rtype: int
+        """
+        with self.lock:
+            return self.connection.execute("SELECT MAX(round) FROM snapshots").fetchone()[0]
+
+    def get_latest_round(self):
+        """Returns the latest round any state was stored at or None if the store is empty
+
+        :return: round
+        :rtype: int
+        """
+        with self.lock:
+            rounds = self.connection.execute("SELECT (SELECT MAX(round) FROM global_states), (SELECT MAX(round) FROM local_states)").fetchone()
+        rounds = [r for r in rounds if r is not None]
+        return max(rounds) if rounds else None
+
+    def get_global_state(self, app_id, round=None):
+        """Returns the global state of the application as of round or None if none is stored
+
+        :param app_id: id of the application
+        :type app_id: int
+        :param round: round to read at, defaults to the latest
+        :type round: int, optional
+        :return: global state
+        :rtype: dict
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT state FROM global_states WHERE app_id = ? AND round <= ? ORDER BY round DESC LIMIT 1",
+                                          (app_id, round if round is not None else 2**63 - 1)).fetchone()
+        return loads_state(row[0]) if row else None
+
+    def get_global_state_history(self, app_id, start_round, end_round):
+        """Returns the stored changes of the application's global state in a round range, plus the state in
+        effect at start_round
+
+        :param app_id: id of the application
+        :type app_id: int
+        :param start_round: first round
+        :type start_round: int
+        :param end_round: last round
+        :type end_round: int
+        :return: list of (round, global state) in round order
+        :rtype: list
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT round, state FROM global_states WHERE app_id = ? AND round >= "
+                "COALESCE((SELECT MAX(round) FROM global_states WHERE app_id = ? AND round <= ?), ?) AND round <= ? ORDER BY round",
+                (app_id, app_id, start_round, start_round, end_round)).fetchall()
+        return [(round, loads_state(data)) for round, data in rows]
+
+    def get_local_states(self, address, round=None):
+        """Returns the local states of the address as of round
+
+        :param address: account address
+        :type address: string
+        :param round: round to read at, defaults to the latest
+        :type round: int, optional
+        :return: dict of local state by app id
+        :rtype: dict
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT app_id, state FROM local_states AS l WHERE address = ? AND round = "
+                "(SELECT MAX(round) FROM local_states WHERE address = l.address AND app_id = l.app_id AND round <= ?)",
+                (address, round if round is not None else 2**63 - 1)).fetchall()
+        return {app_id : loads_state(data) for app_id, data in rows if data is not None}
+
+    def get_local_state_history(self, address, app_id, start_round, end_round):
+        """Returns the stored changes of the address's local state for the application in a round range, plus
+        the state in effect at start_round. Closed out rounds have an empty state.
+
+        :param address: account address
+        :type address: string
+        :param app_id: id of the application
+        :type app_id: int
+        :param start_round: first round
+        :type start_round: int
+        :param end_round: last round
+        :type end_round: int
+        :return: list of (round, local state) in round order
+        :rtype: list
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT round, state FROM local_states WHERE address = ? AND app_id = ? AND round >= "
+                "COALESCE((SELECT MAX(round) FROM local_states WHERE address = ? AND app_id = ? AND round <= ?), ?) AND round <= ? ORDER BY round",
+                (address, app_id, address, app_id, start_round, start_round, end_round)).fetchall()
+        return [(round, loads_state(data) if data is not None else {}) for round, data in rows]
+
+    def get_addresses(self, app_id=None):
+        """Returns the addresses with stored local state, optionally only those with state for app_id
+
+        :param app_id: id of the application
+        :type app_id: int, optional
+        :return: list of addresses
+        :rtype: list
+        """
+        with self.lock:
+            if app_id is None:
+                rows = self.connection.execute("SELECT DISTINCT address FROM local_states").fetchall()
+            else:
+                rows = self.connection.execute("SELECT DISTINCT address FROM local_states WHERE app_id = ?", (app_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def load_snapshot(self, round=None, storage_addresses=None):
+        """Returns a snapshot of the stored state as of round, to warm start a client with
+        :meth:`Client.load_snapshot` without network requests
+
+        :param round: round to load, defaults to the latest stored round
+        :type round: int, optional
+        :param storage_addresses: storage addresses to load local state for, defaults to all stored addresses
+        :type storage_addresses: list, optional
+        :return: protocol snapshot
+        :rtype: :class:`ProtocolSnapshot`
+        """
+        if round is None:
+            round = self.get_latest_round()
+            if round is None:
+                raise Exception("State store is empty")
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT app_id, state FROM global_states AS g WHERE round = "
+                "(SELECT MAX(round) FROM global_states WHERE app_id = g.app_id AND round <= ?)", (round,)).fetchall()
+        global_states = {app_id : loads_state(data) for app_id, data in rows}
+        if storage_addresses is None:
+            storage_addresses = self.get_addresses()
+        local_states = {address : self.get_local_states(address, round) for address in storage_addresses}
+        return ProtocolSnapshot(round, global_states, local_states)
@@ -0,0 +1,169 @@
+import os
+import json
+import base64
+from algosdk import encoding, logic
+from ..contract_strings import algofi_manager_strings as manager_strings
+
+# base64 encoded manager local state key holding the user address of a storage account
+USER_ADDRESS_KEY = base64.b64encode(manager_strings.user_address.encode()).decode()
+
+
+class StorageAddressIndex:
+
+    def __init__(self, manager_app_id, path=None):
+        """Constructor method for a two-way index of user address to storage address for one manager
+        application. Storage addresses never change once opted in, so the index can be persisted between
+        runs and brought up to date from the opt-in transactions made since its last synced round.
+
+        :param manager_app_id: manager app id
+        :type manager_app_id: int
+        :param path: json file to load the index from and save it to
+        :type path: string, optional
+        """
+        self.manager_app_id = manager_app_id
+        self.manager_address = logic.get_application_address(manager_app_id)
+        self.path = path
+        self.round = None
+        self.storage_by_user = {}
+        self.user_by_storage = {}
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.storage_by_user)
+
+    # GETTERS
+
+    def get_storage_address(self, user_address):
+        """Returns the storage address of the user or None if it is not indexed
+
+        :param user_address: address of the user
+        :type user_address: string
+        :return: storage address
+        :rtype: string
+        """
+        return self.storage_by_user.get(user_address, None)
+
+    def get_user_address(self, storage_address):
+        """Returns the user address owning the storage address or None if it is not indexed
+
+        :param storage_address: storage address
+        :type storage_address: string
+        :return: user address
+        :rtype: string
+        """
+        return self.user_by_storage.get(storage_address, None)
+
+    def get_round(self):
+        """Returns the round the index was last synced at, None if it was never synced
+
+        :return: round
+        :rtype: int
+        """
+        return self.round
+
+    # UPDATES
+
+    def add(self, user_address, storage_address):
+        """Adds a user and storage address pair to the index
+
+        :param user_address: address of the user
+        :type user_address: string
+        :param storage_address: storage address of the user
+        :type storage_address: string
+        """
+        self.storage_by_user[user_address] = storage_address
+        self.user_by_storage[storage_address] = user_address
+
+    def add_accounts(self, accounts):
+        """Adds every storage account in a list of indexer account dicts, read from the user address
+        in the account's manager local state
+
+        :param accounts: list of account information dicts including apps-local-state
+        :type accounts: list
+        """
+        for account in accounts:
+            for local_state in account.get("apps-local-state", []):
+                if local_state["id"] != self.manager_app_id:
+                    continue
+                for field in local_state.get("key-value", []):
+                    if field["key"] == USER_ADDRESS_KEY:
+                        user_address = encoding.encode_address(base64.b64decode(field["value"]["bytes"]))
+                        self.add(user_address, account["address"])
+
+    def add_transactions(self, transactions):
+        """Adds the user and storage pairs of the manager opt in groups in a list of indexer transaction
+        dicts. The storage account is the opt in sender rekeyed to the manager address and the user is the
+        other opt in sender of its group.
+
+        :param transactions: list of indexer transaction dicts
+        :type transactions: list
+        """
+        groups = {}
+        for txn in transactions:
+            app_txn = txn.get("application-transaction", {})
+            if app_txn.get("application-id", None) != self.manager_app_id or app_txn.get("on-completion", None) != "optin" or not txn.get("group", None):
+                continue
+            group = groups.setdefault(txn["group"], {})
+            if txn.get("rekey-to", None) == self.manager_address:
+                group["storage"] = txn["sender"]
+            else:
+                group["user"] = txn["sender"]
+        for group in groups.values():
+            if "storage" in group and "user" in group:
+                self.add(group["user"], group["storage"])
+
+    def sync(self, indexer_client):
+        """Brings the index up to date. An index that was never synced is filled from one paginated sweep
+        of the accounts opted into the manager, otherwise only the manager opt in transactions made after
+        the last synced round are read.
+
+        :param indexer_client: a :class:`IndexerClient` for interacting with the network
+        :type indexer_client: :class:`IndexerClient`
+        """
+        next_page = ""
+        synced_round = self.round
+        while next_page is not None:
+            if self.round is None:
+                data = indexer_client.accounts(limit=1000, next_page=next_page, application_id=self.manager_app_id)
+                self.add_accounts(data.get("accounts", []))
+            else:
+                data = indexer_client.search_transactions(limit=1000, next_page=next_page, txn_type="appl",
+                                                          application_id=self.manager_app_id, min_round=self.round + 1)
+                self.add_transactions(data.get("transactions", []))
+            synced_round = max(synced_round or 0, data.get("current-round", 0))
+            next_page = data.get("next-token", None)
+        self.round = synced_round
+
+    # PERSISTENCE
+
+    def save(self, path=None):
+        """Saves the index as json
+
+        :param path: file to save to, defaults to the path the index was created with
+        :type path: string, optional
+        """
+        path = path or self.path
+        if not path:
+            raise Exception("No path to save storage address index to")
+        data = {"manager_app_id" : self.manager_app_id, "round" : self.round, "storage_by_user" : self.storage_by_user}
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path=None):
+        """Loads the index from json
+
+        :param path: file to load from, defaults to the path the index was created with
+        :type path: string, optional
+        """
+        path = path or self.path
+        with open(path) as f:
+            data = json.load(f)
+        if data["manager_app_id"] != self.manager_app_id:
+            raise Exception("Storage address index at " + path + " is for manager " + str(data["manager_app_id"]))
+        self.round = data["round"]
+        self.storage_by_user = {}
+        self.user_by_storage = {}
+        for user_address, storage_address in data["storage_by_user"].items():
+            self.add(user_address, storage_address)
@@ -0,0 +1,200 @@
+import numpy as np
+from .health import HealthEngine
+from .liquidation import CLOSE_FACTOR
+
+# default bytes of per scenario working arrays held at once
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+# (borrowing accounts x scenarios) float64 arrays alive per chunk
+CHUNK_ARRAY_COUNT = 6
+
+EXPOSURE_KEYS = ("collateral_usd", "max_borrow_usd", "borrowed_usd", "shortfall_usd", "liquidatable_usd", "liquidatable_accounts")
+
+
+class StressEngine:
+
+    def __init__(self, symbols, health_engine, snapshot=None):
+        """Constructor method for a price shock stress engine over many storage accounts. Positions are
+        valued once at current prices, per market, so a scenario of price multipliers revalues every account
+        with one matrix product. Accounts without borrows can not be liquidated and are only counted in the
+        collateral totals.
+
+        :param symbols: list of market symbols, one per column of the health engine
+        :type symbols: list
+        :param health_engine: positions to stress
+        :type health_engine: :class:`HealthEngine`
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        """
+        if len(symbols) != len(health_engine.markets):
+            raise Exception("symbols do not match health engine markets")
+        self.symbols = list(symbols)
+        self.health_engine = health_engine
+        self.update_market_state(snapshot=snapshot)
+
+    @classmethod
+    def from_client(cls, client, snapshot=None):
+        """Returns a stress engine over every storage account of the client's lending protocol
+
+        :param client: client for the protocol
+        :type client: :class:`Client`
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: stress engine
+        :rtype: :class:`StressEngine`
+        """
+        health_engine = HealthEngine.from_client(client, snapshot=snapshot)
+        return cls(client.get_active_ordered_symbols()[:len(health_engine.markets)], health_engine, snapshot=snapshot)
+
+    @classmethod
+    def from_position_book(cls, book, snapshot=None):
+        """Returns a stress engine over the positions in a position book
+
+        :param book: position book
+        :type book: :class:`PositionBook`
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        :return: stress engine
+        :rtype: :class:`StressEngine`
+        """
+        return cls(book.symbols, book.to_health_engine(), snapshot=snapshot)
+
+    # GETTERS
+
+    def get_symbols(self):
+        """Returns the market symbols in the row order of price multipliers
+
+        :return: list of symbols
+        :rtype: list
+        """
+        return self.symbols
+
+    def get_storage_addresses(self):
+        """Returns the storage addresses in the row order of per account results
+
+        :return: list of storage addresses
+        :rtype: list
+        """
+        return self.health_engine.storage_addresses
+
+    def get_price_multipliers(self, scenarios):
+        """Returns the (markets x scenarios) price multipliers of scenarios given as relative price changes,
+        markets missing from a scenario keep their price
+
+        :param scenarios: list of dicts of relative price change by symbol, e.g. {"ALGO" : -0.2}
+        :type scenarios: list
+        :return: array of price multipliers
+        :rtype: :class:`numpy.ndarray`
+        """
+        multipliers = np.ones((len(self.symbols), len(scenarios)), dtype=np.float64)
+        rows = {symbol : i for i, symbol in enumerate(self.symbols)}
+        for column, scenario in enumerate(scenarios):
+            for symbol, change in scenario.items():
+                if symbol not in rows:
+                    raise Exception("unknown market symbol " + symbol)
+                multipliers[rows[symbol], column] = 1 + change
+        return multipliers
+
+    def get_chunk_size(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """Returns the number of scenarios evaluated together within memory_budget
+
+        :param memory_budget: bytes of working arrays held at once
+        :type memory_budget: int, optional
+        :return: scenarios per chunk
+        :rtype: int
+        """
+        bytes_per_scenario = max(len(self.borrower_rows), 1) * CHUNK_ARRAY_COUNT * np.dtype(np.float64).itemsize
+        return max(int(memory_budget // bytes_per_scenario), 1)
+
+    # UPDATES
+
+    def update_market_state(self, snapshot=None):
+        """Revalues the positions per market at current market and oracle state, the base every scenario
+        multiplies
+
+        :param snapshot: snapshot to read market and oracle state from instead of the network
+        :type snapshot: :class:`ProtocolSnapshot`, optional
+        """
+        health = self.health_engine.get_health(snapshot=snapshot)
+        self.collateral_usd = health["active_collateral_usd"].sum(axis=0)
+        self.total_max_borrow_usd = health["active_collateral_max_borrow_usd"].sum(axis=0)
+        self.borrower_rows = np.flatnonzero(health["borrowed_usd"] > 0)
+        self.max_borrow_usd = np.ascontiguousarray(health["active_collateral_max_borrow_usd"][self.borrower_rows])
+        self.borrow_usd = np.ascontiguousarray(health["borrow_usd"][self.borrower_rows])
+
+    # STRESS
+
+    def _check_multipliers(self, price_multipliers):
+        price_multipliers = np.asarray(price_multipliers, dtype=np.float64)
+        if price_multipliers.ndim == 1:
+            price_multipliers = price_multipliers.reshape(-1, 1)
+        if price_multipliers.shape[0] != len(self.symbols):
+            raise Exception("price multipliers must have one row per market")
+        return price_multipliers
+
+    def iterate_borrower_stress(self, price_multipliers, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """Yields the stressed positions of every account with borrows, one chunk of scenarios at a time
+        sized to memory_budget
+
+        :param price_multipliers: (markets x scenarios) array of multipliers applied to current prices
+        :type price_multipliers: :class:`numpy.ndarray`
+        :param memory_budget: bytes of working arrays held at once
+        :type memory_budget: int, optional
+        :return: generator of (scenario slice, dict of (borrowing accounts x chunk scenarios) arrays
+            max_borrow_usd, borrowed_usd, health_factor, shortfall_usd and liquidatable_usd)
+        :rtype: generator
+        """
+        price_multipliers = self._check_multipliers(price_multipliers)
+        chunk_size = self.get_chunk_size(memory_budget)
+        for start in range(0, price_multipliers.shape[1], chunk_size):
+            chunk = slice(start, min(start + chunk_size, price_multipliers.shape[1]))
+            multipliers = price_multipliers[:, chunk]
+            max_borrow_usd = self.max_borrow_usd @ multipliers
+            borrowed_usd = self.borrow_usd @ multipliers
+            health_factor = np.divide(max_borrow_usd, borrowed_usd, out=np.full_like(borrowed_usd, np.inf), where=borrowed_usd > 0)
+            shortfall_usd = np.maximum(borrowed_usd - max_borrow_usd, 0)
+            liquidatable_usd = np.where(shortfall_usd > 0, borrowed_usd * CLOSE_FACTOR, 0)
+            yield chunk, {"max_borrow_usd" : max_borrow_usd, "borrowed_usd" : borrowed_usd, "health_factor" : health_factor,
+                          "shortfall_usd" : shortfall_usd, "liquidatable_usd" : liquidatable_usd}
+
+    def get_account_stress(self, price_multipliers, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """Returns dict of (accounts x scenarios) arrays of health_factor (inf with no borrow), shortfall_usd
+        (borrowed over max borrow) and liquidatable_usd (the share of borrow liquidators may repay) for every
+        storage account
+
+        :param price_multipliers: (markets x scenarios) array of multipliers applied to current prices
+        :type price_multipliers: :class:`numpy.ndarray`
+        :param memory_budget: bytes of working arrays held at once, besides the result
+        :type memory_budget: int, optional
+        :return: dict of numpy arrays by field name
+        :rtype: dict
+        """
+        price_multipliers = self._check_multipliers(price_multipliers)
+        shape = (len(self.health_engine.storage_addresses), price_multipliers.shape[1])
+        result = {"health_factor" : np.full(shape, np.inf), "shortfall_usd" : np.zeros(shape), "liquidatable_usd" : np.zeros(shape)}
+        for chunk, stress in self.iterate_borrower_stress(price_multipliers, memory_budget=memory_budget):
+            for key, values in result.items():
+                values[self.borrower_rows, chunk] = stress[key]
+        return result
+
+    def get_exposure(self, price_multipliers, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """Returns the protocol exposure curves, dict of per scenario arrays of collateral_usd,
+        max_borrow_usd, borrowed_usd, shortfall_usd, liquidatable_usd and liquidatable_accounts
+
+        :param price_multipliers: (markets x scenarios) array of multipliers applied to current prices
+        :type price_multipliers: :class:`numpy.ndarray`
+        :param memory_budget: bytes of working arrays held at once
+        :type memory_budget: int, optional
+        :return: dict of numpy arrays by field name
+        :rtype: dict
+        """
+        price_multipliers = self._check_multipliers(price_multipliers)
+        exposure = {key : np.zeros(price_multipliers.shape[1]) for key in EXPOSURE_KEYS}
+        exposure["liquidatable_accounts"] = np.zeros(price_multipliers.shape[1], dtype=np.int64)
+        exposure["collateral_usd"] = self.collateral_usd @ price_multipliers
+        exposure["max_borrow_usd"] = self.total_max_borrow_usd @ price_multipliers
+        for chunk, stress in self.iterate_borrower_stress(price_multipliers, memory_budget=memory_budget):
+            exposure["borrowed_usd"][chunk] = stress["borrowed_usd"].sum(axis=0)
+            exposure["shortfall_usd"][chunk] = stress["shortfall_usd"].sum(axis=0)
+            exposure["liquidatable_usd"][chunk] = stress["liquidatable_usd"].sum(axis=0)
+            exposure["liquidatable_accounts"][chunk] = (stress["shortfall_usd"] > 0).sum(axis=0)
+        return exposure
@@ -0,0 +1,101 @@
+"""
+Measures Client construction time for the serial and parallel construction modes.
+
+By default the benchmark runs against an in-process indexer that answers every request after a
+fixed delay, which isolates the number of sequential round trips from network noise. Pass --live
+to construct real clients against the public endpoints instead.
+
+    python benchmarks/client_startup.py --latency 0.05 --repeat 3
+    python benchmarks/client_startup.py --live --chain mainnet
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from base64 import b64encode
+
+# resolve the algofi package from the repository root without installing it or setting PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algofi.contract_strings import algofi_market_strings as market_strings
+from algofi.utils import get_market_app_id, get_ordered_symbols, get_staking_contracts
+from algofi.v1.client import Client, AlgofiMainnetClient, AlgofiTestnetClient
+
+
+def _encode_state(state):
+    encoded = []
+    for key, value in state.items():
+        if isinstance(value, str):
+            encoded_value = {"type": 1, "bytes": b64encode(value.encode()).decode(), "uint": 0}
+        else:
+            encoded_value = {"type": 2, "bytes": "", "uint": value}
+        encoded.append({"key": b64encode(key.encode()).decode(), "value": encoded_value})
+    return encoded
+
+
+class LatencyIndexer:
+    """Indexer stand-in serving synthetic protocol state after a fixed per-request delay"""
+
+    def __init__(self, chain, latency):
+        self.latency = latency
+        self.requests = 0
+        market_app_ids = [get_market_app_id(chain, symbol) for symbol in get_ordered_symbols(chain, max=True)]
+        market_app_ids += [info["marketAppId"] for info in get_staking_contracts(chain).values()]
+        self.market_states = {}
+        for i, app_id in enumerate(market_app_ids):
+            self.market_states[app_id] = {
+                market_strings.manager_market_counter_var: i + 1,
+                market_strings.asset_id: 1000 + i,
+                market_strings.bank_asset_id: 2000 + i,
+                market_strings.oracle_app_id: 3000 + i,
+                market_strings.oracle_price_field: "price",
+                market_strings.oracle_price_scale_factor: 1000,
+            }
+
+    def applications(self, app_id, round_num=None):
+        self.requests += 1
+        time.sleep(self.latency)
+        state = self.market_states.get(app_id, {})
+        return {"application": {"id": app_id, "params": {"global-state": _encode_state(state)}}}
+
+    def asset_info(self, asset_id):
+        self.requests += 1
+        time.sleep(self.latency)
+        return {"asset": {"params": {"decimals": 6}}}
+
+
+def time_construction(build, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", default="mainnet", choices=["mainnet", "testnet"])
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per indexer request")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="construct clients against the public endpoints")
+    args = parser.parse_args()
+
+    for parallel in [False, True]:
+        if args.live:
+            client_class = AlgofiMainnetClient if args.chain == "mainnet" else AlgofiTestnetClient
+            build = lambda: client_class(parallel=parallel)
+            requests = "-"
+        else:
+            indexer = LatencyIndexer(args.chain, args.latency)
+            build = lambda: Client(None, indexer, indexer, None, args.chain, parallel=parallel)
+            requests = None
+        elapsed = time_construction(build, args.repeat)
+        if requests is None:
+            requests = indexer.requests // args.repeat
+        print("%-8s  %8.3f s  %s requests" % ("parallel" if parallel else "serial", elapsed, requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Offline indexer and algod fixtures for the benchmarks.
+
+Fixtures are a json document of recorded responses keyed by request path:
+
+    {"chain": "mainnet",
+     "user_address": "...", "storage_address": "...", "private_key": "...",
+     "indexer": {"applications/<id>": {...}, "accounts/<address>": {...}, "assets/<id>": {...}},
+     "algod": {"transactions/params": {...}}}
+
+`record_fixtures` captures them from live clients. `build_synthetic_fixtures` builds a deterministic
+document of the same shape from contracts.json for runs without a recording.
+
+    python benchmarks/fixtures.py --record mainnet_fixtures.json --chain mainnet --user <address>
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+from algosdk import encoding
+from algosdk.future.transaction import SuggestedParams
+from nacl.signing import SigningKey
+
+# resolve the algofi package from the repository root without installing it or setting PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algofi.contract_strings import algofi_manager_strings as manager_strings
+from algofi.contract_strings import algofi_market_strings as market_strings
+from algofi.utils import format_state, get_manager_app_id, get_market_app_id, get_ordered_symbols, get_staking_contracts
+
+
+def encode_state(state):
+    """Returns state in the indexer key-value format. str values and raw bytes are byte values, ints are uints."""
+    encoded = []
+    for key, value in state.items():
+        if isinstance(value, (str, bytes)):
+            raw = value.encode() if isinstance(value, str) else value
+            encoded_value = {"type": 1, "bytes": base64.b64encode(raw).decode(), "uint": 0}
+        else:
+            encoded_value = {"type": 2, "bytes": "", "uint": value}
+        encoded.append({"key": base64.b64encode(key.encode() if isinstance(key, str) else key).decode(), "value": encoded_value})
+    return encoded
+
+
+def _key_pair(seed):
+    # 0xff is never valid utf-8, so decoded byte state stays base64 as it does for real addresses
+    signing_key = SigningKey(bytes([0xff] * 31 + [seed]))
+    public_key = signing_key.verify_key.encode()
+    return encoding.encode_address(public_key), base64.b64encode(signing_key.encode() + public_key).decode()
+
+
+def _address(seed):
+    return encoding.encode_address(bytes([0xff] * 31 + [seed]))
+
+
+def _counter_prefix(counter):
+    return counter.to_bytes(8, byteorder="big").decode("utf-8")
+
+
+def build_synthetic_fixtures(chain="mainnet"):
+    """Returns a deterministic fixture document for chain, with realistic magnitudes for every market,
+    oracle and manager in contracts.json and one user with a position in every active market"""
+    now = int(time.time())
+    user_address, private_key = _key_pair(1)
+    storage_address = _address(2)
+    indexer = {}
+
+    def application(app_id, state):
+        indexer["applications/%d" % app_id] = {"current-round": 20000000,
+                                                "application": {"id": app_id, "params": {"global-state": encode_state(state)}}}
+
+    managers = {get_manager_app_id(chain): [get_market_app_id(chain, symbol) for symbol in get_ordered_symbols(chain, max=True)]}
+    for info in get_staking_contracts(chain).values():
+        managers[info["managerAppId"]] = [info["marketAppId"]]
+
+    market_counters = {}
+    next_asset_id = 100000
+    for manager_app_id, market_app_ids in managers.items():
+        for counter, market_app_id in enumerate(market_app_ids, start=1):
+            if market_app_id in market_counters:
+                continue
+            market_counters[market_app_id] = counter
+            oracle_app_id = market_app_id + 1
+            asset_id = 1 if counter == 1 and manager_app_id == get_manager_app_id(chain) else next_asset_id
+            bank_asset_id = next_asset_id + 1
+            next_asset_id += 2
+            application(market_app_id, {
+                market_strings.manager_market_counter_var: counter,
+                market_strings.asset_id: asset_id,
+                market_strings.bank_asset_id: bank_asset_id,
+                market_strings.oracle_app_id: oracle_app_id,
+                market_strings.oracle_price_field: "latest_twap_price",
+                market_strings.oracle_price_scale_factor: 1000,
+                market_strings.collateral_factor: 800,
+                market_strings.liquidation_incentive: 1100,
+                market_strings.reserve_factor: 200,
+                market_strings.base_interest_rate: 0,
+                market_strings.slope_1: 200 * 10**6,
+                market_strings.slope_2: 3 * 10**9,
+                market_strings.utilization_optimal: 700,
+                market_strings.market_supply_cap_in_dollars: 10**15,
+                market_strings.market_borrow_cap_in_dollars: 10**15,
+                market_strings.active_collateral: 40 * 10**12,
+                market_strings.bank_circulation: 45 * 10**12,
+                market_strings.bank_to_underlying_exchange: 1020 * 10**6,
+                market_strings.underlying_borrowed: 20 * 10**12 + counter,
+                market_strings.outstanding_borrow_shares: 19 * 10**12,
+                market_strings.underlying_cash: 25 * 10**12,
+                market_strings.underlying_reserves: 10**11,
+                market_strings.total_borrow_interest_rate: 80 * 10**6,
+            })
+            application(oracle_app_id, {"latest_twap_price": 1000000 * counter, "latest_raw_price": 1000000 * counter})
+            if asset_id > 1:
+                indexer["assets/%d" % asset_id] = {"asset": {"index": asset_id, "params": {"decimals": 6, "unit-name": "A%d" % counter}}}
+            indexer["assets/%d" % bank_asset_id] = {"asset": {"index": bank_asset_id, "params": {"decimals": 6, "unit-name": "B%d" % counter}}}
+
+        manager_state = {
+            manager_strings.supported_market_count: min(len(market_app_ids), len(get_ordered_symbols(chain))),
+            manager_strings.latest_rewards_time: now - 60,
+            manager_strings.n_rewards_programs: 1,
+            manager_strings.rewards_amount: 10**12,
+            manager_strings.rewards_per_second: 10**6,
+            manager_strings.rewards_asset_id: 1,
+            manager_strings.rewards_secondary_ratio: 500,
+            manager_strings.rewards_secondary_asset_id: 0,
+            manager_strings.rewards_bitmap: 2**len(market_app_ids) - 1,
+            manager_strings.rewards_dist_by_market: int("0001" * len(market_app_ids), 2),
+        }
+        for counter in range(1, len(market_app_ids) + 1):
+            manager_state[_counter_prefix(counter) + manager_strings.counter_indexed_rewards_coefficient] = 10**15 * counter
+        application(manager_app_id, manager_state)
+
+    user_local_states = []
+    storage_local_states = []
+    for manager_app_id, market_app_ids in managers.items():
+        user_local_states.append({"id": manager_app_id, "key-value": encode_state(
+            {manager_strings.user_storage_address: encoding.decode_address(storage_address)})})
+        storage_state = {
+            manager_strings.user_address: encoding.decode_address(user_address),
+            manager_strings.user_global_max_borrow_in_dollars: 10**9,
+            manager_strings.user_global_borrowed_in_dollars: 4 * 10**8,
+            manager_strings.user_rewards_program_number: 1,
+            manager_strings.user_pending_rewards: 10**6,
+            manager_strings.user_secondary_pending_rewards: 10**5,
+        }
+        for counter in range(1, len(market_app_ids) + 1):
+            storage_state[_counter_prefix(counter) + manager_strings.counter_to_user_rewards_coefficient_initial] = 10**15 * counter - 10**12
+        storage_local_states.append({"id": manager_app_id, "key-value": encode_state(storage_state)})
+        for market_app_id in market_app_ids:
+            storage_local_states.append({"id": market_app_id, "key-value": encode_state(
+                {market_strings.user_active_collateral: 10**10, market_strings.user_borrow_shares: 10**9})})
+
+    indexer["accounts/" + user_address] = {"current-round": 20000000, "account": {
+        "address": user_address, "amount": 10**9, "assets": [], "apps-local-state": user_local_states}}
+    indexer["accounts/" + storage_address] = {"current-round": 20000000, "account": {
+        "address": storage_address, "amount": 10**10, "assets": [], "apps-local-state": storage_local_states}}
+
+    algod = {"transactions/params": {"consensus-version": "future", "fee": 0, "genesis-hash": "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+                                     "genesis-id": chain + "-v1.0", "last-round": 20000000, "min-fee": 1000}}
+    return {"chain": chain, "user_address": user_address, "storage_address": storage_address, "private_key": private_key,
+            "indexer": indexer, "algod": algod}
+
+
+def add_synthetic_storage_accounts(fixtures, count):
+    """Adds count copies of the synthetic storage account to fixtures and returns their addresses. Each copy
+    holds collateral in the even app id markets and borrows in the odd ones, so price moves change its health,
+    and every third copy has no borrows."""
+    template = fixtures["indexer"]["accounts/" + fixtures["storage_address"]]
+    addresses = []
+    for i in range(count):
+        address = _address(10 + i)
+        local_states = []
+        for local_state in template["account"]["apps-local-state"]:
+            if market_strings.user_active_collateral in format_state(local_state["key-value"]):
+                borrows = local_state["id"] % 2
+                local_state = {"id": local_state["id"], "key-value": encode_state({
+                    market_strings.user_active_collateral: 0 if borrows else (i + 1) * 10**9 + local_state["id"] % 997,
+                    market_strings.user_borrow_shares: (i % 3) * 32 * 10**8 if borrows else 0})}
+            local_states.append(local_state)
+        fixtures["indexer"]["accounts/" + address] = {"current-round": template["current-round"], "account": {
+            "address": address, "amount": 10**8, "assets": [], "apps-local-state": local_states}}
+        addresses.append(address)
+    return addresses
+
+
+def load_fixtures(path=None, chain="mainnet"):
+    """Returns the recorded fixtures at path, or synthetic fixtures for chain if path is None"""
+    if path is None:
+        return build_synthetic_fixtures(chain)
+    with open(path) as f:
+        return json.load(f)
+
+
+class FixtureIndexer:
+    """Indexer stand-in answering from recorded responses"""
+
+    def __init__(self, fixtures):
+        self.responses = fixtures["indexer"]
+        self.requests = 0
+
+    def _get(self, path):
+        self.requests += 1
+        if path not in self.responses:
+            raise Exception("No fixture for indexer request " + path)
+        return self.responses[path]
+
+    def applications(self, application_id, round_num=None):
+        return self._get("applications/%d" % application_id)
+
+    def account_info(self, address, round_num=None):
+        return self._get("accounts/" + address)
+
+    def asset_info(self, asset_id):
+        return self._get("assets/%d" % asset_id)
+
+    def accounts(self, limit=None, next_page=None, application_id=None, round_num=None):
+        # every recorded account opted into application_id, as a single page
+        self.requests += 1
+        accounts = [response["account"] for path, response in self.responses.items() if path.startswith("accounts/")
+                    and any(local_state["id"] == application_id for local_state in response["account"].get("apps-local-state", []))]
+        return {"current-round": self.health()["round"], "accounts": accounts}
+
+    def health(self):
+        rounds = [response["current-round"] for response in self.responses.values() if "current-round" in response]
+        return {"round": max(rounds, default=0)}
+
+
+class FixtureAlgod:
+    """Algod stand-in answering from recorded responses"""
+
+    def __init__(self, fixtures):
+        self.responses = fixtures["algod"]
+        self.requests = 0
+
+    def suggested_params(self):
+        self.requests += 1
+        params = self.responses["transactions/params"]
+        return SuggestedParams(params["fee"], params["last-round"], params["last-round"] + 1000, params["genesis-hash"],
+                               params["genesis-id"], False, params["consensus-version"], params["min-fee"])
+
+
+class _Recorder:
+
+    def __init__(self, client, responses):
+        self.client = client
+        self.responses = responses
+
+    def _record(self, path, response):
+        self.responses[path] = response
+        return response
+
+
+class RecordingIndexer(_Recorder):
+    """Indexer wrapper saving every response in the fixture format"""
+
+    def applications(self, application_id, round_num=None):
+        return self._record("applications/%d" % application_id, self.client.applications(application_id, round_num=round_num))
+
+    def account_info(self, address, round_num=None):
+        return self._record("accounts/" + address, self.client.account_info(address, round_num=round_num))
+
+    def asset_info(self, asset_id):
+        return self._record("assets/%d" % asset_id, self.client.asset_info(asset_id))
+
+    def health(self):
+        return self.client.health()
+
+
+class RecordingAlgod(_Recorder):
+    """Algod wrapper saving the suggested params response in the fixture format"""
+
+    def suggested_params(self):
+        params = self.client.suggested_params()
+        self._record("transactions/params", {"consensus-version": params.consensus_version, "fee": params.fee, "genesis-hash": params.gh,
+                                             "genesis-id": params.gen, "last-round": params.first, "min-fee": params.min_fee})
+        return params
+
+
+def record_fixtures(path, chain, user_address):
+    """Records the responses needed by the benchmarks for user_address, which must be opted into the protocol"""
+    from algofi.v1.client import AlgofiMainnetClient, AlgofiTestnetClient
+    client_class = AlgofiMainnetClient if chain == "mainnet" else AlgofiTestnetClient
+    fixtures = {"chain": chain, "user_address": user_address, "indexer": {}, "algod": {}}
+    client = client_class(user_address=user_address)
+    indexer = RecordingIndexer(client.indexer, fixtures["indexer"])
+    client = client_class(RecordingAlgod(client.algod, fixtures["algod"]), indexer, user_address=user_address)
+    client.get_default_params()
+    fixtures["storage_address"] = client.manager.get_storage_address(user_address)
+    client.get_storage_state(fixtures["storage_address"])
+    client.get_user_balances(fixtures["storage_address"])
+    for name in client.get_staking_contracts():
+        try:
+            client.get_user_staking_contract_state(name)
+        except Exception:
+            pass
+    # signing only needs a well formed key, the recorded user's key is never stored
+    fixtures["private_key"] = _key_pair(1)[1]
+    with open(path, "w") as f:
+        json.dump(fixtures, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", required=True, help="json file to write the fixtures to")
+    parser.add_argument("--chain", default="mainnet", choices=["mainnet", "testnet"])
+    parser.add_argument("--user", help="opted in user address to record, defaults to synthetic fixtures")
+    args = parser.parse_args()
+    if args.user:
+        record_fixtures(args.record, args.chain, args.user)
+    else:
+        with open(args.record, "w") as f:
+            json.dump(build_synthetic_fixtures(args.chain), f)
+
+
+if __name__ == "__main__":
+    main()
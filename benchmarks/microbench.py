@@ -0,0 +1,170 @@
+"""
+Microbenchmarks for state decoding, transaction building and valuation, run against offline fixtures.
+
+Each case reports the median latency per operation over several samples and the peak memory traced by
+tracemalloc during one operation. Results can be saved as a baseline and later runs compared against it,
+flagging cases slower than the baseline by more than the tolerance.
+
+    python benchmarks/microbench.py
+    python benchmarks/microbench.py -k prepare --save-baseline benchmarks/baseline.json
+    python benchmarks/microbench.py --baseline benchmarks/baseline.json --tolerance 0.2
+    python benchmarks/microbench.py --fixtures mainnet_fixtures.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# resolve the algofi package from the repository root without installing it or setting PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algofi.utils import TransactionGroup, format_state, get_program, encode_varint
+from algofi.v1.client import Client
+
+from fixtures import FixtureAlgod, FixtureIndexer, load_fixtures
+
+# logic sig style template with two varint variables, in the layout get_program expects
+PROGRAM_DEFINITION = {
+    "bytecode": "BCACAQAmAQAxECISRDEBIw5EMQgkDkQiQw==",
+    "variables": [{"name": "TMPL_FEE", "index": 5, "length": 1, "type": "int"},
+                  {"name": "TMPL_AMOUNT", "index": 6, "length": 1, "type": "int"}],
+}
+
+
+def get_cases(fixtures):
+    """Returns list of (name, function) pairs, each function performing one operation"""
+    indexer = FixtureIndexer(fixtures)
+    algod = FixtureAlgod(fixtures)
+    client = Client(algod, indexer, indexer, fixtures["user_address"], fixtures["chain"])
+    user_address = fixtures["user_address"]
+    storage_address = fixtures["storage_address"]
+    private_key = fixtures["private_key"]
+    symbol = client.get_active_ordered_symbols()[1]
+    market = client.get_market(symbol)
+    staking_contract_name = list(client.get_staking_contracts().keys())[0]
+    market_global_state = indexer.applications(market.get_market_app_id())["application"]["params"]["global-state"]
+    active_markets = [client.get_market(symbol) for symbol in client.get_active_ordered_symbols()[:client.get_manager().get_supported_market_count()]]
+
+    cases = [
+        ("format_state/market_global", lambda: format_state(market_global_state)),
+        ("encode_varint/2**40", lambda: encode_varint(2**40)),
+        ("get_program", lambda: get_program(PROGRAM_DEFINITION, {"fee": 1000, "amount": 2**40})),
+    ]
+
+    builders = {
+        "add_collateral": lambda: client.prepare_add_collateral_transactions(symbol, 1000),
+        "borrow": lambda: client.prepare_borrow_transactions(symbol, 1000),
+        "burn": lambda: client.prepare_burn_transactions(symbol, 1000),
+        "claim_rewards": lambda: client.prepare_claim_rewards_transactions(),
+        "liquidate": lambda: client.prepare_liquidate_transactions(storage_address, symbol, 1000, "ALGO"),
+        "mint": lambda: client.prepare_mint_transactions(symbol, 1000),
+        "mint_to_collateral": lambda: client.prepare_mint_to_collateral_transactions(symbol, 1000),
+        "remove_collateral": lambda: client.prepare_remove_collateral_transactions(symbol, 1000),
+        "remove_collateral_underlying": lambda: client.prepare_remove_collateral_underlying_transactions(symbol, 1000),
+        "repay_borrow": lambda: client.prepare_repay_borrow_transactions(symbol, 1000),
+        "optin": lambda: client.prepare_optin_transactions(storage_address),
+        "staking_contract_optin": lambda: client.prepare_staking_contract_optin_transactions(staking_contract_name, storage_address),
+        "stake": lambda: client.prepare_stake_transactions(staking_contract_name, 1000),
+        "unstake": lambda: client.prepare_unstake_transactions(staking_contract_name, 1000),
+        "claim_staking_rewards": lambda: client.prepare_claim_staking_rewards_transactions(staking_contract_name),
+        "supply_algos_to_vault": lambda: client.prepare_supply_algos_to_vault_transactions(1000),
+        "remove_algos_from_vault": lambda: client.prepare_remove_algos_from_vault_transactions(1000),
+        "sync_vault": lambda: client.prepare_sync_vault_transactions(),
+        "send_governance_commitment": lambda: client.prepare_send_governance_commitment_transactions(user_address, 1000),
+        "send_governance_vote": lambda: client.prepare_send_governance_vote_transactions(user_address, b"af/gov1:j[5,\"a\"]"),
+        "send_keyreg_offline": lambda: client.prepare_send_keyreg_offline_transactions(),
+    }
+    cases += [("prepare/" + name, build) for name, build in builders.items()]
+
+    borrow_txns = client.prepare_borrow_transactions(symbol, 1000).transactions
+    group = client.prepare_borrow_transactions(symbol, 1000)
+    cases += [
+        ("TransactionGroup/group", lambda: TransactionGroup(borrow_txns)),
+        ("TransactionGroup/sign", lambda: group.sign_with_private_key(user_address, private_key)),
+        ("Market.get_storage_state", lambda: market.get_storage_state(storage_address)),
+        ("RewardsProgram.get_storage_unrealized_rewards",
+         lambda: client.get_manager().get_rewards_program().get_storage_unrealized_rewards(storage_address, client.get_manager(), active_markets)),
+    ]
+    return cases
+
+
+def measure(function, repeat=5, min_sample_time=0.05):
+    """Returns (median seconds per call, peak bytes traced during one call)"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time or number >= 1 << 20:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        function()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(samples), peak - baseline
+
+
+def compare(results, baseline, tolerance):
+    """Returns list of (name, baseline seconds, seconds) for the cases slower than baseline by more than tolerance"""
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result["seconds"] > baseline[name]["seconds"] * (1 + tolerance):
+            regressions.append((name, baseline[name]["seconds"], result["seconds"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="recorded fixtures json, defaults to synthetic fixtures")
+    parser.add_argument("--chain", default="mainnet", choices=["mainnet", "testnet"], help="chain of the synthetic fixtures")
+    parser.add_argument("-k", dest="filter", default="", help="only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="baseline json to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline, as a fraction")
+    parser.add_argument("--save-baseline", help="write the results as a baseline json")
+    args = parser.parse_args()
+
+    cases = [(name, function) for name, function in get_cases(load_fixtures(args.fixtures, args.chain)) if args.filter in name]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print("%-48s %12s %12s %10s" % ("case", "us/op", "peak KiB", "vs base"))
+    for name, function in cases:
+        seconds, peak = measure(function, repeat=args.repeat)
+        results[name] = {"seconds": seconds, "peak_bytes": peak}
+        change = "%+9.1f%%" % (100 * (seconds / baseline[name]["seconds"] - 1)) if name in baseline else ""
+        print("%-48s %12.2f %12.1f %10s" % (name, seconds * 1e6, peak / 1024, change))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2, sort_keys=True)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, base_seconds, seconds in regressions:
+        print("REGRESSION %s: %.2f us/op -> %.2f us/op" % (name, base_seconds * 1e6, seconds * 1e6))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,15 +25,21 @@ key =  mnemonic.to_private_key(user['mnemonic'])
 IS_MAINNET = False
 client = AlgofiMainnetClient(user_address=sender) if IS_MAINNET else AlgofiTestnetClient(user_address=sender)
 
-collateral_symbol = client.get_active_ordered_symbols()[0]
-borrow_symbol = client.get_active_ordered_symbols()[1]
+# storage address index cache, the first run sweeps every account and later runs only sync new opt ins
+STORAGE_INDEX_PATH = os.path.join(my_path, ("mainnet" if IS_MAINNET else "testnet") + "_storage_index.json")
 
-# ENTER THE ADDRESS AND STORAGE ADDRESS OF THE LIQUIDATABLE USER
-target_address = ""
-target_storage_address = ""
+# find the most profitable liquidation
+opportunities = client.get_liquidation_scanner().get_opportunities()
+if not opportunities:
+    raise Exception("no profitable liquidations")
+opportunity = opportunities[0]
+collateral_symbol = opportunity["collateral_symbol"]
+borrow_symbol = opportunity["borrow_symbol"]
+target_storage_address = opportunity["storage_address"]
+target_address = client.load_storage_index(STORAGE_INDEX_PATH).get_user_address(target_storage_address)
 
-# ENTER THE AMOUNT OF BORROW ASSET TO LIQUIDATE
-amount = int(100)
+# AMOUNT OF BORROW ASSET TO LIQUIDATE
+amount = opportunity["repay_amount"]
 
 # print initial state
 print("~"*100)
@@ -17,6 +17,10 @@ setuptools.setup(
         "Source": "https://github.com/Algofiorg/algofi-py-sdk",
     },
     install_requires=["py-algorand-sdk >= 1.6.0"],
+    extras_require={
+        "numpy": ["numpy >= 1.19"],
+        "async": ["aiohttp >= 3.7"],
+    },
     packages=setuptools.find_packages(),
     python_requires=">=3.7",
     package_data={'algofi.v1': ['contracts.json']},
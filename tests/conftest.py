@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.fixtures import FixtureAlgod, FixtureIndexer, add_synthetic_storage_accounts, build_synthetic_fixtures
+
+from algofi.v1.client import Client
+
+# storage accounts added next to the synthetic one, enough for the engines to see varied positions
+STORAGE_ACCOUNT_COUNT = 8
+
+
+@pytest.fixture
+def fixtures():
+    fixtures = build_synthetic_fixtures("mainnet")
+    add_synthetic_storage_accounts(fixtures, STORAGE_ACCOUNT_COUNT)
+    return fixtures
+
+
+@pytest.fixture
+def indexer(fixtures):
+    return FixtureIndexer(fixtures)
+
+
+@pytest.fixture
+def client(fixtures, indexer):
+    return Client(FixtureAlgod(fixtures), indexer, indexer, fixtures["user_address"], fixtures["chain"])
+
+
+@pytest.fixture
+def storage_addresses(fixtures):
+    return [path[len("accounts/"):] for path in fixtures["indexer"] if path.startswith("accounts/") and path != "accounts/" + fixtures["user_address"]]
+
+
+@pytest.fixture
+def snapshot(client, storage_addresses):
+    return client.get_snapshot(storage_addresses=storage_addresses)
+
+
+@pytest.fixture
+def symbols(client, snapshot):
+    return client.get_active_ordered_symbols()[:client.get_manager().at_snapshot(snapshot).get_supported_market_count()]
@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from algofi.v1.health import HealthEngine
+
+
+def test_health_matches_storage_state(client, snapshot, symbols):
+    engine = HealthEngine.from_client(client, snapshot=snapshot)
+    health = engine.get_health(snapshot=snapshot)
+    for row, storage_address in enumerate(engine.storage_addresses):
+        state = client.get_storage_state(storage_address, snapshot=snapshot)
+        for column, symbol in enumerate(symbols):
+            for key in ("active_collateral_underlying", "borrow_underlying"):
+                assert health[key][row, column] == state[symbol][key]
+            for key in ("active_collateral_usd", "active_collateral_max_borrow_usd", "borrow_usd"):
+                assert health[key][row, column] == pytest.approx(state[symbol][key])
+
+
+def test_liquidatable_accounts(client, snapshot):
+    engine = HealthEngine.from_client(client, snapshot=snapshot)
+    health = engine.get_health(snapshot=snapshot)
+    liquidatable = engine.get_liquidatable_accounts(snapshot=snapshot)
+    assert liquidatable
+    assert [account["storage_address"] for account in liquidatable] == [
+        storage_address for row, storage_address in sorted(enumerate(engine.storage_addresses), key=lambda item: health["health_factor"][item[0]])
+        if health["borrowed_usd"][row] > health["max_borrow_usd"][row]]
@@ -0,0 +1,85 @@
+import base64
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks.fixtures import encode_state
+
+from algofi.v1.history import get_global_state_history, replay_global_states, sample_global_states
+
+APP_ID = 7
+OTHER_APP_ID = 8
+# (round, app id, {key: value}) global state changes, a None value deletes the key
+CHANGES = [
+    (100, APP_ID, {"ub": 10, "name": "first"}),
+    (103, APP_ID, {"ub": 12}),
+    (103, OTHER_APP_ID, {"ub": 999}),
+    (104, APP_ID, {"cash": 5}),
+    (107, APP_ID, {"ub": 15, "name": "second"}),
+    (107, APP_ID, {"cash": None}),
+    (110, APP_ID, {"ub": 20}),
+]
+
+
+def encode_delta(changes):
+    delta = []
+    for key, value in changes.items():
+        if value is None:
+            encoded_value = {"action": 3}
+        elif isinstance(value, str):
+            encoded_value = {"action": 1, "bytes": base64.b64encode(value.encode()).decode()}
+        else:
+            encoded_value = {"action": 2, "uint": value}
+        delta.append({"key": base64.b64encode(key.encode()).decode(), "value": encoded_value})
+    return delta
+
+
+class HistoryIndexer:
+    """Indexer answering global state at any round and application calls from a known sequence of changes,
+    in pages of page_size transactions"""
+
+    def __init__(self, changes, page_size=2):
+        self.changes = changes
+        self.page_size = page_size
+
+    def applications(self, application_id, round_num=None):
+        state = {}
+        for round, app_id, changes in self.changes:
+            if app_id == application_id and round <= round_num:
+                state.update(changes)
+        state = {key: value for key, value in state.items() if value is not None}
+        return {"current-round": round_num, "application": {"id": application_id, "params": {"global-state": encode_state(state)}}}
+
+    def search_transactions(self, limit=None, next_page=None, application_id=None, min_round=None, max_round=None):
+        txns = []
+        for round, app_id, changes in self.changes:
+            if min_round <= round <= max_round and app_id == application_id:
+                # the second change of a round arrives as an inner transaction
+                txn = {"confirmed-round": round, "application-transaction": {"application-id": app_id}, "global-state-delta": encode_delta(changes)}
+                if txns and txns[-1]["confirmed-round"] == round:
+                    txn = {"confirmed-round": round, "application-transaction": {"application-id": 0}, "inner-txns": [txn]}
+                txns.append(txn)
+        start = int(next_page or 0)
+        page = txns[start:start + self.page_size]
+        return {"transactions": page, "next-token": str(start + self.page_size)}
+
+
+def test_replayed_states_match_sampled_states():
+    indexer = HistoryIndexer(CHANGES)
+    rounds = list(range(100, 113))
+    sampled = sample_global_states(indexer, APP_ID, rounds)
+    assert replay_global_states(indexer, APP_ID, rounds) == sampled
+    assert sampled[rounds.index(106)] == {"ub": 12, "name": "first", "cash": 5}
+    assert sampled[rounds.index(107)] == {"ub": 15, "name": "second"}
+
+
+@pytest.mark.parametrize("step", [1, 3, 5])
+def test_history_methods_agree(step):
+    indexer = HistoryIndexer(CHANGES)
+    by_round = get_global_state_history(indexer, APP_ID, ["ub", "cash"], 100, 112, step=step, method="rounds")
+    by_delta = get_global_state_history(indexer, APP_ID, ["ub", "cash"], 100, 112, step=step, method="deltas")
+    assert set(by_round) == {"round", "ub", "cash"}
+    for name in by_round:
+        assert by_round[name].tolist() == by_delta[name].tolist()
+    assert by_round["ub"][-1] == 20
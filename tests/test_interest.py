@@ -0,0 +1,66 @@
+import pytest
+
+from algofi.contract_strings import algofi_market_strings as market_strings
+from algofi.v1.interest import SECONDS_PER_YEAR
+
+LATEST_TIME = 1700000000
+
+
+def accrue(state, time_elapsed):
+    """Returns a market global state after the market accrues time_elapsed seconds of interest"""
+    interest = state[market_strings.underlying_borrowed] * state[market_strings.total_borrow_interest_rate] * time_elapsed // (10**9 * SECONDS_PER_YEAR)
+    reserves = interest * state[market_strings.reserve_factor] // 10**3
+    state = dict(state)
+    state[market_strings.underlying_borrowed] += interest
+    state[market_strings.underlying_reserves] += reserves
+    state[market_strings.bank_to_underlying_exchange] += (interest - reserves) * 10**9 // state[market_strings.bank_circulation]
+    state[market_strings.latest_time] += time_elapsed
+    return state
+
+
+@pytest.fixture
+def market_state(client, snapshot):
+    state = dict(snapshot.get_global_state(client.get_market("USDC").get_market_app_id()))
+    state[market_strings.latest_time] = LATEST_TIME
+    return state
+
+
+def at_state(client, snapshot, state):
+    market = client.get_market("USDC")
+    return market.at_snapshot(snapshot.updated(snapshot.get_round(), global_states={market.get_market_app_id(): state}))
+
+
+@pytest.mark.parametrize("time_elapsed", [0, 1, 3600, 86400 * 365])
+def test_projection_matches_accrued_market(client, snapshot, market_state, time_elapsed):
+    projector = at_state(client, snapshot, market_state).get_interest_projector()
+    accrued = at_state(client, snapshot, accrue(market_state, time_elapsed))
+    timestamp = LATEST_TIME + time_elapsed
+    assert projector.get_projected_state(timestamp) == {
+        "underlying_borrowed": accrued.get_underlying_borrowed(),
+        "underlying_reserves": accrued.get_underlying_reserves(),
+        "bank_to_underlying_exchange": accrued.get_bank_to_underlying_exchange(),
+    }
+    # the borrow index is underlying borrowed per outstanding share
+    outstanding_borrow_shares = accrued.get_outstanding_borrow_shares()
+    assert projector.get_borrow_underlying(outstanding_borrow_shares, timestamp) == accrued.get_underlying_borrowed()
+    assert projector.get_borrow_underlying(10**9, timestamp) == int(accrued.get_underlying_borrowed() * 10**9 / outstanding_borrow_shares)
+    if time_elapsed:
+        assert accrued.get_underlying_borrowed() > market_state[market_strings.underlying_borrowed]
+
+
+def test_projected_storage_state_matches_accrued_market(client, snapshot, market_state, storage_addresses):
+    market = at_state(client, snapshot, market_state)
+    accrued = at_state(client, snapshot, accrue(market_state, 86400))
+    projector = market.get_interest_projector()
+    for storage_address in storage_addresses:
+        local_state = snapshot.get_local_state(storage_address, market.get_market_app_id())
+        storage_state = market.get_storage_state_from_local_state(local_state, snapshot=snapshot)
+        assert projector.get_storage_state(storage_state, LATEST_TIME + 86400, snapshot=snapshot) == \
+            accrued.get_storage_state_from_local_state(local_state, snapshot=snapshot)
+
+
+def test_projection_before_latest_time_is_current_state(client, snapshot, market_state):
+    market = at_state(client, snapshot, market_state)
+    projector = market.get_interest_projector()
+    assert projector.get_projected_state(LATEST_TIME - 60) == projector.get_projected_state(LATEST_TIME)
+    assert projector.get_underlying_borrowed(LATEST_TIME - 60) == market.get_underlying_borrowed()
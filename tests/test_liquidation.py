@@ -0,0 +1,44 @@
+import pytest
+
+from algofi.contract_strings import algofi_market_strings as market_strings
+from algofi.v1 import prepend
+from algofi.v1.liquidation import LiquidationScanner, get_liquidate_fee
+
+
+@pytest.fixture(autouse=True)
+def highest_update_fee(monkeypatch):
+    monkeypatch.setattr(prepend, "randrange", lambda start, stop, step: stop - step)
+
+
+@pytest.mark.parametrize("collateral_symbol", ["USDC", "vALGO"])
+def test_liquidate_fee_matches_group(client, storage_addresses, collateral_symbol):
+    group = client.prepare_liquidate_transactions(storage_addresses[1], "ALGO", 10**6, collateral_symbol)
+    fee = get_liquidate_fee(client.get_manager().get_manager_app_id(), client.get_active_market_app_ids(),
+                            client.get_active_oracle_app_ids(), collateral_symbol, fee=client.get_default_params().fee)
+    assert fee == sum(txn.fee for txn in group.transactions)
+
+
+def set_price(snapshot, asset, multiplier):
+    state = dict(snapshot.get_global_state(asset.get_oracle_app_id()))
+    state[asset.get_oracle_price_field()] = state[asset.get_oracle_price_field()] * multiplier
+    return snapshot.updated(snapshot.get_round() + 1, global_states={asset.get_oracle_app_id(): state})
+
+
+def add_account_without_algo(client, scanner):
+    # collateral in goETH and a borrow in USDC over its limit, so an ALGO price move only changes its fee
+    scanner.update_account("A" * 58, {}, {
+        client.get_market("goETH").get_market_app_id(): {market_strings.user_active_collateral: 10**9},
+        client.get_market("USDC").get_market_app_id(): {market_strings.user_borrow_shares: 2 * 10**9}})
+
+
+def test_refresh_reprices_fees_of_every_opportunity(client, snapshot):
+    scanner = LiquidationScanner(client, snapshot=snapshot)
+    add_account_without_algo(client, scanner)
+    assert "A" * 58 in scanner.opportunities
+    moved = set_price(snapshot, client.get_market("ALGO").get_asset(), 1000)
+    scanner.refresh(snapshot=moved)
+
+    expected = LiquidationScanner(client, snapshot=moved)
+    add_account_without_algo(client, expected)
+    assert scanner.get_fee_usd() == expected.get_fee_usd() > 0
+    assert scanner.get_opportunities(min_profit_usd=-1e18) == expected.get_opportunities(min_profit_usd=-1e18)
@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from algofi.v1.preflight import INSUFFICIENT_COLLATERAL, PreflightChecker
+
+
+@pytest.fixture
+def checker(client, snapshot):
+    return PreflightChecker(client, snapshot=snapshot)
+
+
+def test_account_usd_matches_storage_state(client, snapshot, checker, storage_addresses):
+    for storage_address in storage_addresses:
+        state = client.get_storage_state(storage_address, snapshot=snapshot)
+        max_borrow_usd, borrowed_usd = checker.get_account_usd(storage_address)
+        assert max_borrow_usd == pytest.approx(sum(state[symbol]["active_collateral_max_borrow_usd"] for symbol in checker.book.symbols))
+        assert borrowed_usd == pytest.approx(sum(state[symbol]["borrow_usd"] for symbol in checker.book.symbols))
+
+
+def test_borrow_boundary(checker, storage_addresses):
+    max_borrows = []
+    for storage_address in storage_addresses:
+        for symbol in checker.book.symbols:
+            max_borrow = checker.get_max_borrow(storage_address, symbol)
+            max_borrows.append(max_borrow)
+            if max_borrow > 0:
+                assert checker.check_borrow(storage_address, symbol, max_borrow)["allowed"]
+            result = checker.check_borrow(storage_address, symbol, max_borrow + 1)
+            assert not result["allowed"]
+            assert result["max_amount"] == max_borrow
+    assert any(max_borrows)
+
+
+def test_remove_collateral_boundary(checker, storage_addresses):
+    for storage_address in storage_addresses:
+        for symbol in checker.book.symbols:
+            max_remove = checker.get_max_remove_collateral(storage_address, symbol)
+            if max_remove > 0:
+                assert checker.check_remove_collateral(storage_address, symbol, max_remove)["allowed"]
+            assert not checker.check_remove_collateral(storage_address, symbol, max_remove + 1)["allowed"]
+
+
+def test_liquidatable_account_can_not_borrow(client, checker, storage_addresses):
+    liquidatable = [storage_address for storage_address in storage_addresses
+                    if checker.get_account_usd(storage_address)[1] > checker.get_account_usd(storage_address)[0]]
+    assert liquidatable
+    for storage_address in liquidatable:
+        result = checker.check_borrow(storage_address, "USDC", 1)
+        assert not result["allowed"]
+        assert result["reason"] == INSUFFICIENT_COLLATERAL
+
+
+def test_default_checker_loads_accounts_on_demand(client, checker, storage_addresses):
+    default_checker = client.get_preflight_checker()
+    for storage_address in storage_addresses:
+        assert default_checker.get_account_usd(storage_address) == pytest.approx(checker.get_account_usd(storage_address))
+
+
+@pytest.mark.parametrize("safety_margin", [-0.1, 1, 1.5])
+def test_safety_margin_must_be_a_fraction(client, snapshot, safety_margin):
+    with pytest.raises(Exception, match="safety_margin"):
+        PreflightChecker(client, snapshot=snapshot, safety_margin=safety_margin)
+
+
+def test_safety_margin_holds_back_max_borrow(client, snapshot, checker, storage_addresses):
+    cautious_checker = PreflightChecker(client, snapshot=snapshot, safety_margin=0.25)
+    for storage_address in storage_addresses:
+        max_borrow_usd, borrowed_usd = checker.get_account_usd(storage_address)
+        assert cautious_checker.get_account_usd(storage_address) == pytest.approx((max_borrow_usd * 0.75, borrowed_usd))
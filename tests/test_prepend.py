@@ -0,0 +1,57 @@
+from copy import deepcopy
+
+import pytest
+from algosdk import encoding
+from algosdk.future.transaction import SuggestedParams
+
+from algofi.utils import Transactions
+from algofi.v1 import prepend
+from algofi.v1.prepend import build_init_txns, get_init_txn_fee, get_init_txn_templates, get_init_txns
+
+SENDER = encoding.encode_address(bytes(range(32)))
+STORAGE_ACCOUNT = encoding.encode_address(bytes(range(32, 64)))
+NOTE = (1234).to_bytes(8, "big")
+
+
+@pytest.fixture
+def app_ids(client):
+    return client.get_manager().get_manager_app_id(), client.get_active_market_app_ids(), client.get_active_oracle_app_ids()
+
+
+@pytest.fixture(autouse=True)
+def fixed_note(monkeypatch):
+    monkeypatch.setattr(prepend, "randint", lambda a, b: 1234)
+
+
+def encode(txns):
+    return [encoding.msgpack_encode(txn) for txn in txns]
+
+
+@pytest.mark.parametrize("transaction_type", [Transactions.MINT, Transactions.ADD_COLLATERAL, Transactions.REMOVE_ALGOS_FROM_VAULT])
+def test_templated_txns_match_built_txns(app_ids, transaction_type):
+    suggested_params = SuggestedParams(1000, 20000000, 20001000, "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", "mainnet-v1.0", flat_fee=True)
+    suggested_params_modified = deepcopy(suggested_params)
+    suggested_params_modified.fee = get_init_txn_fee(transaction_type, suggested_params.fee)
+    expected = build_init_txns(SENDER, suggested_params, suggested_params_modified, *app_ids, STORAGE_ACCOUNT, NOTE)
+    assert encode(get_init_txns(transaction_type, SENDER, suggested_params, *app_ids, STORAGE_ACCOUNT)) == encode(expected)
+
+
+def test_templated_txns_are_independent(app_ids):
+    suggested_params = SuggestedParams(1000, 20000000, 20001000, "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", "mainnet-v1.0", flat_fee=True)
+    first = get_init_txns(Transactions.MINT, SENDER, suggested_params, *app_ids, STORAGE_ACCOUNT)
+    encoded = encode(first)
+    get_init_txns(Transactions.BORROW, STORAGE_ACCOUNT, suggested_params, *app_ids, SENDER)
+    assert encode(first) == encoded
+
+
+def test_templates_are_not_shared_with_callers(app_ids):
+    suggested_params = SuggestedParams(1000, 20000000, 20001000, "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", "mainnet-v1.0", flat_fee=True)
+    first = get_init_txns(Transactions.MINT, SENDER, suggested_params, *app_ids, STORAGE_ACCOUNT)
+    encoded = encode(get_init_txns(Transactions.MINT, SENDER, suggested_params, *app_ids, STORAGE_ACCOUNT))
+    for txn in first:
+        txn.app_args.append(b"x")
+        txn.foreign_apps.append(1)
+        if txn.accounts is not None:
+            txn.accounts.append(SENDER)
+    assert encode(get_init_txns(Transactions.MINT, SENDER, suggested_params, *app_ids, STORAGE_ACCOUNT)) == encoded
+    assert all(isinstance(template.foreign_apps, tuple) for template in get_init_txn_templates(app_ids[0], tuple(app_ids[1]), tuple(app_ids[2])))
@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from algofi.v1.rate_model import InterestRateModel, get_utilization
+
+# utilizations around the 700 kink of the synthetic markets, up to full utilization
+UTILIZATIONS = [0, 1, 350, 699, 700, 701, 850, 999, 1000]
+
+
+def contract_borrow_rate(market, utilization):
+    """Borrow rate of market at utilization, written out as the market contract computes it"""
+    if utilization <= market.utilization_optimal:
+        return market.base_interest_rate + utilization * market.slope_1 // market.utilization_optimal
+    return market.base_interest_rate + market.slope_1 + \
+           (utilization - market.utilization_optimal) * market.slope_2 // (1000 - market.utilization_optimal)
+
+
+@pytest.fixture
+def markets(client, symbols):
+    return [client.get_market(symbol) for symbol in symbols]
+
+
+@pytest.mark.parametrize("utilization", UTILIZATIONS)
+def test_rates_match_contract(markets, utilization):
+    for market in markets:
+        model = market.get_interest_rate_model()
+        borrow_rate = contract_borrow_rate(market, utilization)
+        assert model.get_borrow_rate(utilization) == borrow_rate
+        assert model.get_supply_rate(utilization) == borrow_rate * utilization // 1000 * (1000 - market.reserve_factor) // 1000
+
+
+def test_array_rates_match_scalar(markets):
+    models = [market.get_interest_rate_model() for market in markets]
+    stacked = InterestRateModel.from_markets(markets)
+    utilization = np.tile(np.array(UTILIZATIONS, dtype=np.int64), (len(markets), 1))
+    borrow_rate = stacked.get_borrow_rate(utilization)
+    supply_rate = stacked.get_supply_rate(utilization)
+    for i, model in enumerate(models):
+        assert borrow_rate[i].tolist() == [model.get_borrow_rate(u) for u in UTILIZATIONS]
+        assert supply_rate[i].tolist() == [model.get_supply_rate(u) for u in UTILIZATIONS]
+        assert model.get_borrow_rate(np.array(UTILIZATIONS)).tolist() == borrow_rate[i].tolist()
+
+
+def test_array_curves_match_scalar(markets):
+    curve = InterestRateModel.from_markets(markets).get_curve(points=11)
+    for i, market in enumerate(markets):
+        market_curve = market.get_interest_rate_model().get_curve(points=11)
+        for name in ("utilization", "borrow_rate", "supply_rate"):
+            assert curve[name][i].tolist() == market_curve[name].tolist()
+    assert not curve["borrow_rate"].flags.writeable
+
+
+def test_utilization_does_not_overflow(markets):
+    underlying_borrowed = [market.get_underlying_borrowed() for market in markets] + [10**16 + 7, 3 * 10**18]
+    underlying_supplied = [market.get_underlying_supplied() for market in markets] + [2 * 10**16, 4 * 10**18]
+    utilization = get_utilization(np.array(underlying_borrowed), np.array(underlying_supplied))
+    assert utilization.tolist() == [get_utilization(b, s) for b, s in zip(underlying_borrowed, underlying_supplied)]
+    assert utilization.tolist()[-2:] == [500, 750]
+    assert get_utilization(np.array([5]), np.array([0])).tolist() == [0]
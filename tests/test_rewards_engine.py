@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from algofi.v1 import rewards_program
+from algofi.v1.rewards_engine import RewardsEngine
+
+
+def test_rewards_match_rewards_program(client, snapshot, symbols, monkeypatch):
+    now = client.get_manager().at_snapshot(snapshot).get_rewards_program().get_latest_rewards_time() + 3600
+    monkeypatch.setattr(rewards_program.time, "time", lambda: now)
+    engine = RewardsEngine.from_client(client, snapshot=snapshot)
+    rewards = engine.get_unrealized_rewards(client.get_manager(), snapshot=snapshot, now=now)
+    assert (rewards["primary"] > 0).all()
+    markets = [client.get_market(symbol) for symbol in symbols]
+    for row, storage_address in enumerate(engine.storage_addresses):
+        primary, secondary = client.get_manager().get_storage_unrealized_rewards(storage_address, markets, snapshot=snapshot)
+        assert rewards["primary"][row] == pytest.approx(primary, rel=1e-12, abs=1)
+        assert rewards["secondary"][row] == pytest.approx(secondary, rel=1e-12, abs=1)
@@ -0,0 +1,60 @@
+import pytest
+
+from algofi.contract_strings import algofi_market_strings as market_strings
+from algofi.v1.snapshot import ProtocolSnapshot, get_protocol_app_ids
+
+
+class RoundRecordingIndexer:
+    """Wraps an indexer, recording the round of every state request"""
+
+    def __init__(self, indexer):
+        self.indexer = indexer
+        self.rounds = []
+
+    def applications(self, application_id, round_num=None):
+        self.rounds.append(round_num)
+        return self.indexer.applications(application_id, round_num=round_num)
+
+    def account_info(self, address, round_num=None):
+        self.rounds.append(round_num)
+        return self.indexer.account_info(address, round_num=round_num)
+
+    def health(self):
+        return self.indexer.health()
+
+
+def test_capture_pins_one_round(client, indexer, storage_addresses):
+    client.indexer = RoundRecordingIndexer(indexer)
+    snapshot = ProtocolSnapshot.capture(client, storage_addresses=storage_addresses)
+    assert set(client.indexer.rounds) == {indexer.health()["round"]}
+    assert snapshot.get_round() == indexer.health()["round"]
+    assert sorted(snapshot.get_app_ids()) == sorted(get_protocol_app_ids(client))
+    assert sorted(snapshot.get_storage_addresses()) == sorted(storage_addresses)
+
+
+def test_storage_state_matches_live(client, storage_addresses):
+    snapshot = client.get_snapshot(storage_addresses=storage_addresses)
+    for storage_address in storage_addresses:
+        assert client.get_storage_state(storage_address, snapshot=snapshot) == client.get_storage_state(storage_address)
+
+
+def test_snapshot_reads_do_not_mutate_client(client, storage_addresses):
+    snapshot = client.get_snapshot(storage_addresses=storage_addresses)
+    market = client.get_market("USDC")
+    market_app_id = market.get_market_app_id()
+    snapshot = snapshot.updated(snapshot.get_round() + 1, global_states={
+        market_app_id: dict(snapshot.get_global_state(market_app_id), **{market_strings.underlying_borrowed: 1})})
+    underlying_borrowed = market.get_underlying_borrowed()
+    client.get_storage_state(storage_addresses[0], snapshot=snapshot)
+    assert market.at_snapshot(snapshot).get_underlying_borrowed() != underlying_borrowed
+    assert market.get_underlying_borrowed() == underlying_borrowed
+
+
+def test_snapshot_is_read_only(client, storage_addresses):
+    snapshot = client.get_snapshot(storage_addresses=storage_addresses)
+    app_id = client.get_manager().get_manager_app_id()
+    with pytest.raises(TypeError):
+        snapshot.get_global_state(app_id)["x"] = 1
+    with pytest.raises(Exception):
+        snapshot.get_global_state(0)
+    assert set(snapshot.get_local_states(storage_addresses[0])) >= {app_id, client.get_market("USDC").get_market_app_id()}
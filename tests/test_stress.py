@@ -0,0 +1,31 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from algofi.v1.stress import StressEngine
+
+
+def shock_prices(client, snapshot, changes):
+    """Returns snapshot with the oracle price of each symbol moved by its relative change"""
+    global_states = {}
+    for symbol, change in changes.items():
+        asset = client.get_market(symbol).get_asset()
+        state = dict(snapshot.get_global_state(asset.get_oracle_app_id()))
+        state[asset.get_oracle_price_field()] = round(state[asset.get_oracle_price_field()] * (1 + change))
+        global_states[asset.get_oracle_app_id()] = state
+    return snapshot.updated(snapshot.get_round(), global_states=global_states)
+
+
+def test_stress_matches_shocked_health(client, snapshot):
+    engine = StressEngine.from_client(client, snapshot=snapshot)
+    scenarios = [{}, {"ALGO": -0.5}, {"ALGO": -0.9, "USDC": 0.3}, {"goBTC": 0.5}, {"vALGO": -0.5}]
+    stress = engine.get_account_stress(engine.get_price_multipliers(scenarios))
+    exposure = engine.get_exposure(engine.get_price_multipliers(scenarios))
+    for column, scenario in enumerate(scenarios):
+        shocked = shock_prices(client, snapshot, scenario)
+        health = engine.health_engine.get_health(snapshot=shocked)
+        shortfall_usd = np.maximum(health["borrowed_usd"] - health["max_borrow_usd"], 0)
+        assert stress["shortfall_usd"][:, column] == pytest.approx(shortfall_usd)
+        assert exposure["borrowed_usd"][column] == pytest.approx(health["borrowed_usd"].sum())
+        assert exposure["max_borrow_usd"][column] == pytest.approx(health["max_borrow_usd"].sum())
+        assert exposure["liquidatable_accounts"][column] == len(engine.health_engine.get_liquidatable_accounts(snapshot=shocked))
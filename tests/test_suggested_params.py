@@ -0,0 +1,21 @@
+from benchmarks.fixtures import FixtureAlgod
+
+from algofi.suggested_params import SuggestedParamsProvider
+from algofi.v1.client import Client
+
+
+def test_default_params_are_fetched_on_every_call(fixtures, indexer):
+    algod = FixtureAlgod(fixtures)
+    client = Client(algod, indexer, indexer, fixtures["user_address"], fixtures["chain"])
+    client.get_default_params()
+    client.get_default_params()
+    assert algod.requests == 2
+
+
+def test_provider_with_ttl_shares_params(fixtures, indexer):
+    algod = FixtureAlgod(fixtures)
+    client = Client(algod, indexer, indexer, fixtures["user_address"], fixtures["chain"], params_provider=SuggestedParamsProvider(algod, ttl=60))
+    first = client.get_default_params()
+    first.first = 0
+    assert client.get_default_params().first == fixtures["algod"]["transactions/params"]["last-round"]
+    assert algod.requests == 1